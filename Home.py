@@ -1,15 +1,24 @@
 import streamlit as st
-from pathlib import Path
 import pandas as pd
-from utils.big_data import get_big_data, big_metrics, big_rankings
+from utils.big_data import get_big_data, get_big_stats, get_trope_distances, big_metrics, big_rankings
+from utils.distance import METRICS
 from utils.visuals import big_radar_plot, big_tempo_duration, big_trope_heatmap
 from utils.components import pill_button_styler, background_band_fill_side
+from utils.logos import get_logo, logo_strip
+from utils.timing import begin_trace, end_trace, span
+from utils.warmup import start_background_warm_up
 
 st.set_page_config(page_title="B1G Fight Songs", 
                    layout="wide")
+# render timings, shown with ?debug=1
+begin_trace("Home")
+# build every profile and home figure in the background, once per server process
+start_background_warm_up()
 
 # full dataframe
 df = get_big_data()
+# conference aggregates
+stats = get_big_stats()
 
 # title
 st.markdown("<h1 style='text-align:center;'>Sounds of the Big Ten Conference</h1>", unsafe_allow_html=True)
@@ -22,14 +31,9 @@ st.markdown("<h5 style='text-align:center;'>By Colin Bertrand</h3>", unsafe_allo
 "---"
 
 # school logos
-folder_path = Path("data/logos/resized") 
-image_files = sorted([
-    p for p in folder_path.iterdir() if p.is_file()
-])
-cols = st.columns(len(image_files))
-for col, image_path in zip(cols, image_files):
-    with col:
-        st.image(image_path, width="stretch")
+with span("logo strip"):
+    # one pre-composited image of every logo
+    st.image(logo_strip(), width="stretch")
 
 "---"
 # overview section
@@ -58,20 +62,20 @@ with col_logo:
     # B1G Logo
     nan1, pic, nan2 = st.columns([1, 4, 1])
     with pic:
-        st.image("data/logos/Big_Ten_Conference_logo.svg.png", width="stretch")
+        st.image(get_logo("Big Ten", 260), width="stretch")
 
 "---"
 # summary metrics
 st.header('Summary Metrics')
-big_metrics(df)
+big_metrics(stats)
 '---'
 # tempo vs duration scatterplot
-big_tempo_duration(df)
+big_tempo_duration(df, stats)
 st.caption("A scatterplot representing Big Ten average tempo and duration of fight songs. The further right the values, "
            "the longer the song. The higher up the value, the faster the song.")
 '---'
 # average trope usage big ten radar plot
-big_radar_plot(df)
+big_radar_plot(stats)
 st.caption("A radar plot displaying the Big Ten average use of common fight song tropes. Values represent normalized word frequencies")
 # trope presence in the big ten heatmap
 big_trope_heatmap(df)
@@ -84,12 +88,22 @@ st.caption(
 
 # big ten ranking section
 st.header("Big Ten Rankings and Extremes")
+# distance used for the traditional/unique rankings
+metric = st.radio(
+    "Trope distance",
+    options=METRICS,
+    format_func=str.capitalize,
+    horizontal=True,
+    key="home_distance_metric",
+)
 # metrics
-big_rankings(df)
+big_rankings(stats, get_trope_distances(), metric)
 st.caption(
     "*Traditional* and *Unique* rankings are found by computing the difference between a school's " 
     "trope values and the average trope values of the Big Ten. Traditional is the closest to the average, "
-    "while Unique is the furthest from the average."
+    "while Unique is the furthest from the average. "
+    "*Euclidean* measures the straight line difference, *Cosine* compares only the mix of tropes, "
+    "*Hamming* counts tropes that differ from the most common pattern, and *Mahalanobis* accounts for how tropes vary together."
 )
 '---'
 
@@ -146,4 +160,7 @@ st.sidebar.markdown(background_band_fill_side(
         secondary_color="#B3B3B3",
         text_color="#000000",
         border=True,
-        border_color="#0085CE"), unsafe_allow_html=True)
\ No newline at end of file
+        border_color="#0085CE"), unsafe_allow_html=True)
+
+# write this rerun's render timings
+end_trace()
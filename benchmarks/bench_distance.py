@@ -0,0 +1,56 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+from utils.big_data import get_big_data
+from utils.distance import METRICS, trope_distances
+from utils.tropes import TROPES
+
+
+# the row-wise distance big_rankings() used to compute
+def legacy_distances(df):
+    conf_avg = df[TROPES].mean().values
+    return df[TROPES].apply(lambda row: np.linalg.norm(row.values - conf_avg), axis=1)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the vectorized distance engine against the row-wise apply")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-max", type=int, default=100_000, help="skip the row-wise apply above this size")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    songs = get_big_data()
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'rows':>10} {'row-wise s':>11} " + " ".join(f"{m + ' s':>13}" for m in METRICS) + f" {'all s':>7}")
+    for rows in args.rows:
+        df = songs.iloc[rng.integers(0, len(songs), rows)].reset_index(drop=True)
+        columns = list(df.columns)
+
+        legacy = ""
+        if rows <= args.legacy_max:
+            legacy_s, expected = timed(legacy_distances, df)
+            legacy = f"{legacy_s:11.3f}"
+        per_metric = [timed(trope_distances, df, [m])[0] for m in METRICS]
+        all_s, distances = timed(trope_distances, df)
+
+        if legacy:
+            assert np.allclose(expected.to_numpy(), distances["euclidean"].to_numpy())
+        # the engine never adds columns to the frame it was given
+        assert list(df.columns) == columns
+        print(f"{rows:>10,} {legacy or '-':>11} " + " ".join(f"{s:13.3f}" for s in per_metric) + f" {all_s:7.3f}")
+
+
+if __name__ == "__main__":
+    main()
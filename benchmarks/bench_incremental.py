@@ -0,0 +1,82 @@
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+from utils.big_data import RAW_PATH
+from utils.columnar import cache_path, read_columnar, write_columnar
+from utils.incremental import incremental_big_data
+from utils.schema import apply_schema, read_dtypes
+
+
+# full rebuild, same work big_data() does
+def full_rebuild(raw_path, out_path):
+    df = pd.read_csv(raw_path, dtype=read_dtypes())
+    df_big = apply_schema(df[df["conference"] == "Big Ten"])
+    df_big.to_csv(out_path, index=False)
+    write_columnar(df_big, cache_path(out_path), out_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full and incremental rebuilds after a few raw rows change")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--changes", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # big raw file with unique song keys, all in the big ten so every row is part of the dataset
+    raw = pd.read_csv(RAW_PATH, dtype="str")
+    raw = raw[raw["conference"] == "Big Ten"]
+    rng = np.random.default_rng(args.seed)
+    big = raw.iloc[rng.integers(0, len(raw), args.rows)].reset_index(drop=True)
+    big["song_name"] = big["song_name"] + " #" + big.index.astype("str")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path = Path(tmp) / "raw.csv"
+        out_path = Path(tmp) / "big_ten.csv"
+        big.to_csv(raw_path, index=False)
+        incremental_big_data(raw_path, out_path)
+
+        # change a handful of rows: update some tempos, drop one, add one
+        changed = rng.choice(len(big), args.changes, replace=False)
+        big.loc[changed[1:], "bpm"] = (big.loc[changed[1:], "bpm"].astype(int) + 1).astype("str")
+        extra = big.iloc[[changed[0]]].assign(song_name="Brand New Fight Song")
+        big = pd.concat([big.drop(index=changed[0]), extra], ignore_index=True)
+        big.to_csv(raw_path, index=False)
+
+        start = time.perf_counter()
+        report = incremental_big_data(raw_path, out_path)
+        incremental_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        full_rebuild(raw_path, Path(tmp) / "full.csv")
+        full_s = time.perf_counter() - start
+
+        full_path = Path(tmp) / "full.csv"
+        same = full_path.read_bytes() == out_path.read_bytes() and read_columnar(
+            cache_path(full_path), full_path
+        ).equals(read_columnar(cache_path(out_path), out_path))
+
+        # nothing changed since the last build
+        start = time.perf_counter()
+        incremental_big_data(raw_path, out_path)
+        unchanged_s = time.perf_counter() - start
+
+    print(f"rows: {args.rows:,}")
+    print(
+        f"changes: {len(report['inserted'])} inserted, {len(report['updated'])} updated, "
+        f"{len(report['deleted'])} deleted"
+    )
+    print(f"full rebuild:        {full_s:7.2f} s")
+    print(f"incremental rebuild: {incremental_s:7.2f} s ({full_s / incremental_s:.2f}x)")
+    print(f"no-change rebuild:   {unchanged_s:7.2f} s ({full_s / unchanged_s:.2f}x)")
+    print(f"outputs identical:   {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+from utils.big_data import RAW_PATH
+
+# each mode runs in its own process so peak memory can be read from the os
+CHILD = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+import pandas as pd
+from utils.big_data import stream_big_data
+from utils.schema import apply_schema, read_dtypes
+
+raw, out, chunksize = sys.argv[1], sys.argv[2], int(sys.argv[3])
+start = time.perf_counter()
+if chunksize:
+    stats = stream_big_data(raw, out, chunksize=chunksize)
+    rows = stats["rows_in"]
+else:
+    df = pd.read_csv(raw, dtype=read_dtypes())
+    apply_schema(df[df["conference"] == "Big Ten"]).to_csv(out, index=False)
+    rows = len(df)
+seconds = time.perf_counter() - start
+# high water mark of this process (ru_maxrss would include the parent's usage from before exec)
+with open("/proc/self/status") as f:
+    peak_mb = next(int(line.split()[1]) for line in f if line.startswith("VmHWM")) / 1024
+print(json.dumps({{"rows": rows, "seconds": seconds, "peak_mb": peak_mb}}))
+"""
+
+
+# run one ingest mode in a fresh interpreter
+def run_mode(raw, out, chunksize):
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD.format(root=str(ROOT)), str(raw), str(out), str(chunksize)],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare whole-file and chunked ingest of a large raw file")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--chunksize", type=int, nargs="+", default=[50_000, 200_000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    raw = pd.read_csv(RAW_PATH)
+    rng = np.random.default_rng(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path = Path(tmp) / "raw.csv"
+        out_path = Path(tmp) / "big_ten.csv"
+        raw.iloc[rng.integers(0, len(raw), args.rows)].to_csv(raw_path, index=False)
+        print(f"raw file: {args.rows:,} rows, {raw_path.stat().st_size / 1e6:.1f} MB")
+
+        for chunksize in [0] + args.chunksize:
+            stats = run_mode(raw_path, out_path, chunksize)
+            name = f"chunks of {chunksize:,}" if chunksize else "whole file"
+            print(
+                f"{name:20} {stats['seconds']:7.2f}s  {stats['rows'] / stats['seconds']:12,.0f} rows/s  "
+                f"peak {stats['peak_mb']:8.1f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
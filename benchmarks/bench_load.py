@@ -0,0 +1,55 @@
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd
+from utils.big_data import BIG_TEN_PATH, load_big_data, read_big_csv
+from utils.columnar import cache_path
+
+
+# time a function a number of times, returning the median in milliseconds
+def time_ms(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+# cold load = no cache on disk yet (csv parse + cache write)
+def cold_load(path):
+    cache_path(path).unlink(missing_ok=True)
+    load_big_data(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare csv and columnar cache load times for the Big Ten dataset")
+    parser.add_argument("--repeat", type=int, default=1, help="stack the dataset this many times to test bigger files")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "big_ten_fight_songs.csv"
+        df = read_big_csv(BIG_TEN_PATH)
+        pd.concat([df] * args.repeat, ignore_index=True).to_csv(path, index=False)
+
+        csv_ms = time_ms(lambda: read_big_csv(path), args.runs)
+        cold_ms = time_ms(lambda: cold_load(path), args.runs)
+        load_big_data(path)
+        warm_ms = time_ms(lambda: load_big_data(path), args.runs)
+
+        print(f"rows: {len(df) * args.repeat}")
+        print(f"csv parse:        {csv_ms:9.2f} ms")
+        print(f"cold (no cache):  {cold_ms:9.2f} ms")
+        print(f"warm (cache hit): {warm_ms:9.2f} ms")
+        print(f"speedup vs csv:   {csv_ms / warm_ms:9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+# the pages would otherwise start a background warm-up that competes with the timed reruns
+os.environ["B1G_WARMUP"] = "0"
+
+from streamlit.testing.v1 import AppTest
+from utils.figure_cache import clear_figure_cache
+from utils.timing import TRACE_PATH
+
+PROFILE = "pages/2_School_Profiles.py"
+BATTLE = "pages/3_Battle_of_the_Bands.py"
+
+
+# every element of a rendered page (blocks included)
+def walk(node):
+    yield node
+    for child in getattr(node, "children", {}).values():
+        yield from walk(child)
+
+
+# bytes of the element protos the rerun produced (what the websocket carries, give or take
+# the message framing) and the part of it that is plotly figure specs
+def payload(at):
+    total = plotly = 0
+    for node in walk(at._tree):
+        proto = getattr(node, "proto", None)
+        if proto is None or not hasattr(proto, "ByteSize"):
+            continue
+        total += proto.ByteSize()
+        if node.type == "plotly_chart":
+            plotly += proto.ByteSize()
+    return total, plotly
+
+
+# ms spent in the rank tab sections of the last rerun, from the debug trace
+# (a rerun's spans are written together when it ends, so the last line belongs to it)
+def rank_section_ms():
+    if not TRACE_PATH.exists():
+        return 0.0
+    with open(TRACE_PATH) as f:
+        spans = [json.loads(line) for line in f]
+    if not spans:
+        return 0.0
+    run = spans[-1]["run"]
+    return sum(s["ms"] for s in spans if s["run"] == run and s["depth"] == 0 and s["name"].startswith("rank tab"))
+
+
+def open_page(path):
+    at = AppTest.from_file(str(ROOT / path), default_timeout=120)
+    at.query_params["debug"] = "1"
+    return at.run()
+
+
+# time one rerun: wall time, payload and rank section time
+def timed_run(at, action, cold):
+    if cold:
+        clear_figure_cache()
+    start = time.perf_counter()
+    action(at)
+    at.run()
+    ms = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    total, plotly = payload(at)
+    return {"ms": ms, "rank_ms": rank_section_ms(), "bytes": total, "plotly_bytes": plotly}
+
+
+def scenarios():
+    def profile(at):
+        at.selectbox(key="school_profile").select("Ohio State")
+
+    def profile_tab(at):
+        at.session_state["profile_rank_tab"] = "**Year**"
+
+    def battle_page():
+        at = open_page(BATTLE)
+        at.selectbox(key="school_left").select("Michigan").run()
+        at.selectbox(key="school_right").select("Ohio State").run()
+        at.button[0].click()
+        return at
+
+    def battle_tab(at):
+        at.session_state["battle_rank_tab"] = "**Year**"
+
+    yield "profile: school change", lambda: open_page(PROFILE), profile
+    yield "profile: tab switch", lambda: open_page(PROFILE), profile_tab
+    yield "battle: battle!", battle_page, lambda at: None
+    yield "battle: tab switch", lambda: battle_page().run(), battle_tab
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time page reruns and their payload with streamlit's AppTest")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--warm", action="store_true", help="keep the figure cache between runs")
+    args = parser.parse_args()
+
+    print(f"{'scenario':26} {'rerun ms':>9} {'rank ms':>8} {'payload KB':>11} {'plotly KB':>10}")
+    for name, setup, action in scenarios():
+        runs = [timed_run(setup(), action, not args.warm) for _ in range(args.runs)]
+        print(
+            f"{name:26} {statistics.median(r['ms'] for r in runs):9.1f} "
+            f"{statistics.median(r['rank_ms'] for r in runs):8.1f} "
+            f"{runs[-1]['bytes'] / 1024:11.1f} {runs[-1]['plotly_bytes'] / 1024:10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
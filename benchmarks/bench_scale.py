@@ -0,0 +1,126 @@
+import argparse
+import logging
+import sys
+import tempfile
+import time
+import traceback
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.big_data import big_data, load_big_data
+from utils.columnar import cache_path
+from utils.conferences import build_conferences
+from utils.distance import trope_distances
+from utils.incremental import incremental_big_data
+from utils.ranks import build_rank_index
+from utils.similarity import build_similarity
+from utils.stats import compute_stats
+from utils.synthetic import generate_catalog
+from utils.tropes import pack_tropes, query_tropes
+from utils import visuals
+
+PRIMARY, SECONDARY = "#0085CE", "#B3B3B3"
+
+
+# quiet the "missing ScriptRunContext" warnings charts print outside of a streamlit server
+def quiet_streamlit():
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+
+# run every ingest, aggregate and chart path against a synthetic catalog, one timed step at a time
+def run_all(rows, seed, work_dir, chunksize, skip_charts=False):
+    work_dir = Path(work_dir)
+    raw = work_dir / "raw.csv"
+    out = work_dir / "big_ten.csv"
+    results = []
+
+    def step(group, name, fn):
+        start = time.perf_counter()
+        try:
+            value = fn()
+            error = None
+        except Exception as e:
+            value = None
+            error = f"{type(e).__name__}: {e}"
+            traceback.print_exc()
+        results.append({"group": group, "step": name, "seconds": time.perf_counter() - start, "error": error})
+        return value
+
+    # ingest
+    info = step("generate", f"{rows:,} raw rows", lambda: generate_catalog(raw, rows, seed))
+    step("ingest", "big_data (whole file)", lambda: big_data(raw_path=raw, out_path=out))
+    step("ingest", f"big_data (chunks of {chunksize:,})", lambda: big_data(chunksize, raw, work_dir / "stream.csv"))
+    step("ingest", "incremental (first build)", lambda: incremental_big_data(raw, work_dir / "incremental.csv"))
+    step("ingest", "incremental (no changes)", lambda: incremental_big_data(raw, work_dir / "incremental.csv"))
+    step("ingest", "conference partitions", lambda: build_conferences(raw, work_dir / "conferences", chunksize=chunksize))
+
+    # loads
+    def load_csv():
+        cache_path(out).unlink(missing_ok=True)
+        return load_big_data(out)
+
+    step("load", "csv (rebuilds cache)", load_csv)
+    df = step("load", "columnar cache", lambda: load_big_data(out))
+    if df is None:
+        return info, results
+
+    # aggregates
+    stats = step("aggregate", "conference stats", lambda: compute_stats(df))
+    mask = step("aggregate", "trope mask", lambda: pack_tropes(df))
+    step("aggregate", "trope query", lambda: query_tropes(mask, all_of=["fight"], none_of=["spelling"]))
+    step("aggregate", "centroid distances", lambda: trope_distances(df))
+    ranks = step("aggregate", "rank index", lambda: build_rank_index(df))
+    step("aggregate", "similarity matrix", lambda: build_similarity(df))
+
+    # charts
+    if not skip_charts:
+        # streamlit sets its log levels on first use, so quiet it just before the charts run
+        visuals.st.empty()
+        quiet_streamlit()
+        schools = df["school"].astype("str").unique().tolist()
+        left, right = schools[0], schools[-1]
+        step("chart", "big_radar_plot", lambda: visuals.big_radar_plot(stats))
+        step("chart", "big_tempo_duration", lambda: visuals.big_tempo_duration(df, stats))
+        step("chart", "big_trope_heatmap", lambda: visuals.big_trope_heatmap(df))
+        step("chart", "school_radar_plot", lambda: visuals.school_radar_plot(df, stats, left, PRIMARY))
+        for rank_key in visuals.RANK_CONFIG:
+            step("chart", f"big_ten_rank_bars ({rank_key})", lambda: visuals.big_ten_rank_bars(ranks, left, rank_key, PRIMARY, SECONDARY))
+        step("chart", "dual_school_radar_plot", lambda: visuals.dual_school_radar_plot(df, left, right, PRIMARY, SECONDARY))
+        for rank_key in visuals.RANK_CONFIG:
+            step(
+                "chart", f"big_ten_rank_bars_dual ({rank_key})",
+                lambda: visuals.big_ten_rank_bars_dual(ranks, left, right, rank_key, PRIMARY, SECONDARY, "grey"),
+            )
+        step("chart", "big_tempo_duration_dual", lambda: visuals.big_tempo_duration_dual(df, stats, left, right, PRIMARY, SECONDARY))
+    return info, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run every ingest, aggregate and chart path against a synthetic catalog")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    parser.add_argument("--skip-charts", action="store_true")
+    parser.add_argument("--keep", default=None, help="write the generated files here instead of a temp dir")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(args.keep or tmp)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        info, results = run_all(args.rows, args.seed, work_dir, args.chunksize, args.skip_charts)
+
+    if info:
+        print(f"synthetic catalog: {info['rows']:,} rows, {info['mb']:.1f} MB")
+    for r in results:
+        status = f"FAILED {r['error']}" if r["error"] else ""
+        print(f"{r['group']:10} {r['step']:45} {r['seconds']:9.3f}s  {status}")
+    failed = [r for r in results if r["error"]]
+    print(f"{len(results)} steps, {len(failed)} failed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
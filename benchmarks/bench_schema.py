@@ -0,0 +1,75 @@
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+from utils.big_data import RAW_PATH
+from utils.schema import apply_schema, columns_of, read_dtypes
+
+
+# the original column by column cleaning, kept here as the comparison point
+def legacy_clean(df):
+    df_big = df[df["conference"] == "Big Ten"].copy()
+    for col in columns_of("flag"):
+        df_big[col] = df_big[col].map({'Yes': 1, 'No': 0}).astype(int)
+    df_big['year'] = df_big['year'].astype(int)
+    return df_big
+
+
+# schema driven cleaning used by big_data()
+def schema_clean(df):
+    return apply_schema(df[df["conference"] == "Big Ten"])
+
+
+# best time of `runs` calls in seconds, with the result of the last one
+def timed(fn, *args, runs=1):
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare legacy and schema driven cleaning on a large synthetic raw file")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--runs", type=int, default=3, help="conversions timed per method, the best is reported")
+    args = parser.parse_args()
+
+    # synthetic raw file made by resampling the real rows
+    raw = pd.read_csv(RAW_PATH)
+    rng = np.random.default_rng(args.seed)
+    sample = raw.iloc[rng.integers(0, len(raw), args.rows)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "raw.csv"
+        sample.to_csv(path, index=False)
+
+        legacy_read_s, legacy_raw = timed(pd.read_csv, path)
+        schema_read_s, schema_raw = timed(lambda p: pd.read_csv(p, dtype=read_dtypes()), path)
+
+    legacy_s, legacy_df = timed(legacy_clean, legacy_raw, runs=args.runs)
+    schema_s, schema_df = timed(schema_clean, schema_raw, runs=args.runs)
+
+    print(f"raw rows: {args.rows}, big ten rows: {len(schema_df)}")
+    print(f"{'':18}{'read':>9}{'convert':>10}{'total':>9}{'memory':>11}")
+    for name, read_s, conv_s, out in (
+        ("legacy map chain", legacy_read_s, legacy_s, legacy_df),
+        ("schema pass", schema_read_s, schema_s, schema_df),
+    ):
+        mb = out.memory_usage(deep=True).sum() / 1e6
+        print(f"{name:18}{read_s:8.2f}s{conv_s:9.2f}s{read_s + conv_s:8.2f}s{mb:8.1f} MB")
+    print(f"convert speedup: {legacy_s / schema_s:.2f}x")
+    print(f"read + convert speedup: {(legacy_read_s + legacy_s) / (schema_read_s + schema_s):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
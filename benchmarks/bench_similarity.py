@@ -0,0 +1,46 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+from utils.big_data import get_big_data
+from utils.similarity import build_similarity, closest_schools
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the blockwise school x school similarity matrix on synthetic catalogs")
+    parser.add_argument("--songs", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--songs-per-school", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    songs = get_big_data()
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'songs':>8} {'schools':>8} {'build s':>8} {'matrix MB':>10} {'lookup ms':>10}")
+    for n in args.songs:
+        # copies of the real songs with jittered numbers, spread over synthetic schools
+        df = songs.iloc[rng.integers(0, len(songs), n)].reset_index(drop=True)
+        for col in ("bpm", "sec_duration", "year"):
+            df[col] = df[col] + rng.integers(-5, 6, n).astype(df[col].dtype)
+        df["school"] = [f"School {i // args.songs_per_school}" for i in range(n)]
+
+        start = time.perf_counter()
+        matrix = build_similarity(df)
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for school in matrix.schools[:100]:
+            closest_schools(matrix, school, 5)
+        lookup_ms = (time.perf_counter() - start) / min(100, len(matrix.schools)) * 1000
+
+        print(
+            f"{n:>8,} {len(matrix.schools):>8,} {build_s:8.2f} {matrix.distances.nbytes / 1e6:10.1f} {lookup_ms:10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
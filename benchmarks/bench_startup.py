@@ -0,0 +1,126 @@
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BUDGET_PATH = ROOT / "benchmarks" / "baselines" / "import_budget.json"
+ENTRY_POINTS = [
+    "Home.py",
+    "pages/2_School_Profiles.py",
+    "pages/3_Battle_of_the_Bands.py",
+    "pages/4_Data_Dictionary.py",
+    "pages/5_Methodology.py",
+]
+# modules no entry point should import up front, they are loaded lazily by the code that needs them
+LAZY_MODULES = ["plotly.express"]
+
+# runs in a fresh interpreter: streamlit, then the page's own imports, then its first render
+CHILD = """
+import time
+started = time.time()
+import importlib, json, os, sys
+sys.path.insert(0, os.getcwd())
+start = time.perf_counter()
+import streamlit
+from streamlit.testing.v1 import AppTest
+streamlit_ms = (time.perf_counter() - start) * 1000
+start = time.perf_counter()
+for module in {modules!r}:
+    importlib.import_module(module)
+imports_ms = (time.perf_counter() - start) * 1000
+lazy_loaded = [m for m in {lazy!r} if m in sys.modules]
+start = time.perf_counter()
+at = AppTest.from_file({page!r}, default_timeout=300).run()
+render_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{
+    "started": started, "streamlit_ms": streamlit_ms, "imports_ms": imports_ms, "render_ms": render_ms,
+    "lazy_loaded": lazy_loaded, "exception": bool(at.exception),
+}}))
+"""
+
+
+# modules a page imports at its top level
+def page_imports(page):
+    tree = ast.parse((ROOT / page).read_text())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return [m for m in dict.fromkeys(modules) if m != "streamlit"]
+
+
+# one cold start of an entry point in a new interpreter
+def cold_start(page):
+    env = {**os.environ, "B1G_WARMUP": "0"}
+    code = CHILD.format(modules=page_imports(page), lazy=LAZY_MODULES, page=str(ROOT / page))
+    launched = time.time()
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    total_ms = (time.time() - launched) * 1000
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["interpreter_ms"] = (result.pop("started") - launched) * 1000
+    result["total_ms"] = total_ms
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start of every entry point: interpreter to first render, in a fresh process")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--pages", nargs="+", default=ENTRY_POINTS)
+    parser.add_argument("--budget", default=str(BUDGET_PATH))
+    parser.add_argument("--save-budget", action="store_true", help="write the measured page import times plus headroom as the budget")
+    parser.add_argument("--headroom", type=float, default=0.25, help="budget over the measured import time, 0.25 = 25%%")
+    args = parser.parse_args()
+
+    results = {}
+    print(
+        f"{'entry point':32} {'python ms':>10} {'streamlit ms':>13} {'imports ms':>11} "
+        f"{'render ms':>10} {'total ms':>9}  lazy modules loaded"
+    )
+    for page in args.pages:
+        runs = [cold_start(page) for _ in range(args.runs)]
+        median = {key: statistics.median(r[key] for r in runs) for key in ("interpreter_ms", "streamlit_ms", "imports_ms", "render_ms", "total_ms")}
+        median["lazy_loaded"] = sorted({m for r in runs for m in r["lazy_loaded"]})
+        results[page] = median
+        if any(r["exception"] for r in runs):
+            print(f"{page}: the page raised during its first render")
+        print(
+            f"{page:32} {median['interpreter_ms']:10.1f} {median['streamlit_ms']:13.1f} {median['imports_ms']:11.1f} "
+            f"{median['render_ms']:10.1f} {median['total_ms']:9.1f}  {', '.join(median['lazy_loaded']) or '-'}"
+        )
+
+    budget_path = Path(args.budget)
+    if args.save_budget:
+        budget = {page: round(result["imports_ms"] * (1 + args.headroom), 1) for page, result in results.items()}
+        budget_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(budget_path, "w") as f:
+            json.dump(budget, f, indent=4)
+        print(f"saved import budget to {budget_path}")
+        return
+
+    if not budget_path.exists():
+        return
+    with open(budget_path, "r") as f:
+        budget = json.load(f)
+    failed = [
+        (page, budget[page], result["imports_ms"])
+        for page, result in results.items()
+        if page in budget and result["imports_ms"] > budget[page]
+    ]
+    failed += [(page, "lazy", ", ".join(r["lazy_loaded"])) for page, r in results.items() if r["lazy_loaded"]]
+    for page, limit, value in failed:
+        print(f"OVER BUDGET {page}: {value} (budget {limit})")
+    if failed:
+        sys.exit(1)
+    print(f"every entry point within its import budget ({budget_path})")
+
+
+if __name__ == "__main__":
+    main()
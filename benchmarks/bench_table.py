@@ -0,0 +1,81 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from utils.big_data import RAW_PATH
+from utils.schema import apply_schema
+from utils.synthetic import synthetic_chunk
+from utils.table_index import TEXT_COLUMNS, build_table_index, matching_rows, page_rows
+
+PAGE_SIZE = 25
+
+
+# arrow ipc bytes of a frame, roughly what st.dataframe sends
+def arrow_bytes(df):
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(df)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+# the same query on the frame itself, the way a page would do it on every rerun
+def pandas_query(df, search, sort_by, descending):
+    mask = pd.Series(True, index=df.index)
+    for word in search.lower().split():
+        hits = pd.Series(False, index=df.index)
+        for column in TEXT_COLUMNS:
+            hits |= df[column].astype("string").str.lower().str.contains(rf"\b{word}", regex=True, na=False)
+        mask &= hits
+    return df[mask].sort_values(sort_by, ascending=not descending, kind="stable").head(PAGE_SIZE)
+
+
+def best_ms(fn, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the indexed, paged data dictionary table against querying the frame")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--search", default="ohio state")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    raw = pd.read_csv(RAW_PATH, dtype="str", keep_default_na=False)
+    raw = raw[raw["conference"] == "Big Ten"].reset_index(drop=True)
+
+    print(f"{'rows':>8} {'build ms':>9} {'index ms':>9} {'pandas ms':>10} {'page KB':>8} {'frame KB':>9}")
+    for n in args.rows:
+        df = apply_schema(synthetic_chunk(raw, n, np.random.default_rng(args.seed)))
+        start = time.perf_counter()
+        index = build_table_index(df)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        def indexed():
+            rows = matching_rows(index, args.search, sort_by="bpm", descending=True)
+            return df.iloc[page_rows(rows, 1, PAGE_SIZE)]
+
+        page = indexed()
+        expected = pandas_query(df, args.search, "bpm", True)
+        assert page["bpm"].tolist() == expected["bpm"].tolist(), "indexed and pandas pages differ"
+        print(
+            f"{n:8d} {build_ms:9.1f} {best_ms(indexed, args.runs):9.2f} "
+            f"{best_ms(lambda: pandas_query(df, args.search, 'bpm', True), args.runs):10.2f} "
+            f"{arrow_bytes(page) / 1024:8.1f} {arrow_bytes(df) / 1024:9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
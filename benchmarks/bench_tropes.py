@@ -0,0 +1,70 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+from utils.big_data import get_big_data
+from utils.tropes import TROPES, pack_tropes, query_tropes, trope_counts
+
+# the query both sides answer: fight and victory, rah or nonsense, never spelling
+ALL_OF, ANY_OF, NONE_OF = ["fight", "victory"], ["rah", "nonsense"], ["spelling"]
+
+
+# the sub-frame way the pages work with tropes today
+def frame_query(df):
+    return df[ALL_OF].all(axis=1) & df[ANY_OF].any(axis=1) & ~df[NONE_OF].any(axis=1)
+
+
+def frame_counts(df):
+    return df[TROPES].sum(axis=1)
+
+
+# best of a few runs, in milliseconds
+def best_ms(fn, *args, runs=5):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn(*args)
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare trope queries on flag columns and on the packed uint16 mask")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 5_000_000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # synthetic catalogs drawn from the real big ten songs
+    songs = get_big_data()[TROPES]
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'rows':>12} {'step':10} {'frame ms':>10} {'mask ms':>10} {'speedup':>8}  {'frame MB':>9} {'mask MB':>8}")
+    for rows in args.rows:
+        df = songs.iloc[rng.integers(0, len(songs), rows)].reset_index(drop=True)
+        pack_ms, mask = best_ms(pack_tropes, df, runs=1)
+
+        frame_q, expected = best_ms(frame_query, df)
+        mask_q, got = best_ms(query_tropes, mask, ALL_OF, ANY_OF, NONE_OF)
+        assert np.array_equal(expected.to_numpy(), got)
+
+        frame_c, expected = best_ms(frame_counts, df)
+        mask_c, got = best_ms(trope_counts, mask)
+        assert np.array_equal(expected.to_numpy(), got)
+
+        frame_mb = df.memory_usage(index=False).sum() / 1e6
+        mask_mb = mask.nbytes / 1e6
+        for step, f_ms, m_ms in (("query", frame_q, mask_q), ("popcount", frame_c, mask_c)):
+            print(
+                f"{rows:>12,} {step:10} {f_ms:10.1f} {m_ms:10.1f} {f_ms / m_ms:7.1f}x  "
+                f"{frame_mb:9.1f} {mask_mb:8.1f}"
+            )
+        print(f"{rows:>12,} {'pack':10} {'':>10} {pack_ms:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
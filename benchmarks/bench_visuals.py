@@ -0,0 +1,243 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.basedatatypes import BaseFigure
+from utils import visuals
+from utils.figure_cache import figure_cache_disabled
+from utils.big_data import RAW_PATH, get_big_data
+from utils.ranks import build_rank_index
+from utils.schema import apply_schema
+from utils.stats import compute_stats
+from utils.synthetic import synthetic_chunk
+
+BASELINE_PATH = ROOT / "benchmarks" / "baselines" / "visuals.json"
+PRIMARY, SECONDARY = "#0085CE", "#B3B3B3"
+# figure methods the builders call, timed as figure construction
+FIGURE_METHODS = [
+    "add_trace", "add_traces", "update_layout", "update_traces", "update_xaxes", "update_yaxes",
+    "add_hline", "add_vline", "add_shape", "add_annotation",
+]
+# fixed workload timed in the same run, builders are gated on their time relative to it so the
+# baseline does not depend on how fast the host is
+REFERENCE = "reference"
+_REFERENCE_DATA = pd.DataFrame({"x": [f"s{i}" for i in range(50)], "y": np.linspace(60, 180, 50)})
+
+
+# stands in for streamlit: keeps the last figure handed to plotly_chart and ignores everything else
+class StreamlitStub:
+    def __init__(self):
+        self.figure = None
+
+    def plotly_chart(self, fig, *args, **kwargs):
+        self.figure = fig
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+# time spent inside plotly, only the outermost call counts so nested calls aren't added twice
+class PlotlyTimer:
+    def __init__(self):
+        self.seconds = 0.0
+        self.depth = 0
+
+    def wrap(self, fn):
+        def timed(*args, **kwargs):
+            self.depth += 1
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.seconds += time.perf_counter() - start
+        return timed
+
+
+# module proxy whose callables are timed
+class TimedModule:
+    def __init__(self, module, timer):
+        self._module = module
+        self._timer = timer
+
+    def __getattr__(self, name):
+        value = getattr(self._module, name)
+        return self._timer.wrap(value) if callable(value) else value
+
+
+# swap streamlit for the stub and route plotly calls in utils.visuals through the timer,
+# with the figure cache off so every call times the builder itself
+@contextmanager
+def instrumented(timer, stub):
+    saved = {"st": visuals.st, "go": visuals.go, "px": visuals.px}
+    methods = {name: getattr(BaseFigure, name) for name in FIGURE_METHODS if hasattr(BaseFigure, name)}
+    visuals.st, visuals.go, visuals.px = stub, TimedModule(saved["go"], timer), TimedModule(saved["px"], timer)
+    for name, method in methods.items():
+        setattr(BaseFigure, name, timer.wrap(method))
+    try:
+        with figure_cache_disabled():
+            yield
+    finally:
+        for name, value in saved.items():
+            setattr(visuals, name, value)
+        for name, method in methods.items():
+            setattr(BaseFigure, name, method)
+
+
+# cleaned big ten frame of a given size, the real 18 songs or a synthetic catalog drawn from them
+def dataset(rows, seed):
+    real = get_big_data()
+    if rows <= len(real):
+        return real
+    raw = pd.read_csv(RAW_PATH, dtype="str", keep_default_na=False)
+    raw = raw[raw["conference"] == "Big Ten"].reset_index(drop=True)
+    return apply_schema(synthetic_chunk(raw, rows, np.random.default_rng(seed)))
+
+
+# every builder with its arguments for one dataset
+def cases(df):
+    stats = compute_stats(df)
+    ranks = build_rank_index(df)
+    schools = df["school"].astype("str").unique().tolist()
+    left, right = schools[0], schools[-1]
+    yield "big_radar_plot", lambda: visuals.big_radar_plot(stats)
+    yield "big_tempo_duration", lambda: visuals.big_tempo_duration(df, stats)
+    yield "big_trope_heatmap", lambda: visuals.big_trope_heatmap(df)
+    yield "school_radar_plot", lambda: visuals.school_radar_plot(df, stats, left, PRIMARY)
+    yield "dual_school_radar_plot", lambda: visuals.dual_school_radar_plot(df, left, right, PRIMARY, SECONDARY)
+    yield "big_tempo_duration_dual", lambda: visuals.big_tempo_duration_dual(df, stats, left, right, PRIMARY, SECONDARY)
+    for rank_key in visuals.RANK_CONFIG:
+        yield f"big_ten_rank_bars[{rank_key}]", lambda k=rank_key: visuals.big_ten_rank_bars(ranks, left, k, PRIMARY, SECONDARY)
+        yield (
+            f"big_ten_rank_bars_dual[{rank_key}]",
+            lambda k=rank_key: visuals.big_ten_rank_bars_dual(ranks, left, right, k, PRIMARY, SECONDARY, "grey"),
+        )
+
+
+# pandas prep and a plain plotly bar chart, about the size of one rank bar chart
+def reference_builder():
+    data = _REFERENCE_DATA.sort_values("y", ascending=False)
+    fig = go.Figure(go.Bar(x=data["x"], y=data["y"], marker_color=PRIMARY))
+    fig.update_layout(title="reference", height=400, xaxis_title="school", yaxis_title="bpm")
+    return fig
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q))
+
+
+# time one builder: total, prep (outside plotly) and figure construction, then payload and memory
+def measure(fn, runs):
+    totals, figures = [], []
+    # untimed first call, so one-off costs (plotly validators, lazy imports) are not counted
+    with instrumented(PlotlyTimer(), StreamlitStub()):
+        fn()
+    fig = None
+    for _ in range(runs):
+        timer, stub = PlotlyTimer(), StreamlitStub()
+        with instrumented(timer, stub):
+            start = time.perf_counter()
+            returned = fn()
+            total = time.perf_counter() - start
+        fig = returned if returned is not None else stub.figure
+        totals.append(total * 1000)
+        figures.append(timer.seconds * 1000)
+
+    start = time.perf_counter()
+    payload = fig.to_json() if fig is not None else ""
+    serialize_ms = (time.perf_counter() - start) * 1000
+
+    # memory in a separate run, tracemalloc would skew the timings
+    with instrumented(PlotlyTimer(), StreamlitStub()):
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    preps = [t - f for t, f in zip(totals, figures)]
+    return {
+        "p50_ms": statistics.median(totals),
+        "p95_ms": percentile(totals, 95),
+        "prep_p50_ms": statistics.median(preps),
+        "figure_p50_ms": statistics.median(figures),
+        "serialize_ms": serialize_ms,
+        "payload_kb": len(payload.encode()) / 1024,
+        "peak_mb": peak / 1e6,
+    }
+
+
+# functions whose p50, in multiples of the reference p50, grew past the tolerance compared to the baseline
+def regressions(results, baseline, tolerance):
+    failed = []
+    # tiny timings are mostly noise, give them an absolute floor of 1 ms (in reference units)
+    floor = 1 / results[REFERENCE]["p50_ms"]
+    for key, result in results.items():
+        before = baseline.get(key)
+        if key == REFERENCE or before is None or "p50_ratio" not in before:
+            continue
+        limit = max(before["p50_ratio"] * (1 + tolerance), before["p50_ratio"] + floor)
+        if result["p50_ratio"] > limit:
+            failed.append((key, before["p50_ratio"], result["p50_ratio"]))
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time every chart builder in utils/visuals.py headlessly")
+    parser.add_argument("--rows", type=int, nargs="+", default=[18, 1_000, 10_000])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown relative to the reference, 0.25 = 25%%")
+    args = parser.parse_args()
+
+    results = {REFERENCE: measure(reference_builder, args.runs * 3)}
+    reference_ms = results[REFERENCE]["p50_ms"]
+    print(f"reference builder p50: {reference_ms:.2f} ms")
+    print(
+        f"{'rows':>7} {'function':42} {'p50 ms':>9} {'p95 ms':>9} {'x ref':>7} {'prep':>8} {'figure':>8} "
+        f"{'json ms':>8} {'payload KB':>11} {'peak MB':>8}"
+    )
+    for rows in args.rows:
+        df = dataset(rows, args.seed)
+        for name, fn in cases(df):
+            r = measure(fn, args.runs)
+            r["p50_ratio"] = r["p50_ms"] / reference_ms
+            results[f"{len(df)}:{name}"] = r
+            print(
+                f"{len(df):>7} {name:42} {r['p50_ms']:9.2f} {r['p95_ms']:9.2f} {r['p50_ratio']:7.2f} {r['prep_p50_ms']:8.2f} "
+                f"{r['figure_p50_ms']:8.2f} {r['serialize_ms']:8.2f} {r['payload_kb']:11.1f} {r['peak_mb']:8.2f}"
+            )
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"saved baseline to {baseline_path}")
+        return
+
+    if baseline_path.exists():
+        with open(baseline_path, "r") as f:
+            failed = regressions(results, json.load(f), args.tolerance)
+        for key, before, after in failed:
+            print(f"REGRESSION {key}: {before:.2f}x -> {after:.2f}x the reference")
+        if failed:
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} of {baseline_path} (relative to the reference builder)")
+
+
+if __name__ == "__main__":
+    main()
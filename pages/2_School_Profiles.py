@@ -1,10 +1,18 @@
 import streamlit as st
-from utils.big_data import get_big_data, summary_stats, up_or_down
+from utils.big_data import get_big_data, get_big_stats, summary_stats, up_or_down
 from utils.colors import get_school_colors, load_json
-from utils.components import colored_metric, colored_text, divider, background_band_fill, background_band_fill_side, text_to_paragraphs, tab_styler, pill_button_styler
+from utils.components import colored_metric, colored_text, divider, background_band_fill, background_band_fill_side, text_to_paragraphs, tab_styler, pill_button_styler, lazy_rank_tabs
 from utils.visuals import school_radar_plot, big_ten_rank_bars
+from utils.logos import get_logo
+from utils.ranks import get_rank_index
+from utils.timing import begin_fragment_trace, begin_trace, end_fragment_trace, end_trace, span
+from utils.warmup import start_background_warm_up
 st.set_page_config(page_title="B1G School Profiles", 
                    layout="wide")
+# render timings, shown with ?debug=1
+begin_trace("School Profiles")
+# build every profile and home figure in the background, once per server process
+start_background_warm_up()
 
 # title section
 st.markdown("<h1 style='text-align:center;'>School Profiles</h1>", unsafe_allow_html=True)
@@ -14,6 +22,8 @@ st.markdown("<h4 style='text-align:center;'>A detailed look at each Big Ten figh
 
 # retrieve data
 df = get_big_data()
+# conference aggregates, computed once per dataset version
+stats = get_big_stats()
 # school list
 schools = df['school'].unique().tolist()
 
@@ -39,7 +49,7 @@ SECTEXT = colors["secondary_text"]
 # school profile title
 qs = '"'
 col_text, col_pic = st.columns([2.5, 1])
-with col_text:
+with col_text, span("song info"):
     divider(color=SECONDARY)
     # summary song info
     colored_text(f"{qs}{row['song_name']}{qs}", size="h2", color=PRIMARY, weight="bold")
@@ -49,13 +59,15 @@ with col_text:
     st.markdown(f"**Song Status**: {'Official School Song' if row['official_song'] == 1 else 'Unofficial School Song'}")
     st.markdown(f"**Contest Chosen**: {'Yes' if row['contest'] == 1 else 'No'}")
     divider(color=SECONDARY)
-with col_pic:
-    st.image(f"data/logos/resized/{school}.png", width="stretch")
+with col_pic, span("logo"):
+    st.image(get_logo(school, 400), width="stretch")
 
 # Summary Metrics
 st.header("**Summary Metrics**")
 
-t1, t2, t3, t4, t5, t6 = summary_stats(df)
+t1, t2, t3, t4, t5, t6 = summary_stats(stats)
+fights_avg = stats.mean('number_fights')
+year_avg = stats.mean('year')
 c1, c2, c3, c4, c5 = st.columns(5)
 with c1:
     # Tempo
@@ -95,24 +107,24 @@ with c3:
     st.markdown(m3, unsafe_allow_html=True)
 with c4:
     # fight numbers
-    arr = up_or_down(row['number_fights'], df['number_fights'].mean())
+    arr = up_or_down(row['number_fights'], fights_avg)
     m4 = colored_metric(
         label='Number of "Fights"',
         value=int(row['number_fights']),
         val_color=PRIMARY,
-        delta=f"{arr} {abs(round(row['number_fights'] - df['number_fights'].mean(), 2))} Fights",
+        delta=f"{arr} {abs(round(row['number_fights'] - fights_avg, 2))} Fights",
         delta_b_color=SECONDARY,
         delta_t_color=SECTEXT
     )
     st.markdown(m4, unsafe_allow_html=True)
 with c5:
     # Year Written
-    arr = up_or_down(row['year'], df['year'].mean())
+    arr = up_or_down(row['year'], year_avg)
     m5 = colored_metric(
         label="Year Written",
         value=int(row['year']),
         val_color=PRIMARY,
-        delta=f"{arr} {abs(int(row['year'] - df['year'].mean()))} Years",
+        delta=f"{arr} {abs(int(row['year'] - year_avg))} Years",
         delta_b_color=SECONDARY,
         delta_t_color=SECTEXT
     )
@@ -123,9 +135,9 @@ divider(color=SECONDARY)
 
 # Trope Radar Plot
 col_radar, col_text = st.columns([2, 1])
-with col_radar:
-    school_radar_plot(df, school, school_color=PRIMARY)
-with col_text:
+with col_radar, span("trope radar"):
+    school_radar_plot(df, stats, school, school_color=PRIMARY)
+with col_text, span("trope metrics"):
     st.header("**Trope Metrics**")
     divider(PRIMARY)
     col_school, mid, col_big = st.columns([1, 2, 1])
@@ -145,19 +157,19 @@ with col_text:
     with col_big:
         m1 = colored_metric(
             label="B1G Average",
-            value=round(df['trope_count'].mean(), 2),
+            value=round(t3, 2),
             val_color="rgb(150, 150, 150)"
         )
         st.markdown(m1, unsafe_allow_html=True)
         m2 = colored_metric(
             label="B1G Average",
-            value=round(df['number_fights'].mean(), 2),
+            value=round(fights_avg, 2),
             val_color="rgb(150, 150, 150)"
         )
         st.markdown(m2, unsafe_allow_html=True)
     with mid:
-        trope_delta = round(((row['trope_count'] - df['trope_count'].mean()) / df['trope_count'].mean())*100, 2)
-        arr = up_or_down(row['trope_count'], df['trope_count'].mean())
+        trope_delta = round(((row['trope_count'] - t3) / t3)*100, 2)
+        arr = up_or_down(row['trope_count'], t3)
         m1 = f"""
             <div style="
             font-size: 36px; 
@@ -188,8 +200,8 @@ with col_text:
         </div>
         """ 
         st.markdown(m1, unsafe_allow_html=True)
-        fight_delta = round(((row['number_fights'] - df['number_fights'].mean()) / df['number_fights'].mean())*100, 2)
-        arr1 = up_or_down(row['number_fights'], df['number_fights'].mean())
+        fight_delta = round(((row['number_fights'] - fights_avg) / fights_avg)*100, 2)
+        arr1 = up_or_down(row['number_fights'], fights_avg)
         m2 = f"""
             <div style="
             font-size: 36px; 
@@ -228,33 +240,21 @@ divider(color=SECONDARY)
 # Big Ten Rankings Plots
 st.header("Big Ten Rankings")
 tab_styler(PRIMARY, SECONDARY, SECTEXT)
-tabs = st.tabs(["**Tempo**", "**Duration**", "**Year**", "**Tropes**"])
-col_metric, col_graph =st.columns([0.5, 10])
+# only the open tab's chart is built and sent, switching tabs reruns just this fragment
+@st.fragment
+def rank_tabs(school, color, color2):
+    begin_fragment_trace("School Profiles")
 
-with tabs[0]:
-    rank_choice = "Tempo Rank"
-    fig = big_ten_rank_bars(
-        df, school, rank_choice, PRIMARY, SECONDARY
-    )
-    st.plotly_chart(fig, width="stretch")
-with tabs[1]:
-    rank_choice = "Duration Rank"
-    fig = big_ten_rank_bars(
-        df, school, rank_choice, PRIMARY, SECONDARY
-    )
-    st.plotly_chart(fig, width="stretch")
-with tabs[2]:
-    rank_choice = "Year Written Rank"
-    fig = big_ten_rank_bars(
-        df, school, rank_choice, PRIMARY, SECONDARY
-    )
-    st.plotly_chart(fig, width="stretch")
-with tabs[3]:
-    rank_choice = "Trope Density Rank"
-    fig = big_ten_rank_bars(
-        df, school, rank_choice, PRIMARY, SECONDARY
-    )
-    st.plotly_chart(fig, width="stretch")
+    def render(rank_key):
+        fig = big_ten_rank_bars(get_rank_index(), school, rank_key, color, color2)
+        with span("st.plotly_chart"):
+            st.plotly_chart(fig, width="stretch")
+
+    lazy_rank_tabs("profile_rank_tab", render)
+    end_fragment_trace()
+
+rank_tabs(school, PRIMARY, SECONDARY)
+col_metric, col_graph =st.columns([0.5, 10])
 
 st.caption(f"""These plots show the ranking of the **{school}** fight song amongst the other Big Ten schools. 
            It compares the features of *Tempo*, *Duration*, *Year Written*, and *Trope Counts*. 
@@ -266,7 +266,7 @@ divider(SECONDARY)
 st.header("**Preview**")
 
 col_vid, col_text = st.columns([2, 1])
-with col_vid:
+with col_vid, span("video preview"):
     yt_url = load_json("data/videos/yt_vids.json").get(school)
     st.video(yt_url)
 with col_text:
@@ -360,3 +360,6 @@ st.sidebar.markdown(background_band_fill_side(
         text_color=SECTEXT,
         border=True,
         border_color=PRIMARY), unsafe_allow_html=True)
+
+# write this rerun's render timings
+end_trace()
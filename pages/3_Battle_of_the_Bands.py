@@ -1,11 +1,20 @@
 import streamlit as st
-from utils.big_data import get_big_data, up_or_down
-from utils.colors import get_school_colors
-from utils.components import colored_metric, divider, background_band_fill_side, tab_styler, pill_button_styler
+from utils.big_data import get_big_data, get_big_stats, nearest_rivals
+from utils.compare import compare
+from utils.colors import get_palettes
+from utils.components import colored_metric, divider, background_band_fill_side, tab_styler, pill_button_styler, lazy_rank_tabs
 from utils.visuals import dual_school_radar_plot, big_ten_rank_bars_dual, big_tempo_duration_dual
+from utils.logos import get_logo
+from utils.ranks import get_rank_index
+from utils.timing import begin_fragment_trace, begin_trace, end_fragment_trace, end_trace, span
+from utils.warmup import start_background_warm_up
 
 st.set_page_config(page_title="Battle of the Bands", 
                    layout="wide")
+# render timings, shown with ?debug=1
+begin_trace("Battle of the Bands")
+# build every profile and home figure in the background, once per server process
+start_background_warm_up()
 # title + caption
 st.markdown("<h1 style='text-align:center;'>Battle of the Bands</h1>", unsafe_allow_html=True)
 
@@ -13,6 +22,7 @@ st.markdown("<h4 style='text-align:center;'>A comparative analysis between Big T
 
 # retrieve data
 df = get_big_data()
+stats = get_big_stats()
 
 # get unique school list
 schools = sorted(df['school'].unique().tolist())
@@ -21,6 +31,11 @@ schools = sorted(df['school'].unique().tolist())
 if "battle_selection" not in st.session_state:
     st.session_state.battle_selection = {"school1": None, "school2": None}
 
+# suggest the closest matchups for a selected school
+def rival_suggestions(school):
+    rivals = ", ".join(f"<b>{rival}</b>" for rival, _ in nearest_rivals(school, 3))
+    st.markdown(f"<p style='text-align:center;'>Closest matchups: {rivals}</p>", unsafe_allow_html=True)
+
 # side-by-side columns to select schools and defaulting to any saved picks
 c1, nan, c3 = st.columns([3, 4, 3])
 with c1:
@@ -59,31 +74,33 @@ elif school1 is None:
     with nan:
         a, col2, d = st.columns([7.5, 2.5, 1])
         with col2:
-            st.image(f"data/logos/resized/{school2}.png", width="stretch")
+            st.image(get_logo(school2, 240), width="stretch")
         with a:
             st.markdown("")
             st.markdown("<h3 style='text-align:center;'>← Select School</h3>", unsafe_allow_html=True)
+            rival_suggestions(school2)
             st.stop()
 elif school2 is None:
     st.sidebar.header('Select Second School!')
     with nan:
         a, col1, d  = st.columns([1, 2.5, 7.5])
         with col1:
-            st.image(f"data/logos/resized/{school1}.png", width="stretch")
+            st.image(get_logo(school1, 240), width="stretch")
         with d:
             st.markdown("")
             st.markdown("<h3 style='text-align:center;'>Select School →</h3>", unsafe_allow_html=True)
+            rival_suggestions(school1)
             st.stop()
 else:
     with nan:
         a, col1, b, vs, c, col2, d = st.columns([1, 2.5, 1, 2, 1, 2.5, 1])
         with col1:
-            st.image(f"data/logos/resized/{school1}.png", width="stretch")
+            st.image(get_logo(school1, 240), width="stretch")
         with vs:
             #st.markdown("")
             st.markdown("<h1 style='text-align:center;'>VS</h1>", unsafe_allow_html=True)
         with col2:
-            st.image(f"data/logos/resized/{school2}.png", width="stretch")
+            st.image(get_logo(school2, 240), width="stretch")
 
 # create session states
 if "battle_mode" not in st.session_state:
@@ -113,14 +130,17 @@ if not st.session_state.battle_mode:
     st.stop()
 '---'
 
+# both palettes in one lookup
+palettes = get_palettes([school1, school2])
+
 # set colors1
-colors1 = get_school_colors(school1)
+colors1 = palettes[school1]
 PRIMARY1 = colors1["primary"]
 SECONDARY1 = colors1["secondary"]
 SECTEXT1 = colors1["secondary_text"]
 
 # set colors2
-colors2 = get_school_colors(school2)
+colors2 = palettes[school2]
 PRIMARY2 = colors2["primary"]
 SECONDARY2 = colors2["secondary"]
 SECTEXT2 = colors2["secondary_text"]
@@ -132,7 +152,7 @@ row2 = df.loc[df['school'] == school2].iloc[0]
 # song titles + school song info
 qs = '"'
 col1, col2 = st.columns(2)
-with col1:
+with col1, span("song info: left"):
     st.markdown(f"<h2 style='text-align:left;color:{PRIMARY1}'>{qs}{row1['song_name']}{qs}</h2>", unsafe_allow_html=True)
     # writers
     st.markdown(
@@ -174,7 +194,7 @@ with col1:
             """,
             unsafe_allow_html=True
     )
-with col2:
+with col2, span("song info: right"):
     st.markdown(f"<h2 style='text-align:right;color:{PRIMARY2}'>{qs}{row2['song_name']}{qs}</h2>", unsafe_allow_html=True)
     # writers
     st.markdown(
@@ -226,252 +246,37 @@ with b:
 
 # battling metrics
 right_b, met1, arrow, met2, left_b = st.columns([2, 2, 2, 2, 2])
+# winners, deltas and ties of every metric, cached per pair
+comparison = compare(school1, school2)
 
-with met1:
-    
-    # tempo
-    if (row1['bpm'] > row2['bpm']):
-        delta_v = f"{up_or_down(row1['bpm'], row2['bpm'])} {round(100*(row1['bpm'] - row2['bpm']) / row2['bpm'], 2)}%"
-        b = SECONDARY1
-        t = SECTEXT1
-    elif row1['bpm'] == row2['bpm']:
-        delta_v = "Tie!"
-        b = SECONDARY1
-        t = SECTEXT1
-    else:
-        delta_v = "'"
-        t = "#F9F6EE"
-        b = "#F9F6EE"
-    color1 = (PRIMARY1 if row1['bpm'] >= row2['bpm'] else "grey")
-    m1 = colored_metric(label="Tempo (BPM)", value=row1['bpm'], val_color=color1, delta=delta_v, delta_b_color=b, delta_t_color=t)
-    for i in range(2):
-        st.markdown("")
-    st.markdown(m1, unsafe_allow_html=True)
-
-    # duration
-    if (row1['sec_duration'] > row2['sec_duration']):
-        delta_v = f"{up_or_down(row1['sec_duration'], row2['sec_duration'])} {round(100*(row1['sec_duration'] - row2['sec_duration']) / row2['sec_duration'], 2)}%"
-        b = SECONDARY1
-        t = SECTEXT1
-    elif row1['sec_duration'] == row2['sec_duration']:
-        delta_v = "Tie!"
-        b = SECONDARY1
-        t = SECTEXT1
-    else:
-        delta_v = "'"
-        t = "#F9F6EE"
-        b = "#F9F6EE"
-    color2 = (PRIMARY1 if row1['sec_duration'] >= row2['sec_duration'] else "grey")
-    m2 = colored_metric(label="Duration (Seconds)", value=row1['sec_duration'], val_color=color2, delta=delta_v, delta_b_color=b, delta_t_color=t)
-    for i in range(2):
-        st.markdown("")
-    st.markdown(m2, unsafe_allow_html=True)
-
-    # year written
-    if (row1['year'] < row2['year']):
-        delta_v = f"{up_or_down(row1['year'], row2['year'])} {(row2['year'] - row1['year'])} Years"
-        b = SECONDARY1
-        t = SECTEXT1
-    elif row1['year'] == row2['year']:
-        delta_v = "Tie!"
-        b = SECONDARY1
-        t = SECTEXT1
-    else:
-        delta_v = "'"
-        t = "#F9F6EE"
-        b = "#F9F6EE"
-    color3 = (PRIMARY1 if row1['year'] <= row2['year'] else "grey")
-    m3 = colored_metric(label="Year Written", value=row1['year'], val_color=color3, delta=delta_v, delta_b_color=b, delta_t_color=t)
-    for i in range(2):
-        st.markdown("")
-    st.markdown(m3, unsafe_allow_html=True)
-
-    # trope count
-    if (row1['trope_count'] > row2['trope_count']):
-        delta_v = f"{up_or_down(row1['trope_count'], row2['trope_count'])} {(row1['trope_count'] - row2['trope_count'])} Tropes"
-        b = SECONDARY1
-        t = SECTEXT1
-    elif row1['trope_count'] == row2['trope_count']:
-        delta_v = "Tie!"
-        b = SECONDARY1
-        t = SECTEXT1
-    else:
-        delta_v = "'"
-        t = "#F9F6EE"
-        b = "#F9F6EE"
-    color4 = (PRIMARY1 if row1['trope_count'] >= row2['trope_count'] else "grey")
-    m4 = colored_metric(label="Trope Count", value=row1['trope_count'], val_color=color4, delta=delta_v, delta_b_color=b, delta_t_color=t)
-    for i in range(2):
-        st.markdown("")
-    st.markdown(m4, unsafe_allow_html=True)
-    
-    # fight count
-    if (row1['number_fights'] > row2['number_fights']):
-        delta_v = f"{up_or_down(row1['number_fights'], row2['number_fights'])} {(row1['number_fights'] - row2['number_fights'])} Fights"
-        b = SECONDARY1
-        t = SECTEXT1
-    elif row1['number_fights'] == row2['number_fights']:
-        delta_v = "Tie!"
-        b = SECONDARY1
-        t = SECTEXT1
-    else:
-        delta_v = "'"
-        t = "#F9F6EE"
-        b = "#F9F6EE"
-    color5 = (PRIMARY1 if row1['number_fights'] >= row2['number_fights'] else "grey")
-    m5 = colored_metric(label="Fight Count", value=row1['number_fights'], val_color=color5, delta=delta_v, delta_b_color=b, delta_t_color=t)
-    for i in range(2):
-        st.markdown("")
-    st.markdown(m5, unsafe_allow_html=True)
-    
-
-with met2:
-    # tempo
-    if (row1['bpm'] < row2['bpm']):
-        delta_v = f"{up_or_down(row2['bpm'], row1['bpm'])} {round(100*(row2['bpm'] - row1['bpm'])/row1['bpm'], 2)}%"
-        b = SECONDARY2
-        t = SECTEXT2
-    elif row1['bpm'] == row2['bpm']:
-        delta_v = "Tie!"
-        b = SECONDARY2
-        t = SECTEXT2
-    else:
-        delta_v = "'"
-        t = "#F9F6EE"
-        b = "#F9F6EE"
-    color = (PRIMARY2 if (row1['bpm'] <= row2['bpm']) else "grey")
-    m1 = colored_metric(label="Tempo (BPM)", value=row2['bpm'], val_color=color, align="right", delta=delta_v, delta_b_color=b, delta_t_color=t)
-    for i in range(2):
-        st.markdown("")
-    st.markdown(m1, unsafe_allow_html=True)
-
-    # duration
-    if (row1['sec_duration'] < row2['sec_duration']):
-        delta_v = f"{up_or_down(row2['sec_duration'], row1['sec_duration'])} {round(100*(row2['sec_duration'] - row1['sec_duration']) / row1['sec_duration'], 2)}%"
-        b = SECONDARY2
-        t = SECTEXT2
-    elif row1['sec_duration'] == row2['sec_duration']:
-        delta_v = "Tie!"
-        b = SECONDARY2
-        t = SECTEXT2
-    else:
-        delta_v = "'"
-        t = "#F9F6EE"
-        b = "#F9F6EE"
-    color2 = (PRIMARY2 if (row1['sec_duration'] <= row2['sec_duration']) else "grey")
-    m2 = colored_metric(label="Duration (Seconds)", value=row2['sec_duration'], val_color=color2, align="right", delta=delta_v, delta_b_color=b, delta_t_color=t)
-    for i in range(2):
-        st.markdown("")
-    st.markdown(m2, unsafe_allow_html=True)
-
-    # year written
-    if (row1['year'] > row2['year']):
-        delta_v = f"{up_or_down(row2['year'], row1['year'])} {abs(row2['year'] - row1['year'])} Years"
-        b = SECONDARY2
-        t = SECTEXT2
-    elif row1['year'] == row2['year']:
-        delta_v = "Tie!"
-        b = SECONDARY2
-        t = SECTEXT2
-    else:
-        delta_v = "'"
-        t = "#F9F6EE"
-        b = "#F9F6EE"
-    color3 = (PRIMARY2 if row1['year'] >= row2['year'] else "grey")
-    m3 = colored_metric(label="Year Written", value=row2['year'], val_color=color3, align="right", delta=delta_v, delta_b_color=b, delta_t_color=t)
-    for i in range(2):
-        st.markdown("")
-    st.markdown(m3, unsafe_allow_html=True)
-
-    # trope count
-    if (row1['trope_count'] < row2['trope_count']):
-        delta_v = f"{up_or_down(row2['trope_count'], row1['trope_count'])} {(row2['trope_count'] - row1['trope_count'])} Tropes"
-        b = SECONDARY2
-        t = SECTEXT2
-    elif row1['trope_count'] == row2['trope_count']:
-        delta_v = "Tie!"
-        b = SECONDARY2
-        t = SECTEXT2
-    else:
-        delta_v = "'"
-        t = "#F9F6EE"
-        b = "#F9F6EE"
-    color4 = (PRIMARY2 if row1['trope_count'] <= row2['trope_count'] else "grey")
-    m4 = colored_metric(label="Trope Count", value=row2['trope_count'], val_color=color4, align="right", delta=delta_v, delta_b_color=b, delta_t_color=t)
-    for i in range(2):
-        st.markdown("")
-    st.markdown(m4, unsafe_allow_html=True)
-    
-    # fight count
-    if (row1['number_fights'] < row2['number_fights']):
-        delta_v = f"{up_or_down(row2['number_fights'], row1['number_fights'])} {(row2['number_fights'] - row1['number_fights'])} Fights"
-        b = SECONDARY2
-        t = SECTEXT2
-    elif row1['number_fights'] == row2['number_fights']:
-        delta_v = "Tie!"
-        b = SECONDARY2
-        t = SECTEXT2
+
+# one side of a metric, the value is in school colors and gets the delta pill when it wins or ties
+def battle_metric(result, side, primary, secondary, sectext):
+    if result.wins(side):
+        val_color, delta_v, b, t = primary, result.delta_text(), secondary, sectext
     else:
-        delta_v = "'"
-        t = "#F9F6EE"
-        b = "#F9F6EE"
-    color5 = (PRIMARY2 if row1['number_fights'] <= row2['number_fights'] else "grey")
-    m5 = colored_metric(label="Fight Count", value=row2['number_fights'], val_color=color5, align="right", delta=delta_v, delta_b_color=b, delta_t_color=t)
+        val_color, delta_v, b, t = "grey", "'", "#F9F6EE", "#F9F6EE"
+    m = colored_metric(label=result.label, value=result.value(side), val_color=val_color, align=side,
+                       delta=delta_v, delta_b_color=b, delta_t_color=t)
     for i in range(2):
         st.markdown("")
-    st.markdown(m5, unsafe_allow_html=True)
-    
-with arrow:
-    # tempo
-    if row1['bpm'] == row2['bpm']:
-        v = "="
-    elif row1['bpm'] > row2['bpm']:
-        v = "←"
-    else:
-        v = "→"
-    for i in range(3):
-        st.markdown("")
-    st.markdown(f"""<div style="font-size: 100px;font-weight: 700;text-align: center;line-height: 1;">{v}</div>""", unsafe_allow_html=True)
-    # duration
-    if row1['sec_duration'] == row2['sec_duration']:
-        v = "="
-    elif row1['sec_duration'] > row2['sec_duration']:
-        v = "←"
-    else:
-        v = "→"
-    for i in range(3):
-        st.markdown("")
-    st.markdown(f"""<div style="font-size: 100px;font-weight: 700;text-align: center;line-height: 1;">{v}</div>""", unsafe_allow_html=True)
-    # year
-    if row1['year'] == row2['year']:
-        v = "="
-    elif row1['year'] > row2['year']:
-        v = "→"
-    else:
-        v = "←"
-    for i in range(3):
-        st.markdown("")
-    st.markdown(f"""<div style="font-size: 100px;font-weight: 700;text-align: center;line-height: 1;">{v}</div>""", unsafe_allow_html=True)
-    # trope count
-    if row1['trope_count'] == row2['trope_count']:
-        v = "="
-    elif row1['trope_count'] > row2['trope_count']:
-        v = "←"
-    else:
-        v = "→"
-    for i in range(3):
-        st.markdown("")
-    st.markdown(f"""<div style="font-size: 100px;font-weight: 700;text-align: center;line-height: 1;">{v}</div>""", unsafe_allow_html=True)
-    # fight count
-    if row1['number_fights'] == row2['number_fights']:
-        v = "="
-    elif row1['number_fights'] > row2['number_fights']:
-        v = "←"
-    else:
-        v = "→"
-    for i in range(3):
-        st.markdown("")
-    st.markdown(f"""<div style="font-size: 100px;font-weight: 700;text-align: center;line-height: 1;">{v}</div>""", unsafe_allow_html=True)
+    st.markdown(m, unsafe_allow_html=True)
+
+
+with met1, span("metrics column: left"):
+    for result in comparison:
+        battle_metric(result, "left", PRIMARY1, SECONDARY1, SECTEXT1)
+
+with met2, span("metrics column: right"):
+    for result in comparison:
+        battle_metric(result, "right", PRIMARY2, SECONDARY2, SECTEXT2)
+
+with arrow, span("metrics column: arrows"):
+    # arrows point at the winner
+    for result in comparison:
+        for i in range(3):
+            st.markdown("")
+        st.markdown(f"""<div style="font-size: 100px;font-weight: 700;text-align: center;line-height: 1;">{result.arrow}</div>""", unsafe_allow_html=True)
 
 st.markdown(f"""
             <p style="text-align:center; font-size:0.9rem; color:#6b6b6b;">
@@ -500,33 +305,21 @@ st.markdown(
 
 # ranking chart with both schools
 tab_styler("grey", "#969696", "white")
-tabs = st.tabs(["**Tempo**", "**Duration**", "**Year**", "**Tropes**"])
-col_metric, col_graph =st.columns([0.5, 10])
+# only the open tab's chart is built and sent, switching tabs reruns just this fragment
+@st.fragment
+def rank_tabs(school1, school2, color1, color2):
+    begin_fragment_trace("Battle of the Bands")
 
-with tabs[0]:
-    rank_choice = "Tempo Rank"
-    fig = big_ten_rank_bars_dual(
-        df, school1, school2, rank_choice, PRIMARY1, PRIMARY2, "grey"
-    )
-    st.plotly_chart(fig, width="stretch")
-with tabs[1]:
-    rank_choice = "Duration Rank"
-    fig = big_ten_rank_bars_dual(
-        df, school1, school2, rank_choice, PRIMARY1, PRIMARY2, "grey"
-    )
-    st.plotly_chart(fig, width="stretch")
-with tabs[2]:
-    rank_choice = "Year Written Rank"
-    fig = big_ten_rank_bars_dual(
-        df, school1, school2, rank_choice, PRIMARY1, PRIMARY2, "grey"
-    )
-    st.plotly_chart(fig, width="stretch")
-with tabs[3]:
-    rank_choice = "Trope Density Rank"
-    fig = big_ten_rank_bars_dual(
-        df, school1, school2, rank_choice, PRIMARY1, PRIMARY2, "grey"
-    )
-    st.plotly_chart(fig, width="stretch")
+    def render(rank_key):
+        fig = big_ten_rank_bars_dual(get_rank_index(), school1, school2, rank_key, color1, color2, "grey")
+        with span("st.plotly_chart"):
+            st.plotly_chart(fig, width="stretch")
+
+    lazy_rank_tabs("battle_rank_tab", render)
+    end_fragment_trace()
+
+rank_tabs(school1, school2, PRIMARY1, PRIMARY2)
+col_metric, col_graph =st.columns([0.5, 10])
 
 st.markdown(
     f"""
@@ -546,8 +339,9 @@ st.markdown(
 
 '---'
 
-chart = big_tempo_duration_dual(df, school1, school2, PRIMARY1, PRIMARY2)
-st.plotly_chart(chart, theme="streamlit", width="stretch")
+chart = big_tempo_duration_dual(df, stats, school1, school2, PRIMARY1, PRIMARY2)
+with span("st.plotly_chart"):
+    st.plotly_chart(chart, theme="streamlit", width="stretch")
 
 st.markdown(
     f"""
@@ -627,3 +421,6 @@ st.sidebar.markdown(background_band_fill_side(
     border=True,
     border_color="grey"
 ), unsafe_allow_html=True)
+
+# write this rerun's render timings
+end_trace()
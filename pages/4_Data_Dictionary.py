@@ -1,9 +1,14 @@
 import streamlit as st
-import pandas as pd
-from utils.components import styled_section_df, pill_button_styler, background_band_fill_side
+from utils.big_data import get_big_data, get_raw_data
+from utils.components import PROFILE_COLUMNS, styled_section_df, profile_section_df, pill_button_styler, background_band_fill_side, paged_table
+from utils.profiling import get_profile
+from utils.table_index import get_table_index
+from utils.timing import begin_fragment_trace, begin_trace, end_fragment_trace, end_trace
 
 st.set_page_config(page_title="Data Dictionary", 
                    layout="wide")
+# render timings, shown with ?debug=1
+begin_trace("Data Dictionary")
 
 # title + caption
 st.markdown("<h1 style='text-align:center;'>Data Dictionary</h1>", unsafe_allow_html=True)
@@ -71,61 +76,60 @@ palette = {
     "name_color": "#0085CE",
 }
 
-# show all the dataframes
-st.header("Core Metadata")
-st.dataframe(
-    styled_section_df(core_metadata, **palette),
-    hide_index=True,
-    width="stretch",
+# column profiles (nulls, distinct values, ranges, histograms, top values) shown next to each table
+profile_name = st.radio(
+    "Column profiles from",
+    ["big_ten", "raw"],
+    format_func=lambda name: {"big_ten": "Big Ten Dataset (cleaned)", "raw": "Raw Dataset (original)"}[name],
+    horizontal=True,
+    key="profile_dataset",
 )
+profile = get_profile(profile_name)
+st.caption(f"Profiled over all {profile.rows} rows. Computed and external variables are not stored, so they have no profile.")
 
-st.header("Audio Metrics")
-st.dataframe(
-    styled_section_df(audio_metrics, **palette),
-    hide_index=True,
-    width="stretch",
-)
 
-st.header("Lyrical / Trope Features")
-st.dataframe(
-    styled_section_df(lyrical_tropes, **palette),
-    hide_index=True,
-    width="stretch",
-)
+# description table of a section with the profile of its variables next to it
+def dictionary_section(title, rows):
+    st.header(title)
+    profile_df = profile_section_df(rows, profile)
+    if profile_df is None:
+        st.dataframe(styled_section_df(rows, **palette), hide_index=True, width="stretch")
+        return
+    col_desc, col_profile = st.columns([1, 1])
+    with col_desc:
+        st.dataframe(styled_section_df(rows, **palette), hide_index=True, width="stretch")
+    with col_profile:
+        st.dataframe(profile_df, hide_index=True, width="stretch", column_config=PROFILE_COLUMNS)
 
-st.header("Miscellaneous Variables")
-st.dataframe(
-    styled_section_df(misc_variables, **palette),
-    hide_index=True,
-    width="stretch",
-)
 
-st.header("Computed Metrics (not stored)")
-st.dataframe(
-    styled_section_df(computed_metrics, **palette),
-    hide_index=True,
-    width="stretch",
-)
-
-st.header("External Metadata (colors, images)")
-st.dataframe(
-    styled_section_df(external_metadata, **palette),
-    hide_index=True,
-    width="stretch",
-)
+# show all the dataframes
+dictionary_section("Core Metadata", core_metadata)
+dictionary_section("Audio Metrics", audio_metrics)
+dictionary_section("Lyrical / Trope Features", lyrical_tropes)
+dictionary_section("Miscellaneous Variables", misc_variables)
+dictionary_section("Computed Metrics (not stored)", computed_metrics)
+dictionary_section("External Metadata (colors, images)", external_metadata)
 
 '---'
 
 # explore other pages
 st.header("Explore the Data")
+
+
+# searched, sorted and paged on the server, a page change only reruns its own table
+@st.fragment
+def explorer(key, df, name):
+    begin_fragment_trace("Data Dictionary")
+    paged_table(key, df, get_table_index(name))
+    end_fragment_trace()
+
+
 st.subheader("Big Ten Dataset (cleaned)")
-big_ten_df = pd.read_csv("data/B1G/big_ten_fight_songs.csv")
-st.dataframe(big_ten_df, width="stretch")
+explorer("big_ten_table", get_big_data(), "big_ten")
 
 st.subheader("Raw Dataset (original)")
-raw_df = pd.read_csv("data/raw/fight-songs-updated.csv")
-st.dataframe(raw_df, width="stretch")
-st.caption("Tip: click column headers to sort or use the search box to filter rows.")
+explorer("raw_table", get_raw_data(), "raw")
+st.caption("Tip: search by school, song name or writers, pick a column to sort by, filter a numeric column to a range, or keep only songs with (or without) certain tropes.")
 
 '---'
 
@@ -180,3 +184,6 @@ st.sidebar.markdown(background_band_fill_side(
         text_color="#000000",
         border=True,
         border_color="#0085CE"), unsafe_allow_html=True)
+
+# write this rerun's render timings
+end_trace()
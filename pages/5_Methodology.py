@@ -1,10 +1,13 @@
 import streamlit as st
 from utils.components import background_band_fill_side, colored_text, pill_button_styler
 from utils.big_data import get_big_data
-from utils.colors import get_school_colors, load_json
+from utils.colors import get_palettes, load_json
+from utils.timing import begin_trace, end_trace
 
 st.set_page_config(page_title="Methodology", 
                    layout="wide")
+# render timings, shown with ?debug=1
+begin_trace("Methodology")
 # define the big ten blue color
 PRIMARY = "#0085CE" 
 # get data
@@ -90,10 +93,11 @@ st.markdown("""
             schools' braning and images guidelines. The hex codes for each school were found from the respective pages:
             """)
 links = load_json("data/colors/color_links.json")
+palettes = get_palettes(schools)
 for school in schools:
     st.markdown(
     f"""
-    - <span style="color:{get_school_colors(school)['primary']};">{school}</span>
+    - <span style="color:{palettes[school].primary};">{school}</span>
     <span style="color:#000000;">: {links[school]}</span>
     """,
     unsafe_allow_html=True
@@ -129,34 +133,35 @@ st.subheader('Big Ten Dataset')
 st.markdown("""
             The Big Ten dataset was created by taking the *fight-songs-updated.csv* file and running it through a cleaning function.
             The main function was replacing binary columns with "Yes" and "No" into integers 1 and 0, respectively. This allowed
-            for numerical analysis on the binary columns. Visually there was no data missing, and all suspected numerical 
+            for numerical analysis on the binary columns. Every raw column is described in a schema (*utils/schema.py*), which
+            converts the whole table in one pass and stops with an error naming the column and rows if a value doesn't fit. Visually there was no data missing, and all suspected numerical 
             variables were correctly identified as numerical. This function, when ran, created the Big Ten dataset and put 
             it in the **data/B1G/big_ten_fight_songs.csv** folder.
 
             Below is the big_data function which creates the dataset. This function needs to be run independently in order 
             for the dataset to be created, if this project were to be reproduced.
             """)
-st.code("""def big_data():
+st.code("""RAW_SCHEMA = {
+    "school": "category",
+    "conference": "category",
+    "song_name": "text",
+    "writers": "text",
+    "year": "year",
+    "student_writer": "flag",
+    ...
+    "bpm": "int16",
+    "sec_duration": "int16",
+    "number_fights": "int8",
+    "trope_count": "int8",
+    "spotify_id": "text",
+}
+
+def big_data():
     # read in raw data
-    df = pd.read_csv("data/raw/fight-songs-updated.csv")
-    # create b1g dataset
-    df_big = df[df["conference"] == "Big Ten"]
-    df_big['spelling'] = df_big['spelling'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['opponents'] = df_big['opponents'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['men'] = df_big['men'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['colors'] = df_big['colors'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['nonsense'] = df_big['nonsense'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['rah'] = df_big['rah'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['win_won'] = df_big['win_won'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['victory'] = df_big['victory'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['fight'] = df_big['fight'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['victory_win_won'] = df_big['victory_win_won'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['contest'] = df_big['contest'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['official_song'] = df_big['official_song'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['student_writer'] = df_big['student_writer'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['year'] = df_big['year'].astype(int)
-    df_big.to_csv("data/B1G/big_ten_fight_songs.csv", index=False)
-    
+    df = pd.read_csv(RAW_PATH, dtype=read_dtypes())
+    # keep the big ten rows and convert every column to its cleaned type in one pass
+    df_big = apply_schema(df[df["conference"] == "Big Ten"])
+    df_big.to_csv(BIG_TEN_PATH, index=False)
         """)
 
 st.subheader("Images")
@@ -167,6 +172,14 @@ st.markdown("""
             each page and for each school.
 
             The original images were placed in **data/logos/original** and the new resized images were placed in **data/logos/resized**.
+            Both are listed for every school, and for the Big Ten, in *data/logos/manifest.json*.
+
+            The pages don't show these files directly. Running `python -m utils.logos` (or the background warm-up when the
+            build is missing or a logo changed) reads the manifest and encodes each logo as PNG at several widths, with the
+            content hash in each file name, into **data/logos/built** next to an *index.json*. Each page is given the smallest
+            width that covers where the logo is shown. The SVG originals are only rasterized when the optional *cairosvg*
+            package is installed; without it, which is the default install, every width is downscaled from the resized PNG.
+            Until a build exists, or when the folder can't be written, the pages show the resized PNGs as they are.
             """)
 
 '---'
@@ -338,3 +351,6 @@ st.sidebar.markdown(background_band_fill_side(
         text_color="#000000",
         border=True,
         border_color="#0085CE"), unsafe_allow_html=True)
+
+# write this rerun's render timings
+end_trace()
@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd
+import pytest
+from utils.big_data import get_big_data
+from utils.compare import BATTLE_METRICS, build_comparison
+
+
+def frame(**columns):
+    return pd.DataFrame({"school": ["A", "B"], **columns})
+
+
+# int16 columns as stored by big_data, a difference this large overflows int16
+def test_large_difference_does_not_overflow():
+    metrics = {
+        "sec_duration": {"label": "Duration (Seconds)", "higher_wins": True, "unit": "%"},
+        "year": {"label": "Year Written", "higher_wins": False, "unit": "Years"},
+    }
+    df = frame(
+        sec_duration=pd.Series([30000, 100], dtype="int16"),
+        year=pd.Series([-30000, 30000], dtype="int16"),
+    )
+    result = build_comparison(df, "A", "B", metrics)
+
+    duration = result["sec_duration"]
+    assert duration.winner == "left"
+    assert duration.abs_delta == 29900
+    assert duration.pct_delta == 29900.0
+    assert duration.delta_text() == "↑ 29900.0%"
+
+    year = result["year"]
+    assert year.winner == "left"
+    assert year.abs_delta == 60000
+    assert year.delta_text() == "↓ 60000 Years"
+
+
+# Michigan and Ohio State on every battle metric, read off the big ten dataset
+def test_compare_big_ten_schools():
+    df = get_big_data()
+    result = build_comparison(df, "Michigan", "Ohio State")
+    assert list(result.metrics) == list(BATTLE_METRICS)
+
+    tempo = result["bpm"]
+    assert (tempo.left, tempo.right, tempo.winner) == (83, 178, "right")
+    assert tempo.delta_text() == f"↑ {round(100 * (178 - 83) / 83, 2)}%"
+    # the older song wins the year
+    year = result["year"]
+    assert (year.winner, year.abs_delta, year.arrow) == ("left", 21, "←")
+    assert year.delta_text() == "↓ 21 Years"
+    assert result.wins("left") + result.wins("right") == len(BATTLE_METRICS)
+
+    swapped = build_comparison(df, "Ohio State", "Michigan")
+    assert [r.winner for r in swapped] == [{"left": "right", "right": "left"}[r.winner] for r in result]
+
+
+# Illinois and USC share a 60 second duration
+def test_compare_tie():
+    duration = build_comparison(get_big_data(), "Illinois", "USC")["sec_duration"]
+    assert duration.tie and duration.winner is None and duration.pct_delta is None
+    assert duration.wins("left") and duration.wins("right")
+    assert duration.delta_text() == "Tie!"
+    assert duration.arrow == "="
+
+
+def test_unknown_school():
+    with pytest.raises(KeyError, match="Unknown school"):
+        build_comparison(get_big_data(), "Michigan", "Notre Dame")
@@ -0,0 +1,98 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pandas as pd
+from utils.big_data import RAW_PATH, big_data
+from utils.columnar import hash_path
+from utils.incremental import incremental_big_data
+
+
+def read_raw():
+    return pd.read_csv(RAW_PATH, dtype="str", keep_default_na=False)
+
+
+def write_raw(raw, path):
+    raw.to_csv(path, index=False)
+
+
+# an inserted song and a changed tempo
+def first_change(raw):
+    new = raw[raw["school"] == "Iowa"].copy()
+    new["song_name"] = "New Song"
+    raw = pd.concat([raw, new], ignore_index=True)
+    raw.loc[raw["school"] == "Purdue", "bpm"] = "99"
+    return raw
+
+
+# a deleted song and another changed tempo
+def second_change(raw):
+    raw = raw[raw["school"] != "Michigan"].reset_index(drop=True)
+    raw.loc[raw["school"] == "Minnesota", "bpm"] = "101"
+    return raw
+
+
+def full_rebuild(raw_path, tmp_path):
+    expected_path = tmp_path / "expected.csv"
+    big_data(raw_path=raw_path, out_path=expected_path)
+    return expected_path.read_bytes()
+
+
+# incremental run -> raw change -> big_data() -> raw change -> incremental run
+def test_incremental_after_full_rebuild(tmp_path):
+    raw_path, out_path = tmp_path / "raw.csv", tmp_path / "big_ten.csv"
+    raw = read_raw()
+    write_raw(raw, raw_path)
+    assert incremental_big_data(raw_path, out_path)["mode"] == "full"
+
+    raw = first_change(raw)
+    write_raw(raw, raw_path)
+    big_data(raw_path=raw_path, out_path=out_path)
+    assert not hash_path(out_path).exists()
+
+    raw = second_change(raw)
+    write_raw(raw, raw_path)
+    report = incremental_big_data(raw_path, out_path)
+
+    assert report["mode"] == "full"
+    assert out_path.read_bytes() == full_rebuild(raw_path, tmp_path)
+    out = pd.read_csv(out_path)
+    assert (out["song_name"] == "New Song").sum() == 1
+    assert "Indiana" in set(out["school"])
+
+
+# a csv rewritten without going through big_data() still leaves the sidecar behind,
+# its fingerprint no longer matches so the next run rebuilds in full
+def test_incremental_after_csv_rewritten(tmp_path):
+    raw_path, out_path = tmp_path / "raw.csv", tmp_path / "big_ten.csv"
+    raw = read_raw()
+    write_raw(raw, raw_path)
+    incremental_big_data(raw_path, out_path)
+
+    raw = first_change(raw)
+    write_raw(raw, raw_path)
+    big_ten = raw[raw["conference"] == "Big Ten"]
+    big_ten.sample(frac=1, random_state=0).to_csv(out_path, index=False)
+    assert hash_path(out_path).exists()
+
+    raw = second_change(raw)
+    write_raw(raw, raw_path)
+    assert incremental_big_data(raw_path, out_path)["mode"] == "full"
+    assert out_path.read_bytes() == full_rebuild(raw_path, tmp_path)
+
+
+# unchanged csv: the next run only reprocesses what changed and matches a full rebuild
+def test_incremental_matches_full_rebuild(tmp_path):
+    raw_path, out_path = tmp_path / "raw.csv", tmp_path / "big_ten.csv"
+    raw = read_raw()
+    write_raw(raw, raw_path)
+    incremental_big_data(raw_path, out_path)
+
+    raw = second_change(first_change(raw))
+    write_raw(raw, raw_path)
+    report = incremental_big_data(raw_path, out_path)
+
+    assert report["mode"] == "incremental"
+    assert [song for _, song in report["inserted"]] == ["New Song"]
+    assert out_path.read_bytes() == full_rebuild(raw_path, tmp_path)
@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+from utils.big_data import get_big_data
+from utils.ranks import get_rank_index
+from utils.visuals import RANK_CONFIG
+
+
+# Illinois, Minnesota and USC all run 60 seconds, ties keep dataset row order like a stable sort_values
+def test_duration_tie_order():
+    duration = get_rank_index()["Duration Rank"]
+    assert [duration.rank(school) for school in ("Illinois", "Minnesota", "USC")] == [16, 15, 14]
+    assert duration.rank("Maryland") == duration.n_schools
+    assert duration.rank("Wisconsin") == 1
+
+
+# every chart order is the one sort_values(kind="stable") gave, and ranks count down along it
+def test_rank_index_matches_sort_values():
+    df = get_big_data()
+    index = get_rank_index()
+    for rank_key, cfg in RANK_CONFIG.items():
+        entry = index[rank_key]
+        values = df[cfg.get("original", cfg["col"])].reset_index(drop=True)
+        expected = values.sort_values(ascending=cfg["ascending"], kind="stable").index.to_numpy()
+        assert entry.order.tolist() == expected.tolist()
+        assert list(entry.schools) == df["school"].astype("str").to_numpy()[expected].tolist()
+        assert entry.ranks[entry.order].tolist() == list(range(len(df), 0, -1))
+
+
+# the index is shared between sessions, nothing in it can be changed
+def test_rank_index_is_read_only():
+    index = get_rank_index()
+    duration = index["Duration Rank"]
+    with pytest.raises(TypeError):
+        index["Duration Rank"] = None
+    with pytest.raises(TypeError):
+        duration.rank_of["Illinois"] = 1
+    with pytest.raises(ValueError):
+        duration.ranks[0] = 1
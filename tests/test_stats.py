@@ -0,0 +1,23 @@
+import json
+import sys
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from utils.big_data import get_big_data
+from utils.stats import compute_stats
+
+
+# a one song conference (like the Independent partition) has no sample std, and no warning on the way
+def test_one_row_stats():
+    df = get_big_data()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        stats = compute_stats(df.iloc[:1], "Independent")
+    bpm = stats.columns["bpm"]
+    assert bpm["std"] is None
+    assert bpm["mean"] == bpm["min"] == bpm["max"] == int(df["bpm"].iloc[0])
+    json.dumps(stats.to_dict(), allow_nan=False)
+
+    assert compute_stats(df).columns["bpm"]["std"] > 0
@@ -0,0 +1,83 @@
+import sys
+import threading
+import time
+import weakref
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+from utils.store import dataset_token, get_dataset, register_dataset, store_stats
+
+
+def write_source(path, rows):
+    pd.DataFrame({"school": [f"s{i}" for i in range(rows)], "bpm": np.arange(rows) + 100}).to_csv(path, index=False)
+
+
+def register(tmp_path, name, loader, rows=3):
+    path = tmp_path / f"{name}.csv"
+    write_source(path, rows)
+    register_dataset(name, path, loader)
+    return path
+
+
+# edits made to a returned frame never reach the stored one
+def test_returned_frames_are_isolated(tmp_path):
+    register(tmp_path, "store_isolation", pd.read_csv)
+    df = get_dataset("store_isolation")
+    df.loc[0, "bpm"] = -1
+    df["school"] = "changed"
+    df["new"] = 1
+    df.drop(index=1, inplace=True)
+
+    again = get_dataset("store_isolation")
+    assert again["bpm"].tolist() == [100, 101, 102]
+    assert again["school"].tolist() == ["s0", "s1", "s2"]
+    assert "new" not in again.columns
+
+
+# concurrent callers wait for a single load
+def test_single_flight(tmp_path):
+    loads = []
+
+    def slow_loader(path):
+        loads.append(path)
+        time.sleep(0.2)
+        return pd.read_csv(path)
+
+    register(tmp_path, "store_single_flight", slow_loader)
+    before = store_stats()["loads"]
+    threads = [threading.Thread(target=get_dataset, args=("store_single_flight",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(loads) == 1
+    assert store_stats()["loads"] == before + 1
+
+
+class Artifact:
+    def __init__(self, rows):
+        self.rows = rows
+
+
+# a reload forgets the previous version, whether or not the artifact can be weakly referenced
+def test_reload_releases_previous_artifacts(tmp_path):
+    path = register(tmp_path, "store_artifact", lambda p: Artifact(len(pd.read_csv(p))))
+    dict_path = register(tmp_path, "store_dict", lambda p: {"rows": len(pd.read_csv(p))})
+
+    old = get_dataset("store_artifact")
+    old_dict = get_dataset("store_dict")
+    old_ref = weakref.ref(old)
+    assert dataset_token(old).startswith("store_artifact@")
+
+    write_source(path, 5)
+    write_source(dict_path, 5)
+    new, new_dict = get_dataset("store_artifact"), get_dataset("store_dict")
+    assert new.rows == 5 and new_dict["rows"] == 5
+    assert dataset_token(new) != dataset_token(old)
+    assert dataset_token(old_dict) is None
+
+    del old
+    assert old_ref() is None
@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+import pandas as pd
+import pytest
+from utils.big_data import get_big_data, get_trope_mask
+from utils.tropes import TROPES, pack_tropes, query_tropes, trope_counts, unpack_tropes
+
+
+# the packed mask of the big ten answers the same questions as the 0/1 columns
+def test_mask_matches_columns():
+    df = get_big_data()
+    mask = get_trope_mask()
+    assert not mask.flags.writeable
+    assert unpack_tropes(mask).equals(df[TROPES].astype("int8").reset_index(drop=True))
+    assert trope_counts(mask).tolist() == df[TROPES].sum(axis=1).tolist()
+
+    flags = df[TROPES].to_numpy() == 1
+    fight, spelling, rah, colors = (flags[:, TROPES.index(t)] for t in ("fight", "spelling", "rah", "colors"))
+    keep = query_tropes(mask, all_of=["fight"], any_of=["rah", "colors"], none_of=["spelling"])
+    assert keep.tolist() == (fight & (rah | colors) & ~spelling).tolist()
+    assert query_tropes(mask).all()
+
+
+# raw "Yes"/"No" flags pack the same as cleaned 0/1 ones, missing flags count as absent
+def test_pack_raw_flags():
+    raw = pd.DataFrame({trope: ["Yes", "No", None] for trope in TROPES})
+    clean = pd.DataFrame({trope: [1, 0, 0] for trope in TROPES})
+    assert pack_tropes(raw).tolist() == pack_tropes(clean).tolist() == [2 ** len(TROPES) - 1, 0, 0]
+    assert pack_tropes(raw).dtype == np.uint16
+
+
+def test_unknown_trope():
+    with pytest.raises(ValueError, match="Unknown trope"):
+        query_tropes(get_trope_mask(), all_of=["kazoo"])
@@ -1,119 +1,222 @@
 import pandas as pd
 import streamlit as st
-import numpy as np
+import time
+from pathlib import Path
+from utils.columnar import cache_path, hash_path, read_columnar, write_columnar
+from utils.store import get_dataset, register_dataset
+from utils.schema import RAW_SCHEMA, apply_schema, clean_dtypes, read_dtypes
+from utils.stats import ConferenceStats, compute_stats, read_stats, stats_path, write_stats
+from utils.tropes import pack_tropes
+from utils.distance import trope_distances, traditional_unique
+from utils.similarity import build_similarity, closest_schools
+from utils.timing import timed
+
+# raw and cleaned dataset locations
+RAW_PATH = "data/raw/fight-songs-updated.csv"
+BIG_TEN_PATH = "data/B1G/big_ten_fight_songs.csv"
+
+# column types of the cleaned big ten dataset, so loads never have to infer them
+BIG_TEN_DTYPES = clean_dtypes()
 
 #create big ten dataset
-def big_data():
+def big_data(chunksize=None, raw_path=RAW_PATH, out_path=BIG_TEN_PATH):
+    # big raw files are streamed in chunks instead of loaded whole
+    if chunksize:
+        return stream_big_data(raw_path, out_path, chunksize=chunksize)
     # read in raw data
-    df = pd.read_csv("data/raw/fight-songs-updated.csv")
-    # change to numerical columns
-    df_big = df[df["conference"] == "Big Ten"]
-    df_big['spelling'] = df_big['spelling'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['opponents'] = df_big['opponents'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['men'] = df_big['men'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['colors'] = df_big['colors'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['nonsense'] = df_big['nonsense'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['rah'] = df_big['rah'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['win_won'] = df_big['win_won'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['victory'] = df_big['victory'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['fight'] = df_big['fight'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['victory_win_won'] = df_big['victory_win_won'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['contest'] = df_big['contest'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['official_song'] = df_big['official_song'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['student_writer'] = df_big['student_writer'].map({'Yes': 1, 'No': 0}).astype(int)
-    df_big['year'] = df_big['year'].astype(int)
-    df_big.to_csv("data/B1G/big_ten_fight_songs.csv", index=False)
-    
+    df = pd.read_csv(raw_path, dtype=read_dtypes())
+    # keep the big ten rows and convert every column to its cleaned type in one pass
+    df_big = apply_schema(df[df["conference"] == "Big Ten"])
+    df_big.to_csv(out_path, index=False)
+    # row hashes of an incremental build no longer line up with this csv
+    hash_path(out_path).unlink(missing_ok=True)
+    # columnar copy next to the csv for fast loads
+    write_columnar(df_big, cache_path(out_path), out_path)
+    # conference aggregates the pages read instead of recomputing them
+    write_stats(compute_stats(df_big), stats_path(out_path), out_path)
+
+# streaming version of big_data(), reads the raw file a chunk at a time so memory stays
+# bounded by the chunk size, returns row counts and throughput
+def stream_big_data(raw_path=RAW_PATH, out_path=BIG_TEN_PATH, conference="Big Ten", chunksize=100_000, require_known=True):
+    start = time.perf_counter()
+    rows_in = rows_out = 0
+    reader = pd.read_csv(raw_path, usecols=list(RAW_SCHEMA), dtype=read_dtypes(), chunksize=chunksize)
+    # write next to the output and swap it in at the end, so a failed run keeps the old dataset
+    tmp_path = Path(out_path).with_suffix(".csv.tmp")
+    with open(tmp_path, "w", newline="") as f:
+        for i, chunk in enumerate(reader):
+            rows_in += len(chunk)
+            # filter before converting so only matching rows pay for the conversion
+            part = apply_schema(chunk[chunk["conference"] == conference], require_known=require_known)
+            part.to_csv(f, index=False, header=(i == 0))
+            rows_out += len(part)
+    tmp_path.replace(out_path)
+    hash_path(out_path).unlink(missing_ok=True)
+    seconds = time.perf_counter() - start
+    return {
+        "rows_in": rows_in,
+        "rows_out": rows_out,
+        "seconds": seconds,
+        "rows_per_sec": rows_in / seconds if seconds else float("inf"),
+    }
+
+# load the big ten csv directly, parsing with the known column types
+def read_big_csv(path=BIG_TEN_PATH, dtypes=BIG_TEN_DTYPES):
+    return pd.read_csv(path, dtype=dtypes)
+
+# load the big ten dataset (or any cleaned conference dataset) from disk, columnar cache or csv
+def load_big_data(path=BIG_TEN_PATH, dtypes=BIG_TEN_DTYPES):
+    # use the columnar cache if it still matches the csv
+    df_big = read_columnar(cache_path(path), path)
+    if df_big is not None:
+        return df_big
+    # cache missing or stale, parse the csv and rebuild it
+    df_big = read_big_csv(path, dtypes)
+    try:
+        write_columnar(df_big, cache_path(path), path)
+    except OSError:
+        # read-only deployments just keep using the csv
+        pass
+    return df_big
+
+# load the raw fight songs csv from disk
+def load_raw_data(path=RAW_PATH):
+    return pd.read_csv(path, dtype=read_dtypes())
+
+# load the aggregates of a cleaned dataset, computing (and saving) them if the stats file is missing or stale
+def load_big_stats(path=BIG_TEN_PATH, dtypes=BIG_TEN_DTYPES, conference="Big Ten"):
+    stats = read_stats(stats_path(path), path)
+    if stats is not None:
+        return stats
+    stats = compute_stats(load_big_data(path, dtypes), conference)
+    try:
+        write_stats(stats, stats_path(path), path)
+    except OSError:
+        pass
+    return stats
+
+# cleaned dataset at a path for the loaders derived from it, the store's shared frame when it is the big ten csv
+def dataset_at(path=BIG_TEN_PATH):
+    if str(path) == str(BIG_TEN_PATH):
+        return get_dataset("big_ten")
+    return load_big_data(path)
+
+# one uint16 trope mask per song of the dataset at path, in row order (read only, shared by every page)
+def load_trope_mask(path=BIG_TEN_PATH):
+    mask = pack_tropes(dataset_at(path))
+    mask.flags.writeable = False
+    return mask
+
+# distance of every song of the dataset at path to its trope centroid, one column per metric
+def load_trope_distances(path=BIG_TEN_PATH):
+    return trope_distances(dataset_at(path))
+
+# school x school similarity of the songs of the dataset at path
+def load_similarity(path=BIG_TEN_PATH):
+    return build_similarity(dataset_at(path))
+
+# datasets are loaded once per process through the shared store
+register_dataset("big_ten", BIG_TEN_PATH, load_big_data)
+register_dataset("big_ten_stats", BIG_TEN_PATH, load_big_stats)
+register_dataset("big_ten_tropes", BIG_TEN_PATH, load_trope_mask)
+register_dataset("big_ten_distances", BIG_TEN_PATH, load_trope_distances)
+register_dataset("big_ten_similarity", BIG_TEN_PATH, load_similarity)
+register_dataset("raw", RAW_PATH, load_raw_data)
+
 # load big ten data into a variable
+@timed()
 def get_big_data():
-    df_big = pd.read_csv("data/B1G/big_ten_fight_songs.csv")
-    return df_big
+    return get_dataset("big_ten")
+
+# load raw fight songs data into a variable
+@timed()
+def get_raw_data():
+    return get_dataset("raw")
+
+# packed trope flags of the big ten songs, query with utils.tropes (has_all, has_any, query_tropes, ...)
+@timed()
+def get_trope_mask():
+    return get_dataset("big_ten_tropes")
+
+# big ten distances to the conference centroid (euclidean, cosine, hamming, mahalanobis)
+@timed()
+def get_trope_distances():
+    return get_dataset("big_ten_distances")
+
+# big ten school x school similarity matrix (tropes, tempo, duration, year, fight count)
+@timed()
+def get_similarity():
+    return get_dataset("big_ten_similarity")
+
+# the k schools with the songs most similar to a school's song, as (school, similarity) pairs
+@timed()
+def nearest_rivals(school, k=3):
+    return closest_schools(get_similarity(), school, k)
+
+# big ten aggregates (means, extremes, quantiles, ...), computed once per dataset version
+@timed()
+def get_big_stats():
+    return get_dataset("big_ten_stats")
 
 # summary statistics
-def summary_stats(df: pd.DataFrame):
-    t1 = df['bpm'].mean()
-    t2 = df['sec_duration'].mean()
-    t3 = df['trope_count'].mean()
-    t4 = df[['spelling', 
-            'opponents', 
-            'men', 
-            'colors', 
-            'nonsense',
-            'rah',
-            'win_won',
-            'victory',
-            'fight']].sum().idxmax()
-    row_old = df.loc[df['year'].idxmin()]
-    t5 = row_old["year"].astype(int)
-    row_new = df.loc[df['year'].idxmax()]
-    t6 = row_new["year"].astype(int)
+@timed()
+def summary_stats(stats: ConferenceStats):
+    t1 = stats.mean('bpm')
+    t2 = stats.mean('sec_duration')
+    t3 = stats.mean('trope_count')
+    t4 = stats.top_trope
+    t5 = stats['year']['min']
+    t6 = stats['year']['max']
     return t1, t2, t3, t4, t5, t6
 
 # find summary metrics
-def big_metrics(df: pd.DataFrame):
+@timed()
+def big_metrics(stats: ConferenceStats):
     c1, c2, c3, c4, c5 = st.columns(5)
     with c1:
         # average bpm
-        st.metric(label='Average BPM', value=round(df['bpm'].mean(), 2))
+        st.metric(label='Average BPM', value=round(stats.mean('bpm'), 2))
     with c2:
         # average duration
-        st.metric(label='Average Duration (seconds)', value=round(df['sec_duration'].mean(), 2))
+        st.metric(label='Average Duration (seconds)', value=round(stats.mean('sec_duration'), 2))
     with c3:
         # average trope count
-        st.metric(label='Average Trope Count', value=round(df['trope_count'].mean(), 2))
+        st.metric(label='Average Trope Count', value=round(stats.mean('trope_count'), 2))
     with c4:
         # most common trope
-        qs = '"'
-        st.metric(label='Most Common Trope', value=df[['spelling', 
-                                                       'opponents', 
-                                                       'men', 
-                                                       'colors', 
-                                                       'nonsense',
-                                                       'rah',
-                                                       'win_won',
-                                                       'victory',
-                                                       'fight']].sum().idxmax())
+        st.metric(label='Most Common Trope', value=stats.top_trope)
     with c5:
         # average year
-        st.metric(label='Average Year Written', value=int(df['year'].mean()))
+        st.metric(label='Average Year Written', value=int(stats.mean('year')))
 
 
-# show rankings as metrics
-def big_rankings(df: pd.DataFrame):
+# show rankings as metrics, traditional/unique use the chosen distance (see utils.distance.METRICS)
+@timed()
+def big_rankings(stats: ConferenceStats, distances: pd.DataFrame, metric="euclidean"):
     c1, c2, c3, c4, c5, c6 = st.columns([0.2, 0.2, 0.2, 0.18, 0.18, 0.18])
     with c1:
         # fastest song 
-        row = df.loc[df['bpm'].idxmax()]
-        st.metric(label="Fastest Fight Song (BPM)", value=f'{row["school"]}: {row["bpm"]}')
+        bpm = stats['bpm']
+        st.metric(label="Fastest Fight Song (BPM)", value=f'{bpm["argmax"]}: {bpm["max"]}')
     with c2:
         # longest song 
-        row = df.loc[df['sec_duration'].idxmax()]
-        st.metric(label="Longest Fight Song (Seconds)", value=f'{row["school"]}: {row["sec_duration"]}')
+        duration = stats['sec_duration']
+        st.metric(label="Longest Fight Song (Seconds)", value=f'{duration["argmax"]}: {duration["max"]}')
     with c3:
         # oldest song
-        row = df.loc[df['year'].idxmin()]
-        st.metric(label='Oldest Song', value=f'{row["school"]}: {row["year"]}')
+        year = stats['year']
+        st.metric(label='Oldest Song', value=f'{year["argmin"]}: {year["min"]}')
     with c4:
         # most tropes 
-        row = df.loc[df['trope_count'].idxmax()]
-        st.metric(label="Most Trope Heavy Song", value=f'{row["school"]}: {row["trope_count"]}') 
+        tropes = stats['trope_count']
+        st.metric(label="Most Trope Heavy Song", value=f'{tropes["argmax"]}: {tropes["max"]}') 
+    traditional, unique = traditional_unique(distances, metric)
     with c5:
-        trope_cols = [
-        "fight", "victory", "win_won", "rah",
-        "nonsense", "colors", "men",
-        "opponents", "spelling"
-        ]   
-        conf_avg = df[trope_cols].mean().values
-        df["distance_to_conf_avg"] = df[trope_cols].apply(
-        lambda row: np.linalg.norm(row.values - conf_avg),
-        axis=1
-        )
-        row = df.loc[df['distance_to_conf_avg'].idxmin()]
-        st.metric(label="Most *Traditional* Song", value=f'{row["school"]}')
+        # most traditional song, closest to the conference average tropes
+        st.metric(label="Most *Traditional* Song", value=f'{traditional}')
     with c6:
         # most unique song
-        row = df.loc[df['distance_to_conf_avg'].idxmax()]
-        st.metric(label="Most *Unique* Song", value=f'{row["school"]}')
+        st.metric(label="Most *Unique* Song", value=f'{unique}')
 
 # assign an up or down arrow for delta changes
 def up_or_down(v1, v2):
@@ -122,4 +225,20 @@ def up_or_down(v1, v2):
     elif v1 < v2:
         return "↓"
     else:
-        return ""
\ No newline at end of file
+        return ""
+
+
+# command line entry: python -m utils.big_data [--chunksize N]
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the cleaned Big Ten dataset from the raw fight songs csv")
+    parser.add_argument("--chunksize", type=int, default=None, help="stream the raw file in chunks of this many rows")
+    args = parser.parse_args()
+
+    stats = big_data(chunksize=args.chunksize)
+    if stats:
+        print(
+            f"{stats['rows_in']:,} raw rows -> {stats['rows_out']:,} rows in {stats['seconds']:.2f}s "
+            f"({stats['rows_per_sec']:,.0f} rows/s)"
+        )
@@ -1,22 +1,38 @@
 import json
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+from utils.timing import timed
+
+# palette registry
+# every school's colors are read from the color files once, precomputed (hex, rgb, translucent fills)
+# and kept in an immutable table shared by every page, the files are only read again when one changes
+
+COLOR_DIR = Path("data/colors")
+# palette field -> (source file, default for schools missing from it)
+COLOR_SOURCES = {
+    "primary": ("school_colors.json", "#000000"),
+    "secondary": ("secondary_school_colors.json", "#CCCCCC"),
+    "secondary_text": ("secondary_text_colors.json", "#000000"),
+}
+# opacity of the filled areas of the radar plots
+FILL_ALPHA = 0.25
+# {"stamps", "table"}, replaced as a whole on reload
+_PALETTES = {"stamps": None, "table": MappingProxyType({})}
+_PALETTE_LOCK = threading.Lock()
 
 
 # load json into variable
+@timed()
 def load_json(path):
     with open(path, "r") as f:
         return json.load(f)
 
-# create variables for main, secondry, and text color  
-def get_school_colors(school):
-    return {
-        "primary": load_json("data/colors/school_colors.json").get(school, "#000000"),
-        "secondary": load_json("data/colors/secondary_school_colors.json").get(school, "#CCCCCC"),
-        "secondary_text": load_json("data/colors/secondary_text_colors.json").get(school, "#000000")
-    }
-
 
 # helper function to create rgb value out of hex
+@lru_cache(maxsize=256)
 def hex_to_rgb(hex_color):
     # Remove the '#' character if present
     if hex_color.startswith('#'):
@@ -33,3 +49,103 @@ def hex_to_rgb(hex_color):
 
     return (r, g, b)
 
+
+# translucent rgba() fill of a hex color
+@lru_cache(maxsize=256)
+def fill_color(hex_color, alpha=FILL_ALPHA):
+    r, g, b = hex_to_rgb(hex_color)
+    return f"rgba({r},{g},{b},{alpha})"
+
+
+# one school's colors, dict style access (colors["primary"]) still works
+@dataclass(frozen=True)
+class SchoolPalette:
+    school: str
+    primary: str
+    secondary: str
+    secondary_text: str
+    primary_rgb: tuple
+    secondary_rgb: tuple
+    primary_fill: str
+    secondary_fill: str
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+
+def _palette(school, colors):
+    return SchoolPalette(
+        school=school,
+        primary=colors["primary"],
+        secondary=colors["secondary"],
+        secondary_text=colors["secondary_text"],
+        primary_rgb=hex_to_rgb(colors["primary"]),
+        secondary_rgb=hex_to_rgb(colors["secondary"]),
+        primary_fill=fill_color(colors["primary"]),
+        secondary_fill=fill_color(colors["secondary"]),
+    )
+
+
+def _stamps(color_dir):
+    stamps = []
+    for file_name, _ in COLOR_SOURCES.values():
+        stat = (color_dir / file_name).stat()
+        stamps.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(stamps)
+
+
+# school -> SchoolPalette for every school in any color file
+def load_palettes(color_dir=COLOR_DIR):
+    color_dir = Path(color_dir)
+    sources = {field: load_json(color_dir / file_name) for field, (file_name, _) in COLOR_SOURCES.items()}
+    schools = dict.fromkeys(school for colors in sources.values() for school in colors)
+    table = {}
+    for school in schools:
+        # stray whitespace in a hex code breaks rgb parsing (and css)
+        colors = {
+            field: sources[field].get(school, default).strip()
+            for field, (_, default) in COLOR_SOURCES.items()
+        }
+        table[school] = _palette(school, colors)
+    return MappingProxyType(table)
+
+
+# the shared palette table, reloaded when any color file changed since the last load
+def palette_table(color_dir=COLOR_DIR):
+    stamps = _stamps(Path(color_dir))
+    if _PALETTES["stamps"] != stamps:
+        with _PALETTE_LOCK:
+            if _PALETTES["stamps"] != stamps:
+                table = load_palettes(color_dir)
+                _PALETTES["table"], _PALETTES["stamps"] = table, stamps
+    return _PALETTES["table"]
+
+
+# palette of schools missing from every color file
+@lru_cache(maxsize=1)
+def _default_palette():
+    return _palette(None, {field: default for field, (_, default) in COLOR_SOURCES.items()})
+
+
+# school -> palette for many schools with a single freshness check
+@timed()
+def get_palettes(schools):
+    table = palette_table()
+    return {school: table.get(school) or _default_palette() for school in schools}
+
+
+# create variables for main, secondry, and text color
+@timed()
+def get_school_colors(school):
+    return palette_table().get(school) or _default_palette()
+
+
+# school -> primary hex, for plotly color maps
+def primary_colors():
+    return {school: palette.primary for school, palette in palette_table().items()}
+
+
+# changes whenever a color file changes, for caches of anything drawn with the palette table
+def palette_version():
+    palette_table()
+    return _PALETTES["stamps"]
@@ -0,0 +1,75 @@
+import hashlib
+import json
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# key used to store the source csv fingerprint inside the arrow schema metadata
+SOURCE_KEY = b"b1g_source"
+
+
+# path of the columnar cache that sits next to a csv
+def cache_path(csv_path):
+    return Path(csv_path).with_suffix(".feather")
+
+
+# row hash sidecar of a cleaned csv, written by utils.incremental and dropped by every full rebuild
+def hash_path(csv_path):
+    return Path(csv_path).with_suffix(".rowhash.feather")
+
+
+# sha256 of a file's contents, read in blocks so big files don't load into memory
+def content_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# mtime, size and content hash of the source csv
+def file_fingerprint(path):
+    stat = Path(path).stat()
+    return {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": content_hash(path),
+    }
+
+
+# write a dataframe as an uncompressed arrow/feather file so it can be memory-mapped on load
+def write_columnar(df: pd.DataFrame, path, source_path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta[SOURCE_KEY] = json.dumps(file_fingerprint(source_path)).encode()
+    table = table.replace_schema_metadata(meta)
+    # write to a temp file first so a reader never sees a half written cache
+    tmp_path = Path(path).with_suffix(".feather.tmp")
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    tmp_path.replace(path)
+
+
+# check the fingerprint stored in the cache against the current source file
+def is_fresh(stored, source_path):
+    stat = Path(source_path).stat()
+    if stored.get("mtime_ns") == stat.st_mtime_ns and stored.get("size") == stat.st_size:
+        return True
+    # mtime changed (checkout, copy, touch), fall back to comparing contents
+    return stored.get("size") == stat.st_size and stored.get("sha256") == content_hash(source_path)
+
+
+# read a columnar cache, returns None when it is missing or out of date with its source
+def read_columnar(path, source_path):
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with pa.memory_map(str(path), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+            stored = json.loads((table.schema.metadata or {}).get(SOURCE_KEY, b"{}"))
+            if not is_fresh(stored, source_path):
+                return None
+            return table.to_pandas(split_blocks=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
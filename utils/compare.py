@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
+from utils.big_data import get_big_data, up_or_down
+from utils.store import dataset_version
+from utils.timing import timed
+
+# head to head comparison for battle of the bands
+# every metric of two schools is compared in one vectorized step and the result is cached per
+# pair and dataset version, so reruns of the battle page only render it
+
+# column -> label, whether the higher value wins and the unit of the delta ("%" for a percent change)
+BATTLE_METRICS = {
+    "bpm": {"label": "Tempo (BPM)", "higher_wins": True, "unit": "%"},
+    "sec_duration": {"label": "Duration (Seconds)", "higher_wins": True, "unit": "%"},
+    "year": {"label": "Year Written", "higher_wins": False, "unit": "Years"},
+    "trope_count": {"label": "Trope Count", "higher_wins": True, "unit": "Tropes"},
+    "number_fights": {"label": "Fight Count", "higher_wins": True, "unit": "Fights"},
+}
+# comparisons kept, a few hundred pairs is every battle of an 18 school conference
+COMPARE_CACHE_SIZE = 512
+
+
+# one metric of a comparison
+@dataclass(frozen=True)
+class MetricResult:
+    metric: str
+    label: str
+    unit: str
+    left: object
+    right: object
+    # "left", "right" or None on a tie
+    winner: object
+    tie: bool
+    # |left - right|
+    abs_delta: object
+    # winner over loser in percent, None on a tie
+    pct_delta: object
+
+    def value(self, side):
+        return self.left if side == "left" else self.right
+
+    # the side won or tied
+    def wins(self, side):
+        return self.tie or self.winner == side
+
+    # text of the winner's delta pill, "Tie!" on a tie
+    def delta_text(self):
+        if self.tie:
+            return "Tie!"
+        winner, loser = (self.left, self.right) if self.winner == "left" else (self.right, self.left)
+        if self.unit == "%":
+            return f"{up_or_down(winner, loser)} {round(self.pct_delta, 2)}%"
+        return f"{up_or_down(winner, loser)} {self.abs_delta} {self.unit}"
+
+    # arrow pointing at the winner
+    @property
+    def arrow(self):
+        return {"left": "←", "right": "→"}.get(self.winner, "=")
+
+
+# every BATTLE_METRICS result of two schools, in BATTLE_METRICS order
+@dataclass(frozen=True)
+class Comparison:
+    left: str
+    right: str
+    metrics: dict
+
+    def __getitem__(self, metric):
+        return self.metrics[metric]
+
+    def __iter__(self):
+        return iter(self.metrics.values())
+
+    # number of metrics a side won outright
+    def wins(self, side):
+        return sum(result.winner == side for result in self)
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+# compare the first song of each school on every metric at once
+def build_comparison(df, school_a, school_b, metrics=BATTLE_METRICS):
+    columns = list(metrics)
+    schools = df["school"].astype("str").to_numpy()
+    rows = []
+    for school in (school_a, school_b):
+        found = np.flatnonzero(schools == school)
+        if not len(found):
+            raise KeyError(f"Unknown school: {school}")
+        rows.append(found[0])
+    values = df[columns].to_numpy()[rows]
+    # the columns are stored as int8/int16, widen before any arithmetic so differences can't overflow
+    left, right = values.astype("int64" if values.dtype.kind in "iub" else "float64")
+
+    # +1 where the left school wins, -1 where the right one does, 0 on a tie
+    direction = np.where([metrics[c]["higher_wins"] for c in columns], 1, -1)
+    outcome = np.sign(left - right) * direction
+    winner_values = np.where(outcome >= 0, left, right).astype("float64")
+    loser_values = np.where(outcome >= 0, right, left).astype("float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct = 100 * (winner_values - loser_values) / loser_values
+    abs_delta = np.abs(left - right)
+
+    results = {}
+    for i, column in enumerate(columns):
+        tie = bool(outcome[i] == 0)
+        results[column] = MetricResult(
+            metric=column,
+            label=metrics[column]["label"],
+            unit=metrics[column]["unit"],
+            left=_plain(left[i]),
+            right=_plain(right[i]),
+            winner=None if tie else ("left" if outcome[i] > 0 else "right"),
+            tie=tie,
+            abs_delta=_plain(abs_delta[i]),
+            pct_delta=None if tie else float(pct[i]),
+        )
+    return Comparison(school_a, school_b, results)
+
+
+@lru_cache(maxsize=COMPARE_CACHE_SIZE)
+def _cached_comparison(school_a, school_b, version):
+    return build_comparison(get_big_data(), school_a, school_b)
+
+
+# head to head comparison of two big ten schools, cached per pair and dataset version
+@timed()
+def compare(school_a, school_b):
+    return _cached_comparison(school_a, school_b, dataset_version("big_ten"))
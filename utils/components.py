@@ -1,7 +1,19 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
+from utils.table_index import matching_rows, page_count, page_rows
+from utils.timing import span, timed
+from utils.tropes import TROPES
 from utils.visuals import RANK_CONFIG
 
+# rank tab label -> RANK_CONFIG key, in tab order
+RANK_TABS = {
+    "**Tempo**": "Tempo Rank",
+    "**Duration**": "Duration Rank",
+    "**Year**": "Year Written Rank",
+    "**Tropes**": "Trope Density Rank",
+}
+
 
 # custom html for colored metrics
 def colored_metric(label=None, 
@@ -297,6 +309,7 @@ def background_band_fill_side(
 
 
 # custom html injection for dataframes in streamlit (may delete later)
+@timed()
 def styled_section_df(
     rows,
     header_bg: str = "#003366",
@@ -315,3 +328,106 @@ def styled_section_df(
         .set_properties(subset=["Variable"], **{"color": name_color, "font-weight": "600"})
     )
     return styler
+
+
+# rank tabs that only run the open tab, render(rank_key) draws one tab's content
+# switching tabs reruns the enclosing st.fragment (or the whole page outside of one)
+# (st.tabs key/on_change and tab.open need streamlit 1.55, the floor in requirements.txt)
+def lazy_rank_tabs(key, render):
+    tabs = st.tabs(list(RANK_TABS), key=key, on_change="rerun")
+    for tab, (label, rank_key) in zip(tabs, RANK_TABS.items()):
+        if not tab.open:
+            continue
+        with tab, span(f"rank tab: {label.strip('*')}"):
+            render(rank_key)
+
+
+# server-side table of a store dataset: search, range and trope filters, sort and paging run on its table index
+# (utils.table_index) and only the rows of the open page are sent to the browser.
+# widgets are keyed by `key`, run it in an st.fragment so paging reruns just the table
+@timed()
+def paged_table(key, df: pd.DataFrame, index, page_sizes=(10, 25, 50, 100)):
+    search_col, in_col, sort_col, order_col = st.columns([3, 1.5, 1.5, 1], vertical_alignment="bottom")
+    search = search_col.text_input("Search", key=f"{key}_search", placeholder="School, song name or writers")
+    search_in = in_col.selectbox(
+        "Search in", [None, *index.postings], format_func=lambda c: "All text columns" if c is None else c,
+        key=f"{key}_search_in"
+    )
+    sort_by = sort_col.selectbox(
+        "Sort by", [None, *index.columns], format_func=lambda c: "Row order" if c is None else c, key=f"{key}_sort"
+    )
+    descending = order_col.toggle("Descending", key=f"{key}_descending")
+
+    range_col, slider_col = st.columns([1.5, 4.5], vertical_alignment="bottom")
+    range_by = range_col.selectbox(
+        "Filter range", [None, *index.numeric_columns()], format_func=lambda c: "No range filter" if c is None else c,
+        key=f"{key}_range_by"
+    )
+    ranges = {}
+    if range_by is not None and len(index.sorted_values[range_by]):
+        values = index.sorted_values[range_by]
+        low, high = values[0], values[-1]
+        if np.all(np.mod(values, 1) == 0):
+            low, high = int(low), int(high)
+        else:
+            low, high = float(low), float(high)
+        if low < high:
+            ranges[range_by] = slider_col.slider(range_by, low, high, (low, high), key=f"{key}_range_{range_by}")
+
+    tropes = {}
+    if index.trope_mask is not None:
+        all_col, any_col, none_col = st.columns(3)
+        tropes = {
+            "all_of": all_col.multiselect("Has all of these tropes", TROPES, key=f"{key}_tropes_all"),
+            "any_of": any_col.multiselect("Has any of these tropes", TROPES, key=f"{key}_tropes_any"),
+            "none_of": none_col.multiselect("Has none of these tropes", TROPES, key=f"{key}_tropes_none"),
+        }
+
+    rows = matching_rows(index, search, [search_in] if search_in else None, ranges, sort_by, descending, tropes)
+
+    size_col, page_col, info_col = st.columns([1, 1, 4], vertical_alignment="bottom")
+    page_size = size_col.selectbox("Rows per page", page_sizes, index=min(1, len(page_sizes) - 1), key=f"{key}_page_size")
+    n_pages = page_count(len(rows), page_size)
+    # a narrower filter can leave the stored page past the last one
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = n_pages
+    page = page_col.number_input("Page", min_value=1, max_value=n_pages, step=1, key=page_key)
+    shown = page_rows(rows, page, page_size)
+    first = (page - 1) * page_size + 1 if len(shown) else 0
+    info_col.caption(f"Rows {first}–{first + len(shown) - 1 if len(shown) else 0} of {len(rows)} matching ({index.n_rows} total)")
+
+    with span("st.dataframe"):
+        st.dataframe(df.iloc[shown], width="stretch")
+
+
+def _profile_value(value):
+    return "" if value is None else str(value)
+
+
+# column profiles of the listed variables as a frame for st.dataframe, None when none of them
+# is a column of the dataset (computed or external variables)
+@timed()
+def profile_section_df(rows, profile):
+    variables = [row["Variable"] for row in rows if row["Variable"] in profile]
+    if not variables:
+        return None
+    return pd.DataFrame([
+        {
+            "Variable": variable,
+            "Nulls": profile[variable].nulls,
+            "Distinct": profile[variable].distinct,
+            "Min": _profile_value(profile[variable].min),
+            "Max": _profile_value(profile[variable].max),
+            "Histogram": list(profile[variable].histogram) or None,
+            "Top values": ", ".join(f"{value} ({count})" for value, count in profile[variable].top),
+        }
+        for variable in variables
+    ])
+
+
+# column settings of the profile tables
+PROFILE_COLUMNS = {
+    "Histogram": st.column_config.BarChartColumn("Histogram", help="Value counts over min..max"),
+    "Top values": st.column_config.TextColumn("Top values", help="Most common values (count)"),
+}
@@ -0,0 +1,160 @@
+import json
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+import pandas as pd
+from utils.big_data import BIG_TEN_PATH, RAW_PATH, load_big_data, load_big_stats, stream_big_data
+from utils.columnar import cache_path, file_fingerprint, write_columnar
+from utils.schema import RAW_SCHEMA, clean_dtypes, read_dtypes
+from utils.stats import compute_stats, stats_path, write_stats
+from utils.store import get_dataset, register_dataset
+
+# one cleaned dataset per conference, described by a manifest
+CONFERENCE_DIR = Path("data/conferences")
+MANIFEST_PATH = CONFERENCE_DIR / "manifest.json"
+
+
+# file name friendly version of a conference name ("Pac-12" -> "pac_12")
+def slug(conference):
+    return re.sub(r"[^a-z0-9]+", "_", conference.lower()).strip("_")
+
+
+# where a conference's cleaned dataset lives, the big ten keeps its original location
+def partition_path(conference, out_dir=CONFERENCE_DIR):
+    if conference == "Big Ten" and Path(out_dir) == CONFERENCE_DIR:
+        return Path(BIG_TEN_PATH)
+    return Path(out_dir) / f"{slug(conference)}.csv"
+
+
+# split the raw file into one raw csv per conference, streaming so memory stays bounded
+def split_raw(raw_path, split_dir, chunksize):
+    parts = {}
+    reader = pd.read_csv(raw_path, usecols=list(RAW_SCHEMA), dtype=read_dtypes(), chunksize=chunksize)
+    for chunk in reader:
+        for conference, rows in chunk.groupby("conference", observed=True):
+            path = Path(split_dir) / f"{slug(conference)}.csv"
+            rows.to_csv(path, mode="a", index=False, header=conference not in parts)
+            parts[conference] = path
+    return parts
+
+
+# clean one conference's raw rows (runs in a worker process)
+# conferences with "Unknown" flags or years are stored with nullable integer columns
+def build_partition(conference, raw_path, out_path, chunksize):
+    try:
+        stats = stream_big_data(raw_path, out_path, conference, chunksize)
+        nullable = False
+    except ValueError:
+        stats = stream_big_data(raw_path, out_path, conference, chunksize, require_known=False)
+        nullable = True
+    df = pd.read_csv(out_path, dtype=clean_dtypes(require_known=not nullable))
+    write_columnar(df, cache_path(out_path), out_path)
+    write_stats(compute_stats(df, conference), stats_path(out_path), out_path)
+    return {
+        "path": str(out_path),
+        "rows": stats["rows_out"],
+        "schools": df["school"].nunique(),
+        "nullable": nullable,
+        "seconds": round(stats["seconds"], 3),
+    }
+
+
+# build every conference's cleaned dataset in parallel and write the manifest
+def build_conferences(raw_path=RAW_PATH, out_dir=CONFERENCE_DIR, workers=None, chunksize=100_000):
+    start = time.perf_counter()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as split_dir:
+        parts = split_raw(raw_path, split_dir, chunksize)
+        conferences = sorted(parts)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(
+                partial(build_partition, chunksize=chunksize),
+                conferences,
+                [parts[c] for c in conferences],
+                [partition_path(c, out_dir) for c in conferences],
+            )
+            partitions = dict(zip(conferences, results))
+
+    manifest = {
+        "source": str(raw_path),
+        "source_sha256": file_fingerprint(raw_path)["sha256"],
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seconds": round(time.perf_counter() - start, 3),
+        "partitions": partitions,
+    }
+    with open(Path(out_dir) / MANIFEST_PATH.name, "w") as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
+
+
+# read the partition manifest
+def load_manifest(path=MANIFEST_PATH):
+    if not Path(path).exists():
+        raise FileNotFoundError(
+            f"No conference manifest at {path}, build it with: python -m utils.conferences"
+        )
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+# conferences available in the manifest
+def list_conferences():
+    return sorted(load_manifest()["partitions"])
+
+
+# load only the partition for one conference, through the shared dataset store
+def get_conference_data(conference):
+    if conference == "Big Ten":
+        return get_dataset("big_ten")
+    name = f"conference:{conference}"
+    try:
+        return get_dataset(name)
+    except KeyError:
+        pass
+    partitions = load_manifest()["partitions"]
+    if conference not in partitions:
+        raise KeyError(f"Unknown conference: {conference}")
+    info = partitions[conference]
+    dtypes = clean_dtypes(require_known=not info["nullable"])
+    register_dataset(name, info["path"], partial(load_big_data, dtypes=dtypes))
+    return get_dataset(name)
+
+
+# aggregates of one conference, through the shared dataset store
+def get_conference_stats(conference):
+    if conference == "Big Ten":
+        return get_dataset("big_ten_stats")
+    name = f"conference_stats:{conference}"
+    try:
+        return get_dataset(name)
+    except KeyError:
+        pass
+    partitions = load_manifest()["partitions"]
+    if conference not in partitions:
+        raise KeyError(f"Unknown conference: {conference}")
+    info = partitions[conference]
+    dtypes = clean_dtypes(require_known=not info["nullable"])
+    register_dataset(name, info["path"], partial(load_big_stats, dtypes=dtypes, conference=conference))
+    return get_dataset(name)
+
+
+# command line entry: python -m utils.conferences [--workers N]
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build one cleaned dataset per conference from the raw fight songs csv")
+    parser.add_argument("--raw", default=RAW_PATH)
+    parser.add_argument("--out", default=str(CONFERENCE_DIR))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+
+    manifest = build_conferences(args.raw, args.out, args.workers, args.chunksize)
+    for conference, info in manifest["partitions"].items():
+        print(f"{conference:12} {info['rows']:>9,} rows  {info['schools']:>4} schools  -> {info['path']}")
+    print(f"built {len(manifest['partitions'])} partitions in {manifest['seconds']:.2f}s")
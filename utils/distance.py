@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from utils.tropes import TROPES
+
+# distances from a song's tropes to the conference centroid
+#   euclidean   -> straight line distance to the average trope usage
+#   cosine      -> 1 - cosine similarity with the average (ignores how many tropes a song has)
+#   hamming     -> number of tropes that differ from the majority pattern (tropes used by at least half the songs)
+#   mahalanobis -> euclidean scaled by how tropes vary and co-occur across the conference
+METRICS = ("euclidean", "cosine", "hamming", "mahalanobis")
+
+
+# songs x tropes float matrix, unknown flags count as absent
+def trope_matrix(df: pd.DataFrame):
+    return df[TROPES].to_numpy(dtype="float64", na_value=0)
+
+
+# distance of every row of X to the column means, as one matrix operation
+def centroid_distances(X, metric="euclidean"):
+    if metric not in METRICS:
+        raise ValueError(f"Unknown distance: {metric!r}, expected one of {list(METRICS)}")
+    centroid = X.mean(axis=0)
+    diff = X - centroid
+
+    if metric == "euclidean":
+        return np.sqrt(np.einsum("ij,ij->i", diff, diff))
+    if metric == "cosine":
+        norms = np.linalg.norm(X, axis=1) * np.linalg.norm(centroid)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            similarity = (X @ centroid) / norms
+        # a song with no tropes has no direction, treat it as unrelated to the centroid
+        return 1 - np.nan_to_num(similarity, nan=0.0)
+    if metric == "hamming":
+        return np.count_nonzero((X > 0) != (centroid >= 0.5), axis=1).astype("float64")
+    # pseudo-inverse, the covariance is singular whenever a trope never (or always) appears
+    inv_cov = np.linalg.pinv(np.cov(X, rowvar=False))
+    return np.sqrt(np.maximum(np.einsum("ij,jk,ik->i", diff, inv_cov, diff), 0))
+
+
+# every distance for every song, in a new frame aligned with the dataset rows (the input is not modified)
+def trope_distances(df: pd.DataFrame, metrics=METRICS):
+    X = trope_matrix(df)
+    distances = pd.DataFrame({metric: centroid_distances(X, metric) for metric in metrics}, index=df.index)
+    distances.insert(0, "school", df["school"])
+    return distances
+
+
+# most traditional (closest) and most unique (furthest) school for a distance, ties go to the first song
+def traditional_unique(distances: pd.DataFrame, metric="euclidean"):
+    values = distances[metric].to_numpy()
+    schools = distances["school"].to_numpy()
+    return schools[np.argmin(values)], schools[np.argmax(values)]
@@ -0,0 +1,142 @@
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import plotly.io as pio
+from utils.store import dataset_token
+
+# bounded lru cache of plotly figures shared by every session
+# figures are kept as their serialized json spec, keyed by the builder, its plain arguments
+# (schools, rank key, colors), the version of every dataset passed in and any extra dependencies.
+# calls with arguments the cache can't key, like frames that didn't come from the dataset store,
+# skip the cache and build as usual
+
+FIGURE_CACHE_BYTES = 64 * 2**20
+# key -> serialized figure (utf-8 json bytes), least recently used first
+_ENTRIES = OrderedDict()
+_LOCK = threading.Lock()
+_SETTINGS = {"max_bytes": FIGURE_CACHE_BYTES, "enabled": True}
+_STATS = {"hits": 0, "misses": 0, "evictions": 0, "bypassed": 0, "bytes": 0}
+_PLAIN = (str, int, float, bool, type(None))
+
+
+class _Unkeyable(Exception):
+    pass
+
+
+# hashable stand-in for an argument, store datasets are keyed by their name and version
+def _arg_key(value):
+    if isinstance(value, _PLAIN):
+        return value
+    if isinstance(value, (tuple, list)):
+        return tuple(_arg_key(v) for v in value)
+    token = dataset_token(value)
+    if token is None:
+        raise _Unkeyable(type(value).__name__)
+    return ("dataset", token)
+
+
+def _get(key):
+    with _LOCK:
+        spec = _ENTRIES.get(key)
+        if spec is None:
+            _STATS["misses"] += 1
+            return None
+        _ENTRIES.move_to_end(key)
+        _STATS["hits"] += 1
+        return spec
+
+
+# drop least recently used figures until `incoming` more bytes fit (call with the lock held)
+def _evict(incoming=0):
+    while _ENTRIES and _STATS["bytes"] + incoming > _SETTINGS["max_bytes"]:
+        _, spec = _ENTRIES.popitem(last=False)
+        _STATS["bytes"] -= len(spec)
+        _STATS["evictions"] += 1
+
+
+def _put(key, spec):
+    # figures larger than the whole cache are never kept
+    if len(spec) > _SETTINGS["max_bytes"]:
+        return
+    with _LOCK:
+        old = _ENTRIES.pop(key, None)
+        if old is not None:
+            _STATS["bytes"] -= len(old)
+        _evict(len(spec))
+        _ENTRIES[key] = spec
+        _STATS["bytes"] += len(spec)
+
+
+# decorator for figure builders, `depends` are called on every lookup and added to the key
+# (e.g. the palette version of a builder that reads school colors itself)
+def cached_figure(*depends):
+    def decorate(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _SETTINGS["enabled"]:
+                return fn(*args, **kwargs)
+            # bound arguments, so positional, keyword and default values of the same call share a key
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            try:
+                key = (
+                    name,
+                    tuple((k, _arg_key(v)) for k, v in bound.arguments.items()),
+                    tuple(d() for d in depends),
+                )
+            except _Unkeyable:
+                with _LOCK:
+                    _STATS["bypassed"] += 1
+                return fn(*args, **kwargs)
+            spec = _get(key)
+            if spec is not None:
+                return pio.from_json(spec)
+            fig = fn(*args, **kwargs)
+            # a builder that drew nothing has nothing to cache
+            if fig is not None:
+                _put(key, fig.to_json().encode())
+            return fig
+        return wrapper
+    return decorate
+
+
+# hit, miss, eviction and size counters
+def figure_cache_stats():
+    with _LOCK:
+        lookups = _STATS["hits"] + _STATS["misses"]
+        return {
+            **_STATS,
+            "entries": len(_ENTRIES),
+            "max_bytes": _SETTINGS["max_bytes"],
+            "hit_rate": _STATS["hits"] / lookups if lookups else 0.0,
+        }
+
+
+# change the byte budget, evicting right away if the cache is now over it
+def set_figure_cache_limit(max_bytes):
+    with _LOCK:
+        _SETTINGS["max_bytes"] = max_bytes
+        _evict()
+
+
+# drop every cached figure (counters are kept)
+def clear_figure_cache():
+    with _LOCK:
+        _ENTRIES.clear()
+        _STATS["bytes"] = 0
+
+
+# build every figure from scratch inside the block, for benchmarks of the builders themselves
+@contextmanager
+def figure_cache_disabled():
+    enabled = _SETTINGS["enabled"]
+    _SETTINGS["enabled"] = False
+    try:
+        yield
+    finally:
+        _SETTINGS["enabled"] = enabled
@@ -0,0 +1,165 @@
+import json
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from utils.big_data import BIG_TEN_PATH, RAW_PATH, big_data, load_big_data
+from utils.columnar import SOURCE_KEY, cache_path, file_fingerprint, hash_path, is_fresh, write_columnar
+from utils.schema import RAW_SCHEMA, apply_schema, clean_dtypes, columns_of, read_dtypes
+from utils.stats import compute_stats, stats_path, write_stats
+
+# a song is identified by its school and title
+KEY_COLS = ["school", "song_name"]
+
+
+# 64 bit hash of each row's school + song_name
+def key_hashes(raw: pd.DataFrame):
+    return pd.util.hash_pandas_object(raw[KEY_COLS], index=False).to_numpy()
+
+
+# 64 bit content hash of every raw row's other columns, computed in one vectorized pass
+# (rows are only ever compared with the row that has the same key, so the key isn't hashed again)
+def row_hashes(raw: pd.DataFrame):
+    cols = [col for col in RAW_SCHEMA if col not in KEY_COLS]
+    return pd.util.hash_pandas_object(raw[cols], index=False).to_numpy()
+
+
+# (school, song_name) pairs for a set of rows, used in the change report
+def song_list(rows: pd.DataFrame):
+    return list(rows[KEY_COLS].astype("str").itertuples(index=False, name=None))
+
+
+# raw rows of one conference, with duplicate song keys rejected
+def read_raw_rows(raw_path, conference):
+    raw = pd.read_csv(raw_path, usecols=list(RAW_SCHEMA), dtype=read_dtypes(), engine="pyarrow")
+    raw = raw[raw["conference"] == conference].reset_index(drop=True)
+    keys = key_hashes(raw)
+    dupes = pd.Index(keys).duplicated()
+    if dupes.any():
+        shown = ", ".join(f"{s} / {n}" for s, n in song_list(raw[dupes])[:5])
+        raise ValueError(f"Songs must be unique by school and song_name, found duplicates: {shown}")
+    return raw, keys
+
+
+# save the key and row hashes for the rows now in the cleaned dataset (the hash_path sidecar,
+# stored in the same order as the rows of the cleaned csv) with the fingerprint of that csv,
+# so a csv rewritten by anything else is noticed. call it after the csv is written
+def write_hashes(raw: pd.DataFrame, keys, hashes, out_path):
+    table = pa.table({
+        "school": raw["school"].astype("str").to_numpy(),
+        "song_name": raw["song_name"].astype("str").to_numpy(),
+        "key_hash": keys,
+        "row_hash": hashes,
+    })
+    table = table.replace_schema_metadata({SOURCE_KEY: json.dumps(file_fingerprint(out_path)).encode()})
+    feather.write_feather(table, hash_path(out_path), compression="uncompressed")
+
+
+# previous hash table, or None when there isn't one yet or the csv no longer is the one it describes
+# (its line positions would splice the wrong rows)
+def read_hashes(out_path):
+    path = hash_path(out_path)
+    if not path.exists() or not Path(out_path).exists():
+        return None
+    table = feather.read_table(path)
+    stored = (table.schema.metadata or {}).get(SOURCE_KEY)
+    if stored is None or not is_fresh(json.loads(stored), out_path):
+        return None
+    return table.to_pandas()
+
+
+# write the new csv by reusing the old file's lines for unchanged rows and only
+# formatting the converted ones, returns False if the old file can't be spliced
+def splice_csv(out_path, n_old, converted, take):
+    old_lines = Path(out_path).read_bytes().splitlines(keepends=True)
+    new_lines = converted.to_csv(index=False, header=False).encode().splitlines(keepends=True)
+    # quoted newlines inside a field would break the one row per line assumption
+    if len(old_lines) != n_old + 1 or len(new_lines) != len(converted):
+        return False
+    pool = np.array(old_lines[1:] + new_lines, dtype=object)
+    tmp_path = Path(out_path).with_suffix(".csv.tmp")
+    tmp_path.write_bytes(old_lines[0] + b"".join(pool[take]))
+    tmp_path.replace(out_path)
+    return True
+
+
+# rebuild a cleaned dataset by reprocessing only the raw rows that were inserted, updated or deleted
+# falls back to a full rebuild the first time (no hashes stored yet) and after the csv was rebuilt another way
+def incremental_big_data(raw_path=RAW_PATH, out_path=BIG_TEN_PATH, conference="Big Ten"):
+    start = time.perf_counter()
+    raw, keys = read_raw_rows(raw_path, conference)
+    hashes = row_hashes(raw)
+    previous = read_hashes(out_path)
+
+    if previous is None:
+        cleaned = apply_schema(raw)
+        cleaned.to_csv(out_path, index=False)
+        write_columnar(cleaned, cache_path(out_path), out_path)
+        write_stats(compute_stats(cleaned, conference), stats_path(out_path), out_path)
+        write_hashes(raw, keys, hashes, out_path)
+        return {
+            "mode": "full",
+            "inserted": [], "updated": [], "deleted": [],
+            "rows": len(cleaned),
+            "seconds": time.perf_counter() - start,
+        }
+
+    # line each raw row up with its position in the previous build (-1 = new song)
+    old_keys = pd.Index(previous["key_hash"].to_numpy())
+    old_pos = old_keys.get_indexer(keys)
+    inserted = old_pos < 0
+    updated = ~inserted & (previous["row_hash"].to_numpy()[old_pos] != hashes)
+    deleted = pd.Index(keys).get_indexer(old_keys) < 0
+    changed = inserted | updated
+
+    if changed.any() or deleted.any():
+        # convert only the changed rows
+        converted = apply_schema(raw[changed])
+
+        # where every output row comes from: the old dataset, or the converted rows after it
+        n_old = len(previous)
+        new_pos = np.cumsum(changed) - 1
+        take = np.where(changed, n_old + new_pos, old_pos)
+
+        # patch the loaded dataset the same way, so the columnar cache stays in step with the csv
+        old = load_big_data(out_path, clean_dtypes())
+        merged = pd.concat([old, converted], ignore_index=True).iloc[take].reset_index(drop=True)
+        for col in columns_of("category"):
+            merged[col] = merged[col].astype("str").astype("category")
+        merged = merged.astype(clean_dtypes())
+
+        if not splice_csv(out_path, n_old, converted, take):
+            merged.to_csv(out_path, index=False)
+        write_columnar(merged, cache_path(out_path), out_path)
+        write_stats(compute_stats(merged, conference), stats_path(out_path), out_path)
+        write_hashes(raw, keys, hashes, out_path)
+
+    return {
+        "mode": "incremental",
+        "inserted": song_list(raw[inserted]),
+        "updated": song_list(raw[updated]),
+        "deleted": song_list(previous[deleted]),
+        "rows": len(raw),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+# command line entry: python -m utils.incremental
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incrementally rebuild the cleaned Big Ten dataset")
+    parser.add_argument("--compare", action="store_true", help="also time a full rebuild for comparison")
+    args = parser.parse_args()
+
+    report = incremental_big_data()
+    print(f"{report['mode']} rebuild of {report['rows']} rows in {report['seconds'] * 1000:.1f} ms")
+    for change in ("inserted", "updated", "deleted"):
+        for school, song in report[change]:
+            print(f"  {change:8} {school}: {song}")
+    if args.compare:
+        start = time.perf_counter()
+        big_data()
+        print(f"full rebuild in {(time.perf_counter() - start) * 1000:.1f} ms")
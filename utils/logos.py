@@ -0,0 +1,340 @@
+import hashlib
+import io
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from PIL import Image
+from utils.columnar import file_fingerprint, is_fresh
+from utils.timing import timed
+
+# logo assets
+# data/logos/manifest.json maps every school (and the conference) to its svg original and its
+# hand-made png. the build step rasterizes each logo once and encodes it at several widths as png,
+# under content-hashed file names in data/logos/built with an index.json next to them.
+# pages ask for a logo at the width they show it and get the smallest variant that covers it,
+# as immutable bytes loaded once per process. the build never runs inside a page request: it runs
+# from `python -m utils.logos` or the background warm-up (ensure_logo_assets), and until a fresh
+# build exists the pages are served the manifest's hand-made pngs
+
+LOGO_ROOT = Path("data/logos")
+LOGO_MANIFEST = LOGO_ROOT / "manifest.json"
+LOGO_BUILD_DIR = LOGO_ROOT / "built"
+LOGO_INDEX = LOGO_BUILD_DIR / "index.json"
+# variant widths in image pixels, logos are never upscaled past their source
+LOGO_WIDTHS = (80, 160, 320, 640, 1280)
+# st.image sends png bytes as they are, as a media file the browser caches, but re-encodes webp
+# bytes to png on every call, so png is the only format built
+LOGO_FORMAT = "png"
+# streamlit downscales (and re-encodes) every image wider than this on each st.image call
+MAX_IMAGE_WIDTH = 1460
+# image pixels per css pixel on high density screens
+PIXEL_RATIO = 2
+LOGO_WORKERS = min(8, os.cpu_count() or 1)
+# css width of one logo of the home strip (less when the strip would pass MAX_IMAGE_WIDTH)
+STRIP_CELL = 80
+STRIP_PADDING = 6
+# {"stamps", "sources", "table", "strips"}, replaced as a whole on reload so a reader always sees
+# a table with the strips built from it
+_LOGOS = {"stamps": None, "sources": (), "table": MappingProxyType({}), "strips": {}}
+_LOGO_LOCK = threading.Lock()
+
+
+# one encoded variant of a logo, `data` is what st.image is given
+@dataclass(frozen=True)
+class LogoVariant:
+    width: int
+    height: int
+    format: str
+    file: str
+    data: bytes
+
+
+def load_manifest(path=LOGO_MANIFEST):
+    with open(path, "r") as f:
+        manifest = json.load(f)
+    return {**manifest["conference"], **manifest["schools"]}
+
+
+# school names of the manifest, in order
+def manifest_schools(path=LOGO_MANIFEST):
+    with open(path, "r") as f:
+        return list(json.load(f)["schools"])
+
+
+# svg rasterizer when cairosvg is installed (optional, not in requirements.txt),
+# otherwise the hand-made pngs are the source and the svgs are never rasterized
+def _svg_to_png():
+    try:
+        import cairosvg
+    except ImportError:
+        return None
+    return cairosvg.svg2png
+
+
+def _rasterizer():
+    return "cairosvg" if _svg_to_png() is not None else "png"
+
+
+# what the variants were built from, written to the build index and printed by the command line
+def _source_note(rasterizer):
+    if rasterizer == "cairosvg":
+        return "svg originals rasterized with cairosvg"
+    return "hand-made pngs, cairosvg is not installed so the svg originals were not rasterized"
+
+
+def _source_paths(entry):
+    return [LOGO_ROOT / entry[key] for key in ("original", "raster") if entry.get(key)]
+
+
+# full size rgba image of a logo
+def _source_image(entry):
+    svg_to_png = _svg_to_png()
+    if svg_to_png is not None and entry.get("original"):
+        png = svg_to_png(url=str(LOGO_ROOT / entry["original"]), output_width=max(LOGO_WIDTHS))
+        return Image.open(io.BytesIO(png)).convert("RGBA")
+    with Image.open(LOGO_ROOT / entry["raster"]) as image:
+        return image.convert("RGBA")
+
+
+def _encode(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def _slug(name):
+    return name.lower().replace(" ", "-")
+
+
+# every width of LOGO_WIDTHS clearly below the source width, plus the source width capped at the largest
+# (a downscale by a few percent only blurs the edges and grows the file)
+def variant_widths(source_width):
+    widths = [w for w in LOGO_WIDTHS if w < 0.9 * source_width]
+    return sorted(set(widths + [min(source_width, max(LOGO_WIDTHS))]))
+
+
+# encode one logo at every width, returns (name, [variant records], {file: bytes})
+def _build_logo(name, entry):
+    source = _source_image(entry)
+    records, files = [], {}
+    for width in variant_widths(source.width):
+        height = max(1, round(source.height * width / source.width))
+        image = source if width == source.width else source.resize((width, height), Image.LANCZOS)
+        data = _encode(image)
+        file = f"{_slug(name)}-{width}.{hashlib.sha256(data).hexdigest()[:12]}.{LOGO_FORMAT}"
+        records.append({"width": width, "height": height, "format": LOGO_FORMAT, "file": file})
+        files[file] = data
+    return name, records, files
+
+
+# build every logo variant in parallel and write the index, files no longer in it are removed
+@timed()
+def build_logo_assets(workers=LOGO_WORKERS, manifest_path=LOGO_MANIFEST, build_dir=LOGO_BUILD_DIR):
+    manifest = load_manifest(manifest_path)
+    build_dir = Path(build_dir)
+    build_dir.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        built = list(pool.map(lambda item: _build_logo(*item), manifest.items()))
+    logos = {}
+    for name, records, files in built:
+        for file, data in files.items():
+            # content hashed, an existing file already holds these bytes
+            if not (build_dir / file).exists():
+                (build_dir / file).write_bytes(data)
+        logos[name] = records
+    index = {
+        "manifest": file_fingerprint(manifest_path),
+        "sources": {str(p): file_fingerprint(p) for entry in manifest.values() for p in _source_paths(entry)},
+        "settings": _settings(),
+        "source": _source_note(_rasterizer()),
+        "logos": logos,
+    }
+    index_path = build_dir / LOGO_INDEX.name
+    tmp_path = index_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(index, f, indent=4)
+    tmp_path.replace(index_path)
+    keep = {record["file"] for records in logos.values() for record in records} | {index_path.name}
+    for path in build_dir.iterdir():
+        if path.name not in keep:
+            path.unlink()
+    return index
+
+
+def _settings():
+    return {"widths": list(LOGO_WIDTHS), "format": LOGO_FORMAT, "rasterizer": _rasterizer()}
+
+
+# the build index, None when it is missing or out of date with the manifest or any source
+def read_logo_index(index_path=LOGO_INDEX, manifest_path=LOGO_MANIFEST):
+    index_path = Path(index_path)
+    if not index_path.exists():
+        return None
+    try:
+        with open(index_path, "r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("settings") != _settings() or not is_fresh(index.get("manifest", {}), manifest_path):
+        return None
+    manifest = load_manifest(manifest_path)
+    sources = [p for entry in manifest.values() for p in _source_paths(entry)]
+    if set(index.get("sources", {})) != {str(p) for p in sources}:
+        return None
+    if not all(is_fresh(index["sources"][str(p)], p) for p in sources):
+        return None
+    if not all((index_path.parent / r["file"]).exists() for records in index["logos"].values() for r in records):
+        return None
+    return index
+
+
+def _variant(record, build_dir):
+    data = (Path(build_dir) / record["file"]).read_bytes()
+    return LogoVariant(record["width"], record["height"], record["format"], record["file"], data)
+
+
+# the hand-made png of a logo as its only variant, served while there is no fresh build
+# (only a source wider than streamlit's limit is re-encoded, once)
+def _raster_variant(entry):
+    path = LOGO_ROOT / entry["raster"]
+    data = path.read_bytes()
+    with Image.open(io.BytesIO(data)) as image:
+        width, height = image.size
+        if width > MAX_IMAGE_WIDTH:
+            image = image.convert("RGBA")
+            image.thumbnail((MAX_IMAGE_WIDTH, MAX_IMAGE_WIDTH), Image.LANCZOS)
+            width, height, data = image.width, image.height, _encode(image)
+    return LogoVariant(width, height, "png", entry["raster"], data)
+
+
+def _built_table(index):
+    return {
+        name: tuple(sorted((_variant(r, LOGO_BUILD_DIR) for r in records), key=lambda v: v.width))
+        for name, records in index["logos"].items()
+    }
+
+
+def _raster_table(manifest):
+    return {name: (_raster_variant(entry),) for name, entry in manifest.items()}
+
+
+# build the variants when the build is missing or stale, outside of any page request
+# (python -m utils.logos or the background warm-up), False when the build directory can't be written
+@timed()
+def ensure_logo_assets():
+    if read_logo_index() is not None:
+        return True
+    try:
+        build_logo_assets()
+    except OSError:
+        return False
+    return True
+
+
+# stat stamps of the manifest, the build index and the sources listed in the manifest last loaded
+# (a changed manifest changes its own stamp, so the list is re-read only then)
+def _stamps(sources):
+    stamps = []
+    for path in [LOGO_MANIFEST, LOGO_INDEX, *sources]:
+        stat = path.stat() if path.exists() else None
+        stamps.append((str(path), stat and stat.st_mtime_ns, stat and stat.st_size))
+    return tuple(stamps)
+
+
+# the current {"table", "strips", ...}, reloaded when the manifest, a source or the build index changes
+def _logo_state():
+    global _LOGOS
+    state = _LOGOS
+    if state["stamps"] != _stamps(state["sources"]):
+        with _LOGO_LOCK:
+            state = _LOGOS
+            if state["stamps"] != _stamps(state["sources"]):
+                manifest = load_manifest()
+                sources = [p for entry in manifest.values() for p in _source_paths(entry)]
+                # stamp before reading, a build finishing meanwhile changes the index stamp and reloads again
+                stamps = _stamps(sources)
+                index = read_logo_index()
+                try:
+                    table = _built_table(index) if index is not None else _raster_table(manifest)
+                except OSError:
+                    # built files removed under us
+                    table = _raster_table(manifest)
+                state = {"stamps": stamps, "sources": sources, "table": MappingProxyType(table), "strips": {}}
+                _LOGOS = state
+    return state
+
+
+# name -> variants (narrowest first) of every logo, the hand-made pngs while there is no fresh build
+def logo_table():
+    return _logo_state()["table"]
+
+
+# smallest variant that covers a display width (css pixels), the largest if none does
+def pick_variant(variants, display_width):
+    for variant in variants:
+        if variant.width >= display_width * PIXEL_RATIO:
+            return variant
+    return variants[-1]
+
+
+# png bytes for st.image of a logo shown `display_width` css pixels wide
+@timed()
+def get_logo(name, display_width):
+    table = logo_table()
+    if name not in table:
+        raise KeyError(f"No logo for {name}")
+    return pick_variant(table[name], display_width).data
+
+
+# every school logo side by side in equal square cells, `cell` image pixels each
+def build_logo_strip(table, schools, cell, padding=STRIP_PADDING):
+    strip = Image.new("RGBA", (cell * len(schools), cell), (0, 0, 0, 0))
+    inner = cell - 2 * padding
+    for i, school in enumerate(schools):
+        variant = pick_variant(table[school], inner / PIXEL_RATIO)
+        with Image.open(io.BytesIO(variant.data)) as image:
+            image = image.convert("RGBA")
+        image.thumbnail((inner, inner), Image.LANCZOS)
+        strip.alpha_composite(image, (i * cell + (cell - image.width) // 2, (cell - image.height) // 2))
+    return _encode(strip)
+
+
+# png bytes for st.image of the home logo strip (manifest order), built once per logo table
+# and stored with that table, so a reload can't mix a strip of one build into another
+@timed()
+def logo_strip(cell=STRIP_CELL):
+    state = _logo_state()
+    with _LOGO_LOCK:
+        if cell not in state["strips"]:
+            schools = manifest_schools()
+            cell_pixels = min(cell * PIXEL_RATIO, MAX_IMAGE_WIDTH // len(schools))
+            state["strips"][cell] = build_logo_strip(state["table"], schools, cell_pixels)
+        return state["strips"][cell]
+
+
+# command line entry: python -m utils.logos [--workers N]
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build the multi-width png logo variants from the logo manifest")
+    parser.add_argument("--workers", type=int, default=LOGO_WORKERS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = build_logo_assets(args.workers)
+    seconds = time.perf_counter() - start
+    total = 0
+    for name, records in index["logos"].items():
+        sizes = {record["width"]: (LOGO_BUILD_DIR / record["file"]).stat().st_size for record in records}
+        total += sum(sizes.values())
+        print(f"{name:16} " + "  ".join(f"{w}w {size / 1024:.1f}" for w, size in sizes.items()))
+    print(
+        f"{sum(len(r) for r in index['logos'].values())} variants of {len(index['logos'])} logos "
+        f"({total / 2**20:.1f} MB, KB per width) in {seconds:.2f}s on {args.workers} threads"
+    )
+    print(f"built from {index['source']}")
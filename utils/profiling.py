@@ -0,0 +1,163 @@
+from dataclasses import dataclass
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from utils.big_data import BIG_TEN_PATH, RAW_PATH
+from utils.schema import read_dtypes
+from utils.store import get_dataset, register_dataset
+from utils.timing import timed
+
+# column profiles for the data dictionary
+# nulls, distinct values, min/max, a histogram and the top values of every column, all derived from
+# per column value counts. the counts come from one pass over a frame, or chunk by chunk for a raw file
+# too big to load, and the profiles are built once per dataset version
+
+HIST_BINS = 10
+TOP_K = 3
+# raw files larger than this are profiled chunk by chunk straight from the csv
+PROFILE_STREAM_BYTES = 64 * 2**20
+PROFILE_CHUNKSIZE = 100_000
+
+
+# profile of one column
+@dataclass(frozen=True)
+class ColumnProfile:
+    column: str
+    # "numeric" or "text" (strings and categories)
+    kind: str
+    rows: int
+    nulls: int
+    distinct: int
+    # None for text columns
+    min: object
+    max: object
+    # bin counts over min..max, empty for text columns
+    histogram: tuple
+    # (value, count) of the most common values, most common first
+    top: tuple
+
+
+# profiles of every column of a dataset
+@dataclass(frozen=True)
+class DatasetProfile:
+    rows: int
+    columns: dict
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def __contains__(self, column):
+        return column in self.columns
+
+
+# value counts and nulls of every column of one frame (or chunk)
+# numeric columns are counted together: one np.unique over (column, value) pairs of the whole block
+def frame_counts(df: pd.DataFrame):
+    numeric = [c for c in df.columns if _is_numeric(df[c])]
+    counts, nulls = {}, {}
+    if numeric:
+        block = df[numeric].to_numpy(dtype="float64", na_value=np.nan)
+        valid = ~np.isnan(block)
+        nulls.update(zip(numeric, (~valid).sum(axis=0).tolist()))
+        column_ids = np.broadcast_to(np.arange(len(numeric)), block.shape)[valid]
+        pairs, pair_counts = np.unique(np.column_stack([column_ids, block[valid]]), axis=0, return_counts=True)
+        starts = np.searchsorted(pairs[:, 0], np.arange(len(numeric) + 1))
+        for i, column in enumerate(numeric):
+            counts[column] = pd.Series(pair_counts[starts[i]:starts[i + 1]], index=pairs[starts[i]:starts[i + 1], 1])
+    for column in df.columns:
+        if column in counts:
+            continue
+        codes, uniques = pd.factorize(df[column].astype("string"), use_na_sentinel=True)
+        nulls[column] = int((codes < 0).sum())
+        counts[column] = pd.Series(
+            np.bincount(codes[codes >= 0], minlength=len(uniques)), index=np.asarray(uniques, dtype=object)
+        )
+    return {
+        "rows": len(df),
+        "columns": list(df.columns),
+        "kinds": {c: "numeric" if c in numeric else "text" for c in df.columns},
+        "counts": counts,
+        "nulls": nulls,
+    }
+
+
+# add the counts of two chunks
+def merge_counts(left, right):
+    return {
+        "rows": left["rows"] + right["rows"],
+        "columns": left["columns"],
+        "kinds": left["kinds"],
+        "counts": {c: left["counts"][c].add(right["counts"][c], fill_value=0).astype("int64") for c in left["columns"]},
+        "nulls": {c: left["nulls"][c] + right["nulls"][c] for c in left["columns"]},
+    }
+
+
+def _is_numeric(values: pd.Series):
+    return pd.api.types.is_numeric_dtype(values) and not isinstance(values.dtype, pd.CategoricalDtype)
+
+
+# python value of a count index entry, so whole numbers print without a trailing .0
+def _plain(value):
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return int(value)
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _column_profile(column, kind, rows, nulls, counts: pd.Series):
+    # ties go to the smallest value, so chunked and whole-frame profiles agree
+    top = counts.sort_index().sort_values(ascending=False, kind="stable").head(TOP_K)
+    top = tuple((_plain(value), int(count)) for value, count in top.items())
+    if kind == "numeric" and len(counts):
+        values = counts.index.to_numpy(dtype="float64")
+        histogram, _ = np.histogram(values, bins=HIST_BINS, weights=counts.to_numpy())
+        low, high = _plain(values.min()), _plain(values.max())
+        return ColumnProfile(column, kind, rows, nulls, len(counts), low, high, tuple(int(c) for c in histogram), top)
+    return ColumnProfile(column, kind, rows, nulls, len(counts), None, None, (), top)
+
+
+def finish_profile(counts):
+    return DatasetProfile(
+        rows=counts["rows"],
+        columns={
+            column: _column_profile(column, counts["kinds"][column], counts["rows"], counts["nulls"][column], counts["counts"][column])
+            for column in counts["columns"]
+        },
+    )
+
+
+# profile of a frame in one pass, nothing in the frame is modified
+def profile_frame(df: pd.DataFrame):
+    return finish_profile(frame_counts(df))
+
+
+# profile of a csv read chunk by chunk, only the value counts are kept in memory
+def profile_csv(path, dtypes=None, chunksize=PROFILE_CHUNKSIZE):
+    counts = None
+    for chunk in pd.read_csv(path, dtype=dtypes, chunksize=chunksize):
+        chunk_counts = frame_counts(chunk)
+        counts = chunk_counts if counts is None else merge_counts(counts, chunk_counts)
+    return finish_profile(counts)
+
+
+def load_big_profile(path=BIG_TEN_PATH):
+    return profile_frame(get_dataset("big_ten"))
+
+
+def load_raw_profile(path=RAW_PATH):
+    if Path(path).stat().st_size > PROFILE_STREAM_BYTES:
+        return profile_csv(path, read_dtypes())
+    return profile_frame(get_dataset("raw"))
+
+
+register_dataset("big_ten_profile", BIG_TEN_PATH, load_big_profile)
+register_dataset("raw_profile", RAW_PATH, load_raw_profile)
+
+
+# dataset name -> name of its profile
+PROFILES = {"big_ten": "big_ten_profile", "raw": "raw_profile"}
+
+
+# column profiles of a dataset of the store
+@timed()
+def get_profile(name):
+    return get_dataset(PROFILES[name])
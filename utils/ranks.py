@@ -0,0 +1,89 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+import numpy as np
+import pandas as pd
+from utils.big_data import BIG_TEN_PATH, dataset_at
+from utils.store import get_dataset, register_dataset
+from utils.timing import timed
+from utils.visuals import RANK_CONFIG
+
+# the year chart plots years as an offset from a decade before the oldest song
+YEAR_PADDING = 10
+
+
+# sort order and ranks of every song for one RANK_CONFIG metric
+@dataclass(frozen=True)
+class RankOrder:
+    # row positions of the dataset in chart order
+    order: np.ndarray
+    # rank of every row (n_schools = first place), aligned with the dataset rows
+    ranks: np.ndarray
+    # school of every bar and plotted values, in chart order
+    schools: np.ndarray
+    values: np.ndarray
+    # subtracted from the plotted values (the year chart's offset, 0 for every other metric)
+    base: int
+    mean: float
+    n_schools: int
+    # school -> rank, for O(1) lookups (read only, like the arrays)
+    rank_of: MappingProxyType
+    # school -> position in chart order
+    position_of: MappingProxyType
+
+    def rank(self, school):
+        return self.rank_of[school]
+
+
+# read only copy of an array that is shared between sessions
+def _frozen(values):
+    values = np.array(values)
+    values.flags.writeable = False
+    return values
+
+
+# one RankOrder per RANK_CONFIG entry, built once per dataset version and shared read only
+def build_rank_index(df: pd.DataFrame):
+    n_schools = len(df)
+    schools = df["school"].astype("str").to_numpy()
+    year_base = int(df["year"].min()) - YEAR_PADDING if n_schools else 0
+
+    index = {}
+    for rank_key, cfg in RANK_CONFIG.items():
+        values = df[cfg.get("original", cfg["col"])].reset_index(drop=True)
+        # same stable order the charts used to get from sort_values on every rerun
+        order = values.sort_values(ascending=cfg["ascending"], kind="stable").index.to_numpy()
+        base = year_base if cfg.get("axis_mode") == "year_offset" else 0
+        plotted = values.to_numpy()[order] - base
+
+        # the last bar is ranked first
+        ranks = np.empty(n_schools, dtype="int64")
+        ranks[order] = n_schools - np.arange(n_schools)
+        # a school's first bar in chart order wins, like the .loc[...].iloc[0] lookup it replaces
+        ordered_schools = schools[order]
+        position_of = {school: pos for pos, school in reversed(list(enumerate(ordered_schools)))}
+        index[rank_key] = RankOrder(
+            order=_frozen(order),
+            ranks=_frozen(ranks),
+            schools=_frozen(ordered_schools),
+            values=_frozen(plotted),
+            base=base,
+            mean=float((values - base).mean()),
+            n_schools=n_schools,
+            rank_of=MappingProxyType({school: n_schools - pos for school, pos in position_of.items()}),
+            position_of=MappingProxyType(position_of),
+        )
+    return MappingProxyType(index)
+
+
+# load the rank index of the dataset at path
+def load_rank_index(path=BIG_TEN_PATH):
+    return build_rank_index(dataset_at(path))
+
+
+register_dataset("big_ten_ranks", BIG_TEN_PATH, load_rank_index)
+
+
+# big ten rank index, rank_key -> RankOrder
+@timed()
+def get_rank_index():
+    return get_dataset("big_ten_ranks")
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+# how each column of the raw fight songs csv is stored once cleaned
+#   category -> repeated labels, stored as a pandas categorical
+#   text     -> free text
+#   flag     -> "Yes"/"No" column, stored as 1/0
+#   year     -> four digit year
+# flags and years may also hold "Unknown" in the raw file
+#   int8/16  -> whole numbers stored in the smallest type that fits them
+RAW_SCHEMA = {
+    "school": "category",
+    "conference": "category",
+    "song_name": "text",
+    "writers": "text",
+    "year": "year",
+    "student_writer": "flag",
+    "official_song": "flag",
+    "contest": "flag",
+    "bpm": "int16",
+    "sec_duration": "int16",
+    "fight": "flag",
+    "number_fights": "int8",
+    "victory": "flag",
+    "win_won": "flag",
+    "victory_win_won": "flag",
+    "rah": "flag",
+    "nonsense": "flag",
+    "colors": "flag",
+    "men": "flag",
+    "opponents": "flag",
+    "spelling": "flag",
+    "trope_count": "int8",
+    "spotify_id": "text",
+}
+
+UNKNOWN = "Unknown"
+FLAG_VALUES = ("Yes", "No")
+# how many bad values to show in an error message
+MAX_REPORTED = 5
+
+
+# columns of a given kind, in schema order
+def columns_of(kind, schema=RAW_SCHEMA):
+    return [col for col, col_kind in schema.items() if col_kind == kind]
+
+
+# dtypes to hand read_csv for the raw file
+# numbers are left to the parser and validated afterwards so bad rows get a readable error
+def read_dtypes(schema=RAW_SCHEMA):
+    dtypes = {}
+    for col, kind in schema.items():
+        if kind in ("category", "flag", "year"):
+            dtypes[col] = "category"
+        elif kind == "text":
+            dtypes[col] = "str"
+    return dtypes
+
+
+# dtypes of the cleaned dataset
+# when unknown values are allowed flags and years use pandas' nullable integer types
+def clean_dtypes(schema=RAW_SCHEMA, require_known=True):
+    dtypes = {}
+    for col, kind in schema.items():
+        if kind == "flag":
+            dtypes[col] = "int8" if require_known else "Int8"
+        elif kind == "year":
+            dtypes[col] = "int16" if require_known else "Int16"
+        else:
+            dtypes[col] = kind if kind != "text" else "str"
+    return dtypes
+
+
+# build a readable error listing the first few offending rows of a column
+def _bad_rows_error(col, values, bad, expected):
+    bad_values = values[bad]
+    shown = ", ".join(
+        f"line {idx + 2}: {val!r}" for idx, val in list(bad_values.items())[:MAX_REPORTED]
+    )
+    return ValueError(
+        f"Column '{col}' has {int(bad.sum())} value(s) that are not {expected} ({shown})"
+    )
+
+
+# integer array from float values, nullable when unknowns are allowed
+def _to_int(values, unknown, dtype, require_known):
+    if require_known:
+        return values.astype(dtype)
+    return pd.array(np.where(unknown, np.nan, values), dtype=dtype.capitalize())
+
+
+# convert a raw fight songs frame to the cleaned types in one pass
+# raises ValueError naming the column and rows when a value doesn't fit the schema,
+# "Unknown" flags/years are only accepted when require_known is False
+def apply_schema(df: pd.DataFrame, schema=RAW_SCHEMA, require_known=True):
+    missing = [col for col in schema if col not in df.columns]
+    if missing:
+        raise ValueError(f"Raw data is missing columns: {', '.join(missing)}")
+
+    out = {}
+    allowed = "" if require_known else f" or '{UNKNOWN}'"
+
+    # every yes/no column is checked and converted as a single block
+    flags = columns_of("flag", schema)
+    if flags:
+        block = df[flags].astype("category")
+        known = block.isin(FLAG_VALUES)
+        unknown = block.isin((UNKNOWN,)) | block.isna()
+        valid = known if require_known else known | unknown
+        if not valid.to_numpy().all():
+            col = valid.columns[~valid.all()][0]
+            raise _bad_rows_error(col, block[col], ~valid[col], f"'Yes' or 'No'{allowed}")
+        converted = (block == FLAG_VALUES[0]).to_numpy().astype(np.int8)
+        unknown = unknown.to_numpy()
+        for i, col in enumerate(flags):
+            out[col] = _to_int(converted[:, i], unknown[:, i], "int8", require_known)
+
+    # years are parsed once per distinct value and spread back out with the category codes
+    for col in columns_of("year", schema):
+        values = df[col].astype("category")
+        labels = pd.Series(values.cat.categories.astype("str"))
+        label_unknown = labels.eq(UNKNOWN).to_numpy()
+        label_years = pd.to_numeric(labels.mask(label_unknown), errors="coerce").to_numpy()
+        codes = values.cat.codes.to_numpy()
+        missing = codes == -1
+        unknown = missing | np.where(missing, False, label_unknown[codes])
+        years = np.where(missing, np.nan, label_years[codes])
+        bad = np.isnan(years) & ~unknown
+        if require_known:
+            bad |= unknown
+        if bad.any():
+            raise _bad_rows_error(col, df[col], pd.Series(bad, index=df.index), f"a year{allowed}")
+        out[col] = _to_int(years, unknown, "int16", require_known)
+
+    for kind in ("int8", "int16"):
+        limits = np.iinfo(kind)
+        for col in columns_of(kind, schema):
+            values = pd.to_numeric(df[col], errors="coerce")
+            bad = values.isna() | (values < limits.min) | (values > limits.max) | (values % 1 != 0)
+            if bad.any():
+                raise _bad_rows_error(col, df[col], bad, f"whole numbers that fit {kind}")
+            out[col] = values.astype(kind)
+
+    for col in columns_of("category", schema):
+        out[col] = df[col].astype("category").cat.remove_unused_categories()
+    for col in columns_of("text", schema):
+        out[col] = df[col].astype("str")
+
+    # keep the original column order (and any columns the schema doesn't know about)
+    cleaned = pd.DataFrame(
+        {col: out.get(col, df[col]) for col in df.columns},
+        index=df.index,
+    )
+    return cleaned
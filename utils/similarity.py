@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from utils.tropes import TROPES
+
+# song features compared between schools, each scaled to unit variance so no single one dominates
+FEATURES = TROPES + ["bpm", "sec_duration", "year", "number_fights"]
+# rows per block of the pairwise computation, bounds the temporary memory to BLOCK_SIZE x n
+BLOCK_SIZE = 2048
+
+
+# school x school distances and similarities over FEATURES
+@dataclass(frozen=True)
+class SimilarityMatrix:
+    schools: np.ndarray
+    # euclidean distance between the schools' standardized feature vectors
+    distances: np.ndarray
+    # school -> row of the matrices
+    position_of: dict
+
+    # 1 for identical songs, falling towards 0 as they grow apart
+    @property
+    def similarities(self):
+        return 1 / (1 + self.distances)
+
+    def distance(self, school_a, school_b):
+        return float(self.distances[self.position_of[school_a], self.position_of[school_b]])
+
+    def as_frame(self):
+        return pd.DataFrame(self.similarities, index=self.schools, columns=self.schools)
+
+
+# one standardized feature vector per school (the mean of its songs when it has several)
+def school_features(df: pd.DataFrame):
+    X = df[FEATURES].to_numpy(dtype="float64", na_value=np.nan)
+    std = np.nanstd(X, axis=0)
+    X = (X - np.nanmean(X, axis=0)) / np.where(std > 0, std, 1)
+    # unknown values sit at the average
+    X = np.nan_to_num(X, nan=0.0)
+    codes, schools = pd.factorize(df["school"].astype("str"))
+    if len(schools) == len(df):
+        return schools.to_numpy(), X
+    sums = np.zeros((len(schools), X.shape[1]))
+    np.add.at(sums, codes, X)
+    return schools.to_numpy(), sums / np.bincount(codes)[:, None]
+
+
+# pairwise euclidean distances, one block of rows at a time (|a|^2 + |b|^2 - 2ab)
+def pairwise_distances(X, block_size=BLOCK_SIZE):
+    n = len(X)
+    sq_norms = np.einsum("ij,ij->i", X, X)
+    out = np.empty((n, n), dtype="float32" if n > block_size else "float64")
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        block = sq_norms[start:stop, None] + sq_norms[None, :] - 2 * (X[start:stop] @ X.T)
+        # rounding can leave tiny negatives where the distance is zero
+        np.sqrt(np.maximum(block, 0), out=block)
+        out[start:stop] = block
+    np.fill_diagonal(out, 0)
+    return out
+
+
+# build the similarity matrix for a dataset
+def build_similarity(df: pd.DataFrame, block_size=BLOCK_SIZE):
+    schools, X = school_features(df)
+    distances = pairwise_distances(X, block_size)
+    distances.flags.writeable = False
+    return SimilarityMatrix(
+        schools=schools,
+        distances=distances,
+        position_of={school: i for i, school in enumerate(schools)},
+    )
+
+
+# the k schools whose songs are closest to a school's song, as (school, similarity) pairs
+def closest_schools(matrix: SimilarityMatrix, school, k=3):
+    if school not in matrix.position_of:
+        raise KeyError(f"Unknown school: {school}")
+    row = matrix.distances[matrix.position_of[school]].astype("float64")
+    row[matrix.position_of[school]] = np.inf
+    k = min(k, len(row) - 1)
+    # partial sort for the k closest, then order just those (ties keep dataset order)
+    nearest = np.argpartition(row, k - 1)[:k] if 0 < k < len(row) else np.arange(0)
+    nearest = nearest[np.lexsort((nearest, row[nearest]))]
+    return [(str(matrix.schools[i]), float(1 / (1 + row[i]))) for i in nearest]
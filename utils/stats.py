@@ -0,0 +1,122 @@
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from utils.columnar import file_fingerprint, is_fresh
+from utils.distance import centroid_distances, trope_matrix
+from utils.schema import RAW_SCHEMA
+from utils.tropes import RADAR_TROPES, TROPES
+
+# every numeric column of the cleaned dataset (years, flags and counts)
+NUMERIC_COLS = [col for col, kind in RAW_SCHEMA.items() if kind not in ("category", "text")]
+QUANTILES = {"q25": 0.25, "q50": 0.5, "q75": 0.75}
+
+
+# conference level aggregates, computed once per dataset version and shared by every page
+@dataclass(frozen=True)
+class ConferenceStats:
+    conference: str
+    rows: int
+    # column -> mean, std (None below two values), min, max, q25, q50, q75, argmin and argmax (school)
+    columns: dict
+    # trope -> number of songs that use it
+    trope_sums: dict
+
+    def __getitem__(self, col):
+        return self.columns[col]
+
+    def mean(self, col):
+        return self.columns[col]["mean"]
+
+    # most used trope, ties go to the first trope in RADAR_TROPES
+    @property
+    def top_trope(self):
+        return max(RADAR_TROPES, key=lambda trope: self.trope_sums[trope])
+
+    # average use of every trope, in radar order
+    @property
+    def trope_means(self):
+        return pd.Series({trope: self.mean(trope) for trope in RADAR_TROPES})
+
+    def to_dict(self):
+        return asdict(self)
+
+
+# python number of the column's kind, so ints stay ints when written to json
+def _number(value, integer):
+    if np.isnan(value):
+        return None
+    return int(value) if integer else float(value)
+
+
+# aggregates of a cleaned dataset in one vectorized pass over its numeric columns
+def compute_stats(df: pd.DataFrame, conference="Big Ten"):
+    cols = [col for col in NUMERIC_COLS if col in df.columns]
+    values = df[cols].to_numpy(dtype="float64", na_value=np.nan)
+    schools = df["school"].astype("str").to_numpy()
+
+    # euclidean distance of each song's tropes from the conference average (most traditional -> most unique),
+    # from the same engine as the traditional/unique rankings
+    tropes = trope_matrix(df)
+    distance = centroid_distances(tropes, "euclidean")
+    cols.append("distance_to_conf_avg")
+    values = np.column_stack([values, distance])
+
+    # the sample std needs two values, a column with fewer (a one song conference) gets None
+    stds = np.full(len(cols), np.nan)
+    enough = np.count_nonzero(~np.isnan(values), axis=0) >= 2
+    with np.errstate(all="ignore"):
+        means = np.nanmean(values, axis=0)
+        if enough.any():
+            stds[enough] = np.nanstd(values[:, enough], axis=0, ddof=1)
+        mins = np.nanmin(values, axis=0)
+        maxs = np.nanmax(values, axis=0)
+        quantiles = np.nanquantile(values, list(QUANTILES.values()), axis=0)
+    # nan never wins, so argmin/argmax land on the first row holding the extreme value
+    argmins = np.argmin(np.where(np.isnan(values), np.inf, values), axis=0)
+    argmaxs = np.argmax(np.where(np.isnan(values), -np.inf, values), axis=0)
+
+    columns = {}
+    for i, col in enumerate(cols):
+        integer = col != "distance_to_conf_avg"
+        columns[col] = {
+            "mean": float(means[i]),
+            "std": _number(stds[i], False),
+            "min": _number(mins[i], integer),
+            "max": _number(maxs[i], integer),
+            **{name: float(quantiles[j, i]) for j, name in enumerate(QUANTILES)},
+            "argmin": str(schools[argmins[i]]) if len(df) else None,
+            "argmax": str(schools[argmaxs[i]]) if len(df) else None,
+        }
+    sums = dict(zip(TROPES, tropes.sum(axis=0).tolist()))
+    trope_sums = {trope: int(sums[trope]) for trope in RADAR_TROPES}
+    return ConferenceStats(conference, len(df), columns, trope_sums)
+
+
+# path of the stats file that sits next to a cleaned csv
+def stats_path(csv_path):
+    return Path(csv_path).with_suffix(".stats.json")
+
+
+# write the stats with the fingerprint of the csv they were computed from
+def write_stats(stats: ConferenceStats, path, source_path):
+    tmp_path = Path(path).with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"source": file_fingerprint(source_path), **stats.to_dict()}, f, indent=4)
+    tmp_path.replace(path)
+
+
+# read a stats file, returns None when it is missing or out of date with its csv
+def read_stats(path, source_path):
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not is_fresh(data.pop("source", {}), source_path):
+        return None
+    return ConferenceStats(**data)
@@ -0,0 +1,134 @@
+import threading
+import weakref
+from pathlib import Path
+import pandas as pd
+
+# process-wide dataset store
+# streamlit keeps imported modules alive between reruns and sessions, so everything
+# here is shared by every page and every user of the server process
+
+# name -> (source path, loader)
+_REGISTRY = {}
+# name -> {"df", "stamp", "version", "token"}
+_ENTRIES = {}
+# one lock per dataset so only a single caller loads it while the rest wait
+_LOCKS = {}
+_REGISTRY_LOCK = threading.Lock()
+# id -> (reference, "name@version") of everything handed out, so caches can tell which
+# dataset version an object came from. references are weak wherever the type allows it, the rest
+# (dicts, mapping proxies) are dropped as soon as their entry is replaced or cleared
+_TOKENS = {}
+_STATS = {"loads": 0, "hits": 0, "waits": 0}
+_STATS_LOCK = threading.Lock()
+
+
+# register a loader for a dataset name, the loader is called with the source path
+def register_dataset(name, path, loader):
+    with _REGISTRY_LOCK:
+        _REGISTRY[name] = (str(path), loader)
+        _LOCKS.setdefault(name, threading.Lock())
+
+
+def _count(stat):
+    with _STATS_LOCK:
+        _STATS[stat] += 1
+
+
+# cheap stat based stamp used to notice that the source file changed
+def _stamp(path):
+    stat = Path(path).stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+# forget a token once its object is gone, unless the id was already reused for another object
+def _forget(ref, key):
+    found = _TOKENS.get(key)
+    if found is not None and found[0] is ref:
+        del _TOKENS[key]
+
+
+def _track(obj, token):
+    key = id(obj)
+    try:
+        ref = weakref.ref(obj, lambda ref, key=key: _forget(ref, key))
+    except TypeError:
+        # not weak referenceable, held until its entry is replaced (see get_dataset and clear_store)
+        ref = lambda: obj
+    _TOKENS[key] = (ref, token)
+
+
+# read-only view of a loaded dataset
+# with copy-on-write (always on from pandas 3, required in requirements.txt) a shallow copy shares
+# memory with the stored frame, and any write made by a page copies the touched column instead of
+# changing the shared one (other artifacts, like conference stats, are immutable and shared as is)
+def _view(df: pd.DataFrame, token):
+    if isinstance(df, pd.DataFrame):
+        view = df.copy(deep=False)
+        _track(view, token)
+        return view
+    if dataset_token(df) != token:
+        _track(df, token)
+    return df
+
+
+# "name@version" of an object handed out by get_dataset, None for anything else
+def dataset_token(obj):
+    found = _TOKENS.get(id(obj))
+    if found is None or found[0]() is not obj:
+        return None
+    return found[1]
+
+
+# get a dataset by name, loading it at most once per source version
+def get_dataset(name):
+    if name not in _REGISTRY:
+        raise KeyError(f"Unknown dataset: {name}")
+    path, loader = _REGISTRY[name]
+    stamp = _stamp(path)
+
+    entry = _ENTRIES.get(name)
+    if entry is not None and entry["stamp"] == stamp:
+        _count("hits")
+        return _view(entry["df"], entry["token"])
+
+    lock = _LOCKS[name]
+    if lock.locked():
+        _count("waits")
+    with lock:
+        # another thread may have finished the load while this one waited
+        entry = _ENTRIES.get(name)
+        if entry is not None and entry["stamp"] == stamp:
+            _count("hits")
+            return _view(entry["df"], entry["token"])
+        df = loader(path)
+        version = f"{stamp[0]:x}-{stamp[1]:x}"
+        token = f"{name}@{version}"
+        if entry is not None:
+            _TOKENS.pop(id(entry["df"]), None)
+        _ENTRIES[name] = {"df": df, "stamp": stamp, "version": version, "token": token}
+        _count("loads")
+    return _view(df, token)
+
+
+# version string of a dataset, changes whenever its source file changes
+def dataset_version(name):
+    entry = _ENTRIES.get(name)
+    if entry is None or entry["stamp"] != _stamp(_REGISTRY[name][0]):
+        get_dataset(name)
+        entry = _ENTRIES[name]
+    return entry["version"]
+
+
+# load and hit counters for the store
+def store_stats():
+    with _STATS_LOCK:
+        stats = dict(_STATS)
+    return {**stats, "datasets": sorted(_ENTRIES)}
+
+
+# drop every loaded dataset (counters are kept)
+def clear_store():
+    with _REGISTRY_LOCK:
+        for entry in _ENTRIES.values():
+            _TOKENS.pop(id(entry["df"]), None)
+        _ENTRIES.clear()
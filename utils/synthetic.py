@@ -0,0 +1,106 @@
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from utils.big_data import RAW_PATH
+from utils.schema import RAW_SCHEMA, UNKNOWN
+from utils.tropes import TROPES
+
+# synthetic raw fight songs for load and scale testing
+# every synthetic song starts from a real song of the raw file (so conferences, schools, writers and
+# "Unknown" values keep their real mix), then its numbers are redrawn from a kernel density estimate
+# of the real values and a few trope flags are flipped
+
+# (low, high) clip range of the redrawn numeric columns
+NUMERIC_RANGES = {"bpm": (40, 220), "sec_duration": (15, 300), "year": (1840, 2025)}
+# chance that any one trope flag is flipped
+FLIP_RATE = 0.05
+SPOTIFY_ALPHABET = np.frombuffer(b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz", dtype="S1")
+
+
+# silverman's rule of thumb bandwidth for a gaussian kernel density estimate
+def bandwidth(values):
+    values = np.asarray(values, dtype="float64")
+    return 1.06 * values.std(ddof=1) * len(values) ** -0.2
+
+
+# one chunk of synthetic raw rows, song numbers start at `offset` so names stay unique across chunks
+def synthetic_chunk(real: pd.DataFrame, rows, rng, offset=0, school_variants=1):
+    picks = rng.integers(0, len(real), rows)
+    chunk = real.iloc[picks].reset_index(drop=True)
+
+    # (school, song_name) stays unique, schools can be split into variants to get more of them
+    if school_variants > 1:
+        variant = rng.integers(0, school_variants, rows).astype("str")
+        chunk["school"] = chunk["school"] + " " + pd.Series(variant)
+    chunk["song_name"] = chunk["song_name"] + " #" + pd.Series(np.arange(offset, offset + rows)).astype("str")
+
+    # numbers drawn from a kernel density estimate around the real values ("Unknown" years stay unknown)
+    for col, (low, high) in NUMERIC_RANGES.items():
+        real_values = pd.to_numeric(real[col], errors="coerce").to_numpy(dtype="float64")
+        values = real_values[picks] + rng.normal(0, bandwidth(real_values[~np.isnan(real_values)]), rows)
+        known = ~np.isnan(values)
+        values = np.clip(np.rint(np.nan_to_num(values)), low, high).astype("int64")
+        chunk[col] = values if known.all() else np.where(known, values.astype("str"), UNKNOWN)
+
+    # tropes keep their real co-occurrence, with a few flags flipped
+    flags = chunk[TROPES].to_numpy() == "Yes"
+    flags ^= rng.random(flags.shape) < FLIP_RATE
+    for i, trope in enumerate(TROPES):
+        chunk[trope] = np.where(flags[:, i], "Yes", "No")
+    chunk["victory_win_won"] = np.where(flags[:, 1] | flags[:, 2], "Yes", "No")
+    chunk["trope_count"] = flags.sum(axis=1)
+
+    # fight counts come from real songs that use the word
+    real_fights = pd.to_numeric(real.loc[real["fight"] == "Yes", "number_fights"]).to_numpy()
+    chunk["number_fights"] = np.where(flags[:, 0], rng.choice(real_fights, rows), 0)
+
+    # random 22 character ids, built as one fixed width byte string per row
+    ids = SPOTIFY_ALPHABET[rng.integers(0, len(SPOTIFY_ALPHABET), (rows, 22))]
+    chunk["spotify_id"] = np.ascontiguousarray(ids).view("S22").ravel().astype("str")
+    return chunk[list(RAW_SCHEMA)]
+
+
+# write a synthetic raw file with the same schema as the real one, chunk by chunk so
+# tens of millions of rows never have to fit in memory at once
+def generate_catalog(out_path, rows, seed=0, school_variants=1, chunksize=500_000, source=RAW_PATH):
+    start = time.perf_counter()
+    real = pd.read_csv(source, dtype="str", keep_default_na=False)
+    rng = np.random.default_rng(seed)
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = out_path.with_suffix(".csv.tmp")
+    # arrow's csv writer is ~20x faster than to_csv here (it quotes every text field, which read_csv handles the same)
+    options = pa_csv.WriteOptions(include_header=False)
+    with open(tmp_path, "wb") as f:
+        f.write((",".join(RAW_SCHEMA) + "\n").encode())
+        for offset in range(0, rows, chunksize):
+            n = min(chunksize, rows - offset)
+            chunk = synthetic_chunk(real, n, rng, offset, school_variants)
+            pa_csv.write_csv(pa.Table.from_pandas(chunk, preserve_index=False), f, options)
+    tmp_path.replace(out_path)
+    return {
+        "path": str(out_path),
+        "rows": rows,
+        "mb": out_path.stat().st_size / 1e6,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+# command line entry: python -m utils.synthetic OUT --rows N [--seed S]
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic raw fight songs csv for load testing")
+    parser.add_argument("out")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--school-variants", type=int, default=1, help="split every real school into this many synthetic schools")
+    parser.add_argument("--chunksize", type=int, default=500_000)
+    args = parser.parse_args()
+
+    info = generate_catalog(args.out, args.rows, args.seed, args.school_variants, args.chunksize)
+    print(f"wrote {info['rows']:,} rows ({info['mb']:.1f} MB) to {info['path']} in {info['seconds']:.2f}s")
@@ -0,0 +1,180 @@
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from utils.big_data import BIG_TEN_PATH, RAW_PATH
+from utils.store import get_dataset, register_dataset
+from utils.timing import timed
+from utils.tropes import has_trope_columns, pack_tropes, query_tropes
+
+# column indexes for the data dictionary explorer
+# built once per dataset version so paging, sorting and filtering only touch row positions,
+# and the page sends just the visible rows instead of the whole frame
+
+# columns searched through the inverted index
+TEXT_COLUMNS = ("school", "song_name", "writers")
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+# sort order of every column, sorted values of the numeric ones and postings of the text ones
+@dataclass(frozen=True)
+class TableIndex:
+    columns: tuple
+    n_rows: int
+    # column -> row positions in ascending order, missing values last
+    sorted_rows: dict
+    # column -> number of non-missing values (the head of sorted_rows)
+    n_valid: dict
+    # numeric column -> its non-missing values in ascending order, aligned with sorted_rows
+    sorted_values: dict
+    # text column -> token -> row positions containing it (ascending)
+    postings: dict
+    # text column -> sorted tokens, for prefix lookups
+    vocab: dict
+    # packed trope flags of every row (utils.tropes), None when the frame has no trope columns
+    trope_mask: object = None
+
+    def numeric_columns(self):
+        return [c for c in self.columns if c in self.sorted_values]
+
+
+# read only copy of an array that is shared between sessions
+def _frozen(values):
+    values = np.array(values)
+    values.flags.writeable = False
+    return values
+
+
+def tokenize(text):
+    return _TOKEN.findall(str(text).lower())
+
+
+def _sort_column(values: pd.Series):
+    # strings (and categories) sort case-insensitively by their text, not by category code
+    if not pd.api.types.is_numeric_dtype(values) or isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype("string").str.lower()
+    ordered = values.reset_index(drop=True).sort_values(kind="stable", na_position="last")
+    return ordered.index.to_numpy(), int(ordered.notna().sum()), ordered
+
+
+def _postings(values: pd.Series):
+    rows = {}
+    for row, text in enumerate(values):
+        if pd.isna(text):
+            continue
+        for token in set(tokenize(text)):
+            rows.setdefault(token, []).append(row)
+    return {token: _frozen(np.array(r, dtype="int64")) for token, r in rows.items()}
+
+
+# build every index of a frame, nothing in the frame is modified
+# `trope_mask` reuses an already packed mask of the same rows (the store's big_ten_tropes)
+def build_table_index(df: pd.DataFrame, text_columns=TEXT_COLUMNS, trope_mask=None):
+    sorted_rows, n_valid, sorted_values, postings, vocab = {}, {}, {}, {}, {}
+    for column in df.columns:
+        rows, valid, ordered = _sort_column(df[column])
+        sorted_rows[column] = _frozen(rows)
+        n_valid[column] = valid
+        if pd.api.types.is_numeric_dtype(df[column]) and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            sorted_values[column] = _frozen(ordered.to_numpy(dtype="float64")[:valid])
+    for column in text_columns:
+        if column in df.columns:
+            postings[column] = _postings(df[column])
+            vocab[column] = sorted(postings[column])
+    if trope_mask is None and has_trope_columns(df):
+        trope_mask = _frozen(pack_tropes(df))
+    return TableIndex(
+        columns=tuple(df.columns),
+        n_rows=len(df),
+        sorted_rows=sorted_rows,
+        n_valid=n_valid,
+        sorted_values=sorted_values,
+        postings=postings,
+        vocab=vocab,
+        trope_mask=trope_mask,
+    )
+
+
+# rows with a token starting with `prefix` in any of the columns
+def _prefix_rows(index: TableIndex, prefix, columns):
+    found = []
+    for column in columns:
+        vocab = index.vocab[column]
+        i = bisect_left(vocab, prefix)
+        while i < len(vocab) and vocab[i].startswith(prefix):
+            found.append(index.postings[column][vocab[i]])
+            i += 1
+    return np.unique(np.concatenate(found)) if found else np.empty(0, dtype="int64")
+
+
+# boolean row mask of a search (every word must start a word of one of the columns),
+# of numeric ranges {column: (low, high)} and of trope conditions {"all_of", "any_of", "none_of"}
+# (see utils.tropes.query_tropes), None when nothing is filtered
+def filter_mask(index: TableIndex, search=None, search_columns=None, ranges=None, tropes=None):
+    mask = None
+    columns = [c for c in (search_columns or index.postings) if c in index.postings]
+    for token in tokenize(search or ""):
+        token_mask = np.zeros(index.n_rows, dtype=bool)
+        token_mask[_prefix_rows(index, token, columns)] = True
+        mask = token_mask if mask is None else mask & token_mask
+    for column, (low, high) in (ranges or {}).items():
+        values = index.sorted_values[column]
+        start, stop = np.searchsorted(values, low, "left"), np.searchsorted(values, high, "right")
+        range_mask = np.zeros(index.n_rows, dtype=bool)
+        range_mask[index.sorted_rows[column][start:stop]] = True
+        mask = range_mask if mask is None else mask & range_mask
+    if tropes and any(tropes.values()):
+        trope_mask = query_tropes(index.trope_mask, **tropes)
+        mask = trope_mask if mask is None else mask & trope_mask
+    return mask
+
+
+# row positions of every matching row in display order
+# descending order keeps missing values last
+@timed()
+def matching_rows(index: TableIndex, search=None, search_columns=None, ranges=None, sort_by=None, descending=False, tropes=None):
+    if sort_by is None:
+        rows = np.arange(index.n_rows)
+    else:
+        rows = index.sorted_rows[sort_by]
+        if descending:
+            valid = index.n_valid[sort_by]
+            rows = np.concatenate([rows[:valid][::-1], rows[valid:]])
+    mask = filter_mask(index, search, search_columns, ranges, tropes)
+    if mask is not None:
+        rows = rows[mask[rows]]
+    return rows
+
+
+# number of pages of `n_rows` rows (at least one, so an empty result still has a page)
+def page_count(n_rows, page_size):
+    return max(1, -(-n_rows // page_size))
+
+
+# the rows of one page (1-based)
+def page_rows(rows, page, page_size):
+    start = (max(page, 1) - 1) * page_size
+    return rows[start:start + page_size]
+
+
+def load_big_table_index(path=BIG_TEN_PATH):
+    return build_table_index(get_dataset("big_ten"), trope_mask=get_dataset("big_ten_tropes"))
+
+
+def load_raw_table_index(path=RAW_PATH):
+    return build_table_index(get_dataset("raw"))
+
+
+register_dataset("big_ten_table_index", BIG_TEN_PATH, load_big_table_index)
+register_dataset("raw_table_index", RAW_PATH, load_raw_table_index)
+
+
+# dataset name -> name of its table index
+TABLE_INDEXES = {"big_ten": "big_ten_table_index", "raw": "raw_table_index"}
+
+
+# table index of a dataset of the store
+@timed()
+def get_table_index(name):
+    return get_dataset(TABLE_INDEXES[name])
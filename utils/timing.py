@@ -0,0 +1,202 @@
+import atexit
+import functools
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from utils.figure_cache import figure_cache_stats
+
+# render timing spans
+# pages call begin_trace() at the top of every rerun and end_trace() at the bottom, in between
+# `with span(name):` blocks and @timed() utils functions record how long they took. nothing is
+# recorded outside of a trace, so the decorated functions cost one attribute lookup when tracing is off
+# ?debug=1 in the url shows the spans of the current rerun in a sidebar overlay, and the spans of each
+# rerun are appended to TRACE_PATH in one write when it ends
+
+TRACE_PATH = Path("data/traces/render.jsonl")
+# the trace file is rotated to render.jsonl.1 (replacing the previous one) once it would pass this size
+TRACE_MAX_BYTES = 8 * 2**20
+DEBUG_PARAM = "debug"
+# streamlit runs every rerun of a session in its own script thread
+_local = threading.local()
+_TRACE_LOCK = threading.Lock()
+# session id -> its trace that has not been written yet, a rerun cut short by st.stop() or an
+# exception never reaches end_trace(), its spans are written when the session's next trace begins
+_OPEN_TRACES = {}
+
+
+# true when the debug query parameter is set to anything but an "off" value
+def debug_enabled():
+    value = st.query_params.get(DEBUG_PARAM)
+    return value is not None and value.lower() not in ("", "0", "false", "off")
+
+
+def _session_id():
+    ctx = get_script_run_ctx()
+    return None if ctx is None else ctx.session_id
+
+
+def _fragment_rerun():
+    ctx = get_script_run_ctx()
+    return ctx is not None and bool(ctx.fragment_ids_this_run)
+
+
+# start collecting spans for this rerun, tracing stays off unless the debug query parameter is set
+def begin_trace(page, overlay=True):
+    session = _session_id()
+    with _TRACE_LOCK:
+        unfinished = _OPEN_TRACES.pop(session, None)
+    if unfinished is not None:
+        _write_trace(unfinished)
+    if not debug_enabled():
+        _local.trace = None
+        return
+    _local.trace = {
+        "page": page,
+        "run": uuid.uuid4().hex[:12],
+        "started": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "t0": time.perf_counter(),
+        "stack": [],
+        "spans": [],
+        "overlay": st.sidebar.empty() if overlay else None,
+    }
+    with _TRACE_LOCK:
+        _OPEN_TRACES[session] = _local.trace
+
+
+# call at the bottom of a page: writes the spans of the rerun and stops recording
+def end_trace():
+    trace = getattr(_local, "trace", None)
+    _local.trace = None
+    if trace is None:
+        return
+    with _TRACE_LOCK:
+        if _OPEN_TRACES.get(_session_id()) is trace:
+            del _OPEN_TRACES[_session_id()]
+    _write_trace(trace)
+
+
+# call at the top of an st.fragment: a fragment-only rerun gets its own trace (fragments can't
+# redraw the sidebar overlay), a full rerun keeps recording into the page's trace
+def begin_fragment_trace(page):
+    if _fragment_rerun():
+        begin_trace(f"{page} (fragment)", overlay=False)
+
+
+# call at the bottom of an st.fragment, ends the trace of a fragment-only rerun
+def end_fragment_trace():
+    if _fragment_rerun():
+        end_trace()
+
+
+# time a block, nested spans are recorded with their depth
+@contextmanager
+def span(name):
+    trace = getattr(_local, "trace", None)
+    if trace is None:
+        yield
+        return
+    stack = trace["stack"]
+    parent = " > ".join(stack)
+    stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        stack.pop()
+        depth = len(stack)
+        record = {
+            "name": name,
+            "parent": parent,
+            "depth": depth,
+            "start_ms": round((start - trace["t0"]) * 1000, 3),
+            "ms": round((end - start) * 1000, 3),
+        }
+        trace["spans"].append(record)
+        # redraw after every top level span so reruns cut short by st.stop() still show up
+        if depth == 0 and trace["overlay"] is not None:
+            _render_overlay(trace)
+
+
+# decorator form of span, named module.function unless a name is given
+def timed(name=None):
+    def decorate(fn):
+        label = name or f"{fn.__module__.removeprefix('utils.')}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "trace", None) is None:
+                return fn(*args, **kwargs)
+            with span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# spans collected so far in this rerun
+def current_spans():
+    trace = getattr(_local, "trace", None)
+    return [] if trace is None else list(trace["spans"])
+
+
+# one json line per span of a trace, tagged with the page and rerun id, appended in a single write
+def _write_trace(trace, path=TRACE_PATH, max_bytes=TRACE_MAX_BYTES):
+    if not trace["spans"]:
+        return
+    tags = {"page": trace["page"], "run": trace["run"], "started": trace["started"]}
+    data = "".join(json.dumps({**tags, **record}) + "\n" for record in trace["spans"]).encode()
+    try:
+        with _TRACE_LOCK:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.exists() and path.stat().st_size + len(data) > max_bytes:
+                path.replace(path.with_name(path.name + ".1"))
+            with open(path, "ab") as f:
+                f.write(data)
+    except OSError:
+        # read-only deployments still get the overlay
+        pass
+
+
+# traces of reruns that never reached end_trace()
+@atexit.register
+def _write_open_traces():
+    with _TRACE_LOCK:
+        traces = list(_OPEN_TRACES.values())
+        _OPEN_TRACES.clear()
+    for trace in traces:
+        _write_trace(trace)
+
+
+# collapsible table of the rerun's spans in start order, indented by depth,
+# with repeated spans under the same parent summed
+def _render_overlay(trace):
+    rows = {}
+    for s in sorted(trace["spans"], key=lambda s: s["start_ms"]):
+        key = (s["parent"], s["depth"], s["name"])
+        row = rows.setdefault(key, {"calls": 0, "ms": 0.0, "max_ms": 0.0})
+        row["calls"] += 1
+        row["ms"] += s["ms"]
+        row["max_ms"] = max(row["max_ms"], s["ms"])
+    lines = [
+        "| span | calls | total ms | max ms |",
+        "|:--|--:|--:|--:|",
+    ]
+    for (_, depth, name), row in rows.items():
+        indent = "&nbsp;&nbsp;&nbsp;&nbsp;" * depth
+        lines.append(f"| {indent}{name} | {row['calls']} | {row['ms']:.1f} | {row['max_ms']:.1f} |")
+    elapsed = (time.perf_counter() - trace["t0"]) * 1000
+    with trace["overlay"].container():
+        with st.expander(f"Render timings: {elapsed:.0f} ms", expanded=False):
+            st.caption(f"{trace['page']} rerun {trace['run']}, written to {TRACE_PATH} when it ends")
+            cache = figure_cache_stats()
+            st.caption(
+                f"figure cache: {cache['hits']} hits, {cache['misses']} misses, {cache['evictions']} evictions, "
+                f"{cache['entries']} figures in {cache['bytes'] / 2**20:.1f} of {cache['max_bytes'] / 2**20:.0f} MB"
+            )
+            st.markdown("\n".join(lines), unsafe_allow_html=True)
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+# the trope flag columns, every module takes its trope list from here
+TROPES = ["fight", "victory", "win_won", "rah", "nonsense", "colors", "men", "opponents", "spelling"]
+# the same tropes in the order the radar plots and the heatmap draw them
+RADAR_TROPES = TROPES[::-1]
+# bit assigned to each trope flag in the packed mask (fight = bit 0 ... spelling = bit 8)
+TROPE_BITS = {trope: 1 << i for i, trope in enumerate(TROPES)}
+ALL_TROPES = (1 << len(TROPE_BITS)) - 1
+# number of set bits for every possible mask value
+_POPCOUNT = np.array([bin(value).count("1") for value in range(ALL_TROPES + 1)], dtype="uint8")
+
+
+# pack the nine trope flags of every song into one uint16 (unknown flags count as absent)
+# cleaned 0/1 flags and raw "Yes"/"No" flags are both accepted
+def pack_tropes(df: pd.DataFrame):
+    mask = np.zeros(len(df), dtype="uint16")
+    for trope, bit in TROPE_BITS.items():
+        values = df[trope]
+        if pd.api.types.is_numeric_dtype(values) and not isinstance(values.dtype, pd.CategoricalDtype):
+            flags = values.to_numpy(dtype="uint16", na_value=0)
+        else:
+            # comparing a missing flag gives <NA>, which the arrow backed bool can't convert to a number
+            flags = (values.astype("string") == "Yes").fillna(False).to_numpy(dtype="uint16")
+        mask |= flags * np.uint16(bit)
+    return mask
+
+
+# whether a frame has every trope flag column
+def has_trope_columns(df: pd.DataFrame):
+    return all(trope in df.columns for trope in TROPE_BITS)
+
+
+# turn a mask back into one 0/1 column per trope
+def unpack_tropes(mask):
+    return pd.DataFrame({trope: ((mask & bit) != 0).astype("int8") for trope, bit in TROPE_BITS.items()})
+
+
+# bits for a list of trope names
+def trope_bits(tropes):
+    bits = 0
+    for trope in tropes:
+        if trope not in TROPE_BITS:
+            raise ValueError(f"Unknown trope: {trope!r}, expected one of {list(TROPE_BITS)}")
+        bits |= TROPE_BITS[trope]
+    return np.uint16(bits)
+
+
+# songs that contain every one of the tropes
+def has_all(mask, tropes):
+    bits = trope_bits(tropes)
+    return (mask & bits) == bits
+
+
+# songs that contain at least one of the tropes
+def has_any(mask, tropes):
+    return (mask & trope_bits(tropes)) != 0
+
+
+# songs that contain none of the tropes
+def has_none(mask, tropes):
+    return (mask & trope_bits(tropes)) == 0
+
+
+# number of tropes in each song (or in each song's subset of the given tropes)
+def trope_counts(mask, tropes=None):
+    if tropes is not None:
+        mask = mask & trope_bits(tropes)
+    return _POPCOUNT[mask]
+
+
+# boolean row filter combining all/any/none conditions, e.g.
+# query_tropes(mask, all_of=["fight"], none_of=["spelling"])
+def query_tropes(mask, all_of=(), any_of=(), none_of=()):
+    keep = np.ones(len(mask), dtype=bool)
+    if all_of:
+        keep &= has_all(mask, all_of)
+    if any_of:
+        keep &= has_any(mask, any_of)
+    if none_of:
+        keep &= has_none(mask, none_of)
+    return keep
@@ -1,27 +1,39 @@
+from collections.abc import Mapping
+import importlib
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
-import json
-from pathlib import Path
-from utils.colors import hex_to_rgb
+from utils.colors import fill_color, palette_version, primary_colors
+from utils.figure_cache import cached_figure
+from utils.stats import ConferenceStats
+from utils.tropes import RADAR_TROPES
+from utils.timing import span, timed
+
+
+# module imported on first attribute access
+# plotly.express takes ~40 ms to import and only the scatter and heatmap builders use it,
+# so pages that never draw them (and every page's first import) don't pay for it
+class LazyModule:
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+px = LazyModule("plotly.express")
 
 
 # radar plot for big ten average trpoe values
-def big_radar_plot(df: pd.DataFrame):
-    # trope columns
-    tropes = ['spelling', 
-            'opponents', 
-            'men', 
-            'colors', 
-            'nonsense',
-            'rah',
-            'win_won',
-            'victory',
-            'fight']
-    
+@timed()
+@cached_figure()
+def big_radar_figure(stats: ConferenceStats):
     # means of trope columns
-    trope_means = df[tropes].mean()
+    trope_means = stats.trope_means
 
     # get categories and values
     cats = trope_means.index.tolist()
@@ -57,19 +69,27 @@ def big_radar_plot(df: pd.DataFrame):
         margin=dict(t=80, b=40, l=40, r=40),
     )
 
-    st.plotly_chart(fig, theme="streamlit", width="stretch")
+    return fig
+
+
+# draw big_radar_figure on the page
+@timed()
+def big_radar_plot(stats: ConferenceStats):
+    fig = big_radar_figure(stats)
+    with span("st.plotly_chart"):
+        st.plotly_chart(fig, theme="streamlit", width="stretch")
 
 
 
 # scatterplot for all big ten schools (tempo vs duration)
-def big_tempo_duration(df: pd.DataFrame):
+@timed()
+@cached_figure(palette_version)
+def big_tempo_duration_figure(df: pd.DataFrame, stats: ConferenceStats):
     # get tempo and duration means
-    tempo_mean = df['bpm'].mean()
-    duration_mean = df['sec_duration'].mean()
-    # loading colors
-    COLOR_PATH = Path("data/colors/school_colors.json")
-    with open(COLOR_PATH, "r") as f:
-        SCHOOL_COLORS = json.load(f)
+    tempo_mean = stats.mean('bpm')
+    duration_mean = stats.mean('sec_duration')
+    # school colors from the shared palette table
+    SCHOOL_COLORS = primary_colors()
     
     # create plot
     fig = px.scatter(df, x='sec_duration', y='bpm', title="Big Ten Tempo vs. Duration", 
@@ -97,21 +117,23 @@ def big_tempo_duration(df: pd.DataFrame):
         annotation_position="bottom right"
     )
     
-    st.plotly_chart(fig, theme="streamlit", width="stretch")
+    return fig
+
+
+# draw big_tempo_duration_figure on the page
+@timed()
+def big_tempo_duration(df: pd.DataFrame, stats: ConferenceStats):
+    fig = big_tempo_duration_figure(df, stats)
+    with span("st.plotly_chart"):
+        st.plotly_chart(fig, theme="streamlit", width="stretch")
 
 
 # heatmap for whether or not a trope is present in a big ten fight song
-def big_trope_heatmap(df: pd.DataFrame):
+@timed()
+@cached_figure()
+def big_trope_heatmap_figure(df: pd.DataFrame):
     # trope columns
-    tropes = ['spelling', 
-            'opponents', 
-            'men', 
-            'colors', 
-            'nonsense',
-            'rah',
-            'win_won',
-            'victory',
-            'fight']
+    tropes = RADAR_TROPES
     
     # get means of trope columns
     df = df.sort_values(by='school')
@@ -135,25 +157,25 @@ def big_trope_heatmap(df: pd.DataFrame):
         )
     )
     
-    st.plotly_chart(fig, theme="streamlit", width="stretch")
+    return fig
+
+
+# draw big_trope_heatmap_figure on the page
+@timed()
+def big_trope_heatmap(df: pd.DataFrame):
+    fig = big_trope_heatmap_figure(df)
+    with span("st.plotly_chart"):
+        st.plotly_chart(fig, theme="streamlit", width="stretch")
 
 
 # creates a radar plot for a school with the trope values present, and overlays it on top of the big ten average trope values
-def school_radar_plot(df: pd.DataFrame, school, school_color="FFFFFF"):
-    tropes = [
-        'spelling',
-        'opponents',
-        'men',
-        'colors',
-        'nonsense',
-        'rah',
-        'win_won',
-        'victory',
-        'fight'
-    ]
+@timed()
+@cached_figure()
+def school_radar_figure(df: pd.DataFrame, stats: ConferenceStats, school, school_color="FFFFFF"):
+    tropes = RADAR_TROPES
 
     # big ten
-    trope_means = df[tropes].mean()
+    trope_means = stats.trope_means
     cats = trope_means.index.tolist()
     big_vals = trope_means.values.tolist()
 
@@ -170,10 +192,6 @@ def school_radar_plot(df: pd.DataFrame, school, school_color="FFFFFF"):
 
     fig = go.Figure()
 
-    rgbs = hex_to_rgb(school_color)
-    r_ = rgbs[0]
-    g_ = rgbs[1]
-    b_ = rgbs[2]
     # School trace 
     fig.add_trace(
         go.Scatterpolar(
@@ -182,7 +200,7 @@ def school_radar_plot(df: pd.DataFrame, school, school_color="FFFFFF"):
             fill="toself",
             name=school,
             line=dict(width=4, color=school_color),
-            fillcolor=f"rgba({r_}, {g_}, {b_}, 0.25)",
+            fillcolor=fill_color(school_color),
             hovertemplate=f"<b>%{{theta}}</b><br>{school}: %{{r:.3f}}<extra></extra>"
         )
     )
@@ -222,9 +240,19 @@ def school_radar_plot(df: pd.DataFrame, school, school_color="FFFFFF"):
         margin=dict(t=80, b=60, l=40, r=40),
     )
 
-    st.plotly_chart(fig, theme="streamlit", width="stretch")
+    return fig
+
 
+# draw school_radar_figure on the page
+@timed()
+def school_radar_plot(df: pd.DataFrame, stats: ConferenceStats, school, school_color="FFFFFF"):
+    fig = school_radar_figure(df, stats, school, school_color)
+    with span("st.plotly_chart"):
+        st.plotly_chart(fig, theme="streamlit", width="stretch")
 
+
+# bars of schools that aren't highlighted
+RANK_GREY = "rgb(150, 150, 150)"
 # rank dictionary used to grab the characertistics of the bar charts
 RANK_CONFIG = {
     "Tempo Rank": {
@@ -264,38 +292,66 @@ RANK_CONFIG = {
     }
 }
 
+
+# bar colors of several rank charts in one pass, highlighted schools in their colors and the rest grey
+# (the first school wins if two share a bar)
+def rank_bar_colors(ranks: Mapping, rank_keys, schools, colors):
+    school_matrix = np.stack([ranks[rank_key].schools for rank_key in rank_keys])
+    bar_colors = np.full(school_matrix.shape, RANK_GREY)
+    for school, color in reversed(list(zip(schools, colors))):
+        bar_colors = np.where(school_matrix == school, color, bar_colors)
+    return bar_colors
+
+
+# rank bar charts of several RANK_CONFIG metrics with one or two highlighted schools, built together
+# bar order, ranks and averages come from the precomputed rank index (utils.ranks) and the bar colors
+# of every chart from one vectorized pass, nothing passed in is modified. returns rank_key -> figure
+@timed()
+def rank_bar_figures(ranks: Mapping, rank_keys, schools, colors, avg_color="grey"):
+    rank_keys, schools, colors = list(rank_keys), list(schools), list(colors)
+    if len(schools) not in (1, 2) or len(colors) != len(schools):
+        raise ValueError("rank_bar_figures takes one or two schools with one color each")
+    bar_colors = rank_bar_colors(ranks, rank_keys, schools, colors)
+    figures = {}
+    for rank_key, row_colors in zip(rank_keys, bar_colors):
+        if len(schools) == 1:
+            figures[rank_key] = _rank_bars(ranks[rank_key], RANK_CONFIG[rank_key], schools[0], colors[0], avg_color, row_colors)
+        else:
+            figures[rank_key] = _rank_bars_dual(
+                ranks[rank_key], RANK_CONFIG[rank_key], schools[0], schools[1], colors[0], colors[1], avg_color, row_colors
+            )
+    return figures
+
+
 # creates bar charts based on a number of variables, specific school highlighted with the rest grey
-def big_ten_rank_bars(df: pd.DataFrame, school, rank_key, color, color2):
-    year_min = df['year'].min() - 10
-    df['year_offset'] = df['year'] - year_min
-    cfg = RANK_CONFIG[rank_key]
+@timed()
+@cached_figure()
+def big_ten_rank_bars(ranks: Mapping, school, rank_key, color, color2):
+    return rank_bar_figures(ranks, [rank_key], [school], [color], color2)[rank_key]
 
-    plot_df = df.sort_values(cfg['col'], ascending=cfg['ascending']).reset_index(drop=True)
 
-    plot_df['color'] = plot_df['school'].apply(
-        lambda x: color if x == school else "rgb(150, 150, 150)"
-    )
-    
-    years = plot_df['year']
+def _rank_bars(entry, cfg, school, color, color2, bar_colors):
+    year_mode = cfg.get("axis_mode") == "year_offset"
+
     fig = go.Figure(
         go.Bar(
-            x=plot_df['school'],
-            y=plot_df[cfg['col']],
-            marker_color=plot_df['color'],
+            x=entry.schools,
+            y=entry.values,
+            marker_color=bar_colors,
             hovertemplate=(
                 "<b>%{x}</b><br>"
                 f"Year Written: %{{customdata}}<extra></extra>"
-                if cfg.get("axis_mode") == "year_offset"
+                if year_mode
                 else
                 f"<b>%{{x}}</b><br>{cfg['label']}: %{{y}}<extra></extra>"
             ),
-            customdata=plot_df['year'] if cfg.get("axis_mode") == "year_offset" else None
+            customdata=entry.values + entry.base if year_mode else None
         )
     )
 
-    if cfg.get("axis_mode") == "year_offset":
-        year_min = df['year'].min() - 10
-        year_max = df['year'].max() + 10
+    if year_mode:
+        year_min = entry.base
+        year_max = int(entry.values.max()) + entry.base + 10
         step = cfg.get('tick_step', 10)
 
         tick_years = list(range(year_min, year_max + 1, step))
@@ -312,7 +368,7 @@ def big_ten_rank_bars(df: pd.DataFrame, school, rank_key, color, color2):
         fig.update_yaxes(title=cfg['label'])
 
     if cfg.get("show_avg", False):
-        avg_val = plot_df[cfg['col']].mean()
+        avg_val = entry.mean
 
         fig.add_hline(
             y=avg_val,
@@ -323,20 +379,17 @@ def big_ten_rank_bars(df: pd.DataFrame, school, rank_key, color, color2):
             annotation_position=cfg['an_po']
         )
 
-    plot_df["rank"] = plot_df.index + 1
-
-    # extract selected school's row
-    school_row = plot_df.loc[plot_df["school"] == school].iloc[0]
-
-    school_rank = abs(int(school_row["rank"]) - 19)
-    n_schools = len(plot_df)
+    # selected school's rank and value, looked up instead of searched for
+    school_rank = entry.rank(school)
+    n_schools = entry.n_schools
+    school_value = entry.values[entry.position_of[school]]
 
     # handle displayed value (year vs offset)
-    if cfg.get("axis_mode") == "year_offset":
-        school_value = int(school_row["year"])
+    if year_mode:
+        school_value = int(school_value + entry.base)
         value_label = "Year Written"
     else:
-        school_value = round(school_row[cfg["col"]], 2)
+        school_value = round(school_value, 2)
         value_label = cfg["label"]
     title_text = (
         #f"<b style='color:{color}; font-size:1.2em;'>{school}</b> — "
@@ -365,32 +418,23 @@ def big_ten_rank_bars(df: pd.DataFrame, school, rank_key, color, color2):
 
 
 # create a radar plot between two schools with custom colors
-def dual_school_radar_plot(
+@timed()
+@cached_figure()
+def dual_school_radar_figure(
     df: pd.DataFrame,
     school_left: str,
     school_right: str,
     left_color: str,
     right_color: str
 ):
-    tropes = [
-        'spelling',
-        'opponents',
-        'men',
-        'colors',
-        'nonsense',
-        'rah',
-        'win_won',
-        'victory',
-        'fight'
-    ]
+    tropes = RADAR_TROPES
 
     #  Extract school rows 
     left_row = df.loc[df['school'] == school_left]
     right_row = df.loc[df['school'] == school_right]
 
     if left_row.empty or right_row.empty:
-        st.error("One or both schools not found in dataframe.")
-        return
+        raise ValueError("One or both schools not found in dataframe.")
 
     left_vals = left_row[tropes].iloc[0].tolist()
     right_vals = right_row[tropes].iloc[0].tolist()
@@ -405,10 +449,6 @@ def dual_school_radar_plot(
 
     fig = go.Figure()
 
-    # Color prep 
-    lr, lg, lb = hex_to_rgb(left_color)
-    rr, rg, rb = hex_to_rgb(right_color)
-
     # Left School 
     fig.add_trace(
         go.Scatterpolar(
@@ -417,7 +457,7 @@ def dual_school_radar_plot(
             fill="toself",
             name=school_left,
             line=dict(width=4, color=left_color),
-            fillcolor=f"rgba({lr},{lg},{lb},0.25)",
+            fillcolor=fill_color(left_color),
             hovertemplate=(
                 f"<b>%{{theta}}</b><br>"
                 f"{school_left}: %{{r:.3f}}<extra></extra>"
@@ -433,7 +473,7 @@ def dual_school_radar_plot(
             fill="toself",
             name=school_right,
             line=dict(width=4, color=right_color),
-            fillcolor=f"rgba({rr},{rg},{rb},0.25)",
+            fillcolor=fill_color(right_color),
             hovertemplate=(
                 f"<b>%{{theta}}</b><br>"
                 f"{school_right}: %{{r:.3f}}<extra></extra>"
@@ -475,12 +515,32 @@ def dual_school_radar_plot(
         showlegend=True
     )
 
-    st.plotly_chart(fig, theme="streamlit", width="stretch")
+    return fig
+
+
+# draw dual_school_radar_figure on the page
+@timed()
+def dual_school_radar_plot(
+    df: pd.DataFrame,
+    school_left: str,
+    school_right: str,
+    left_color: str,
+    right_color: str
+):
+    try:
+        fig = dual_school_radar_figure(df, school_left, school_right, left_color, right_color)
+    except ValueError as error:
+        st.error(str(error))
+        return
+    with span("st.plotly_chart"):
+        st.plotly_chart(fig, theme="streamlit", width="stretch")
 
 
 # create the same bar charts as before but this time inject colors for two battling schools, rest are grey
+@timed()
+@cached_figure()
 def big_ten_rank_bars_dual(
-    df: pd.DataFrame,
+    ranks: Mapping,
     school_left: str,
     school_right: str,
     rank_key: str,
@@ -488,33 +548,22 @@ def big_ten_rank_bars_dual(
     color_right: str,
     avg_color: str
 ):
-    year_min = df['year'].min() - 10
-    df['year_offset'] = df['year'] - year_min
-    cfg = RANK_CONFIG[rank_key]
-
-    plot_df = df.sort_values(cfg['col'], ascending=cfg['ascending']).reset_index(drop=True)
+    return rank_bar_figures(ranks, [rank_key], [school_left, school_right], [color_left, color_right], avg_color)[rank_key]
 
-    # Color mapping 
-    def bar_color(s):
-        if s == school_left:
-            return color_left
-        elif s == school_right:
-            return color_right
-        else:
-            return "rgb(150,150,150)"
 
-    plot_df["color"] = plot_df["school"].apply(bar_color)
+def _rank_bars_dual(entry, cfg, school_left, school_right, color_left, color_right, avg_color, bar_colors):
+    year_mode = cfg.get("axis_mode") == "year_offset"
 
     fig = go.Figure(
         go.Bar(
-            x=plot_df["school"],
-            y=plot_df[cfg["col"]],
-            marker_color=plot_df["color"],
-            customdata=plot_df["year"] if cfg.get("axis_mode") == "year_offset" else None,
+            x=entry.schools,
+            y=entry.values,
+            marker_color=bar_colors,
+            customdata=entry.values + entry.base if year_mode else None,
             hovertemplate=(
                 "<b>%{x}</b><br>"
                 "Year Written: %{customdata}<extra></extra>"
-                if cfg.get("axis_mode") == "year_offset"
+                if year_mode
                 else
                 f"<b>%{{x}}</b><br>{cfg['label']}: %{{y}}<extra></extra>"
             )
@@ -522,8 +571,9 @@ def big_ten_rank_bars_dual(
     )
 
     # Axis handling 
-    if cfg.get("axis_mode") == "year_offset":
-        year_max = df['year'].max() + 10
+    if year_mode:
+        year_min = entry.base
+        year_max = int(entry.values.max()) + entry.base + 10
         step = cfg.get("tick_step", 10)
 
         tick_years = list(range(year_min, year_max + 1, step))
@@ -540,7 +590,7 @@ def big_ten_rank_bars_dual(
 
     # Conference average 
     if cfg.get("show_avg", False):
-        avg_val = plot_df[cfg["col"]].mean()
+        avg_val = entry.mean
         fig.add_hline(
             y=avg_val,
             line_dash="dash",
@@ -550,20 +600,16 @@ def big_ten_rank_bars_dual(
             annotation_position=cfg['an_po']
         )
 
-    # Ranking calculation 
-    plot_df["rank"] = plot_df.index + 1
-    n_schools = len(plot_df)
-
+    # Ranking lookup 
     def get_rank_info(school):
-        row = plot_df.loc[plot_df["school"] == school].iloc[0]
-        rank = abs(int(row["rank"]) - n_schools - 1)
-        if cfg.get("axis_mode") == "year_offset":
-            val = int(row["year"])
+        val = entry.values[entry.position_of[school]]
+        if year_mode:
+            val = int(val + entry.base)
             label = "Year Written"
         else:
-            val = round(row[cfg["col"]], 2)
+            val = round(val, 2)
             label = cfg["label"]
-        return rank, val, label
+        return entry.rank(school), val, label
 
     left_rank, left_val, label = get_rank_info(school_left)
     right_rank, right_val, _ = get_rank_info(school_right)
@@ -600,16 +646,19 @@ def big_ten_rank_bars_dual(
 
 
 # creates a scatterplot which colors two specific schools and makes the rest grey, shows tempo vs duration
+@timed()
+@cached_figure()
 def big_tempo_duration_dual(
     df: pd.DataFrame,
+    stats: ConferenceStats,
     school_left: str,
     school_right: str,
     color_left: str,
     color_right: str
 ):
     # Conference averages 
-    tempo_mean = df['bpm'].mean()
-    duration_mean = df['sec_duration'].mean()
+    tempo_mean = stats.mean('bpm')
+    duration_mean = stats.mean('sec_duration')
 
     # Assign plotting color 
     def assign_color(s):
@@ -0,0 +1,138 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.big_data import get_big_data, get_big_stats, get_similarity, get_trope_distances, get_trope_mask
+from utils.colors import get_palettes, palette_table
+from utils.figure_cache import figure_cache_stats
+from utils.logos import ensure_logo_assets, logo_strip, logo_table
+from utils.ranks import get_rank_index
+from utils.visuals import (
+    RANK_CONFIG,
+    big_radar_figure,
+    big_ten_rank_bars,
+    big_tempo_duration_figure,
+    big_trope_heatmap_figure,
+    school_radar_figure,
+)
+
+# startup warm-up
+# loads every dataset artifact and builds the Home figures plus each school's radar and rank bars
+# (called exactly the way the pages call them, so they land on the same figure cache keys),
+# so the first visitor after a deploy doesn't pay for the cold builds
+
+# set to 0 to skip the background warm-up the pages start
+WARMUP_ENV = "B1G_WARMUP"
+# threads share the caches of this process, processes would each fill their own
+WARMUP_WORKERS = min(8, os.cpu_count() or 1)
+# {"thread", "report"} of the background warm-up of this process
+_BACKGROUND = {"thread": None, "report": None}
+_BACKGROUND_LOCK = threading.Lock()
+
+
+# every dataset artifact the pages read, loaded before any figure is built
+DATA_ITEMS = {
+    "big_ten": get_big_data,
+    "big_ten_stats": get_big_stats,
+    "big_ten_ranks": get_rank_index,
+    "big_ten_tropes": get_trope_mask,
+    "big_ten_distances": get_trope_distances,
+    "big_ten_similarity": get_similarity,
+    "palettes": palette_table,
+    "logo_build": ensure_logo_assets,
+    "logos": logo_table,
+    "logo_strip": logo_strip,
+}
+
+
+# (group, name, fn) of every figure to build
+def figure_items():
+    df, stats, ranks = get_big_data(), get_big_stats(), get_rank_index()
+    items = [
+        ("home", "big_tempo_duration", lambda: big_tempo_duration_figure(df, stats)),
+        ("home", "big_radar_plot", lambda: big_radar_figure(stats)),
+        ("home", "big_trope_heatmap", lambda: big_trope_heatmap_figure(df)),
+    ]
+    schools = df["school"].unique().tolist()
+    for school, colors in get_palettes(schools).items():
+        items.append((
+            "profile", f"school_radar_plot ({school})",
+            lambda school=school, colors=colors: school_radar_figure(df, stats, school, school_color=colors["primary"]),
+        ))
+        for rank_key in RANK_CONFIG:
+            items.append((
+                "profile", f"big_ten_rank_bars ({school}, {rank_key})",
+                lambda school=school, rank_key=rank_key, colors=colors: big_ten_rank_bars(
+                    ranks, school, rank_key, colors["primary"], colors["secondary"]
+                ),
+            ))
+    return items
+
+
+def _timed_item(group, name, fn):
+    start = time.perf_counter()
+    try:
+        fn()
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return {"group": group, "name": name, "ms": (time.perf_counter() - start) * 1000, "error": error}
+
+
+# load the data caches, then build every figure on a thread pool
+def warm_up(workers=WARMUP_WORKERS):
+    start = time.perf_counter()
+    items = [_timed_item("data", name, fn) for name, fn in DATA_ITEMS.items()]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        items += list(pool.map(lambda item: _timed_item(*item), figure_items()))
+    return {
+        "seconds": time.perf_counter() - start,
+        "workers": workers,
+        "items": items,
+        "failed": sum(item["error"] is not None for item in items),
+        "figure_cache": figure_cache_stats(),
+    }
+
+
+# run warm_up() once per server process in a daemon thread, unless B1G_WARMUP=0
+def start_background_warm_up(workers=WARMUP_WORKERS):
+    if os.environ.get(WARMUP_ENV, "1") == "0":
+        return
+    with _BACKGROUND_LOCK:
+        if _BACKGROUND["thread"] is not None:
+            return
+
+        def run():
+            _BACKGROUND["report"] = warm_up(workers)
+
+        _BACKGROUND["thread"] = threading.Thread(target=run, name="warm-up", daemon=True)
+        _BACKGROUND["thread"].start()
+
+
+# report of the background warm-up, None until it finished
+def warm_up_report():
+    return _BACKGROUND["report"]
+
+
+# command line entry: python -m utils.warmup [--workers N]
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load every dataset and pre-build the Home and School Profile figures")
+    parser.add_argument("--workers", type=int, default=WARMUP_WORKERS)
+    parser.add_argument("--slowest", type=int, default=10, help="how many of the slowest items to list")
+    args = parser.parse_args()
+
+    report = warm_up(args.workers)
+    for item in report["items"]:
+        if item["group"] == "data" or item["error"]:
+            status = f"FAILED {item['error']}" if item["error"] else ""
+            print(f"{item['group']:8} {item['name']:50} {item['ms']:9.1f} ms  {status}")
+    figures = sorted((i for i in report["items"] if i["group"] != "data"), key=lambda i: -i["ms"])
+    for item in figures[:args.slowest]:
+        print(f"{item['group']:8} {item['name']:50} {item['ms']:9.1f} ms")
+    cache = report["figure_cache"]
+    print(
+        f"{len(report['items'])} items ({report['failed']} failed) in {report['seconds']:.2f}s on {report['workers']} threads, "
+        f"{cache['entries']} figures cached ({cache['bytes'] / 2**20:.1f} MB)"
+    )